@@ -5,5 +5,9 @@ Common utilities and shared components.
 """
 
 from .kr_auth_info import KrAuthInfo
+from .kr_rate_limiter import KrRateLimiter, TokenBucket
+from .single_flight import SingleFlight
+from .quote_cache import QuoteCache
+from .market_calendar import MarketCalendar, MarketSession
 
-__all__ = ["KrAuthInfo"]
+__all__ = ["KrAuthInfo", "KrRateLimiter", "TokenBucket", "SingleFlight", "QuoteCache", "MarketCalendar", "MarketSession"]
@@ -5,17 +5,20 @@ Converted from KrAuthInfo.kt
 Manages authentication information for Korea Investment API accounts.
 """
 
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
 from app.models import AuthInfo
 from app.constants.common_constant import CommonConstant
+from app.common.kr_rate_limiter import KrRateLimiter
+from app.utils import DateUtil
 
 class KrAuthInfo:
     """Korea Investment Authentication Info Manager - converted from KrAuthInfo.kt"""
     
-    _index = 0
-    _index_real = 0
     _list_auth_info: List[AuthInfo] = []
     _list_real_auth_info: List[AuthInfo] = []
+    _in_flight: Dict[str, int] = {}
+    _refreshing: Set[str] = set()
     
     @classmethod
     def set_auth_info_list(cls, auth_info_list: List[AuthInfo]):
@@ -29,11 +32,8 @@ class KrAuthInfo:
         cls._list_auth_info.extend(auth_info_list)
         cls._list_real_auth_info.extend([auth for auth in auth_info_list if auth.mode == "R"])
         
-        # Add first element again to handle concurrency issues (as in original Kotlin code)
-        if cls._list_auth_info:
-            cls._list_auth_info.append(auth_info_list[0])
-        if cls._list_real_auth_info:
-            cls._list_real_auth_info.append(cls._list_real_auth_info[0])
+        for auth in auth_info_list:
+            cls._in_flight.setdefault(auth.app_key, 0)
         
         print(f"listAuthInfo size : {len(cls._list_auth_info)}")
         print(f"listRealAuthInfo size : {len(cls._list_real_auth_info)}")
@@ -58,32 +58,80 @@ class KrAuthInfo:
                 else CommonConstant.KR_INVEST_WS_REAL_URL)
     
     @classmethod
-    def next(cls) -> AuthInfo:
-        """Get next authentication info (round-robin)"""
+    def is_token_valid(cls, auth_info_entity: AuthInfo) -> bool:
+        """Check if the access token exists and has not expired"""
+        expired_date = auth_info_entity.access_token_expired_date
+        return (bool(auth_info_entity.access_token) and bool(expired_date)
+                and expired_date > DateUtil.get_current_datetime_string())
+    
+    @classmethod
+    def set_refreshing(cls, auth_info_entity: AuthInfo, refreshing: bool):
+        """Mark an app key as refreshing its token (skipped by the scheduler)"""
+        if refreshing:
+            cls._refreshing.add(auth_info_entity.app_key)
+        else:
+            cls._refreshing.discard(auth_info_entity.app_key)
+    
+    @classmethod
+    def get_in_flight(cls, auth_info_entity: AuthInfo) -> int:
+        """Get number of in-flight requests of an app key"""
+        return cls._in_flight.get(auth_info_entity.app_key, 0)
+    
+    @classmethod
+    def in_flight_counts(cls) -> Dict[str, int]:
+        """Get in-flight request counts by app key"""
+        return dict(cls._in_flight)
+    
+    @classmethod
+    def _select(cls, auth_info_list: List[AuthInfo], category: str) -> AuthInfo:
+        """Select the usable key with the most remaining rate budget"""
+        candidates = [auth for auth in auth_info_list
+                      if auth.app_key not in cls._refreshing and cls.is_token_valid(auth)]
+        if not candidates:
+            # Every key is expired or refreshing; let the caller refresh inline
+            candidates = auth_info_list
+        
+        return max(
+            candidates,
+            key=lambda auth: (KrRateLimiter.available(auth, category)
+                              - cls._in_flight.get(auth.app_key, 0))
+        )
+    
+    @classmethod
+    def next(cls, category: str = KrRateLimiter.QUOTATION) -> AuthInfo:
+        """Get next authentication info (least loaded)"""
         if not cls._list_auth_info:
             raise ValueError("No authentication info available")
         
-        if cls._index >= len(cls._list_auth_info) - 1:
-            cls._index = 0
-        
-        auth = cls._list_auth_info[cls._index]
-        cls._index += 1
-        
-        return auth
+        return cls._select(cls._list_auth_info, category)
     
     @classmethod
-    def real_next(cls) -> AuthInfo:
-        """Get next real mode authentication info (round-robin)"""
+    def real_next(cls, category: str = KrRateLimiter.QUOTATION) -> AuthInfo:
+        """Get next real mode authentication info (least loaded)"""
         if not cls._list_real_auth_info:
             raise ValueError("No real authentication info available")
         
-        if cls._index_real >= len(cls._list_real_auth_info) - 1:
-            cls._index_real = 0
-        
-        auth = cls._list_real_auth_info[cls._index_real]
-        cls._index_real += 1
-        
-        return auth
+        return cls._select(cls._list_real_auth_info, category)
+    
+    @classmethod
+    @asynccontextmanager
+    async def lease(cls, auth_info_entity: AuthInfo) -> AsyncIterator[AuthInfo]:
+        """Count a request as in-flight on an app key while the block runs"""
+        app_key = auth_info_entity.app_key
+        cls._in_flight[app_key] = cls._in_flight.get(app_key, 0) + 1
+        try:
+            yield auth_info_entity
+        finally:
+            cls._in_flight[app_key] -= 1
+    
+    @classmethod
+    @asynccontextmanager
+    async def acquire(cls, category: str = KrRateLimiter.QUOTATION,
+                      real: bool = False) -> AsyncIterator[AuthInfo]:
+        """Select the least loaded key and lease it for the block"""
+        auth_info_entity = cls.real_next(category) if real else cls.next(category)
+        async with cls.lease(auth_info_entity):
+            yield auth_info_entity
     
     @classmethod
     @property
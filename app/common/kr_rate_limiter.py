@@ -0,0 +1,109 @@
+"""
+Korea Investment Rate Limiter
+
+Per-app-key token bucket rate limiting for Korea Investment REST calls.
+Callers wait for budget instead of failing with EGW00201 (초당 거래건수 초과).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+from app.models import AuthInfo
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """asyncio-aware token bucket - acquire() queues until a token is available"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive: {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """Add tokens accrued since the last update"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        """Currently available tokens"""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until tokens are available and consume them (FIFO order)"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+class KrRateLimiter:
+    """Korea Investment rate limiter keyed by app key and TR ID category"""
+
+    QUOTATION = "quotation"
+    TRADING = "trading"
+    ORDER = "order"
+
+    _buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    @classmethod
+    def get_category(cls, tr_id: str) -> str:
+        """Get rate budget category of a TR ID (FH*/HH* are quotations)"""
+        return cls.QUOTATION if tr_id.startswith(("FH", "HH")) else cls.TRADING
+
+    @classmethod
+    def is_order(cls, tr_id: str) -> bool:
+        """Check if a TR ID places an order (trading TR IDs ending with 'U')"""
+        return cls.get_category(tr_id) == cls.TRADING and tr_id.endswith("U")
+
+    @classmethod
+    def _get_rate(cls, auth_info_entity: AuthInfo, category: str) -> Tuple[float, float]:
+        """Get (rate, capacity) for a category based on account mode"""
+        if category == cls.ORDER:
+            return settings.MAX_ORDERS_PER_MINUTE / 60.0, float(settings.MAX_ORDERS_PER_MINUTE)
+        if auth_info_entity.mode == "V":
+            rate = (settings.KI_VIRTUAL_QUOTATION_RPS if category == cls.QUOTATION
+                    else settings.KI_VIRTUAL_TRADING_RPS)
+        else:
+            rate = (settings.KI_REAL_QUOTATION_RPS if category == cls.QUOTATION
+                    else settings.KI_REAL_TRADING_RPS)
+        return rate, max(rate, 1.0)
+
+    @classmethod
+    def get_bucket(cls, auth_info_entity: AuthInfo, category: str) -> TokenBucket:
+        """Get (or create) the bucket of an app key and category"""
+        key = (auth_info_entity.app_key, category)
+        bucket = cls._buckets.get(key)
+        if bucket is None:
+            rate, capacity = cls._get_rate(auth_info_entity, category)
+            bucket = TokenBucket(rate, capacity)
+            cls._buckets[key] = bucket
+        return bucket
+
+    @classmethod
+    def available(cls, auth_info_entity: AuthInfo, category: str) -> float:
+        """Remaining budget of an app key for a category"""
+        return cls.get_bucket(auth_info_entity, category).available
+
+    @classmethod
+    async def acquire(cls, auth_info_entity: AuthInfo, tr_id: str) -> None:
+        """Wait for rate budget of the app key before calling a TR ID"""
+        if cls.is_order(tr_id):
+            await cls.get_bucket(auth_info_entity, cls.ORDER).acquire()
+        await cls.get_bucket(auth_info_entity, cls.get_category(tr_id)).acquire()
+
+    @classmethod
+    def reset(cls):
+        """Drop all buckets (e.g. after rate settings change)"""
+        cls._buckets.clear()
@@ -0,0 +1,183 @@
+"""
+Market Calendar
+
+Exchange session calendar (KRX, US) with timezones, holidays and special
+sessions (late open / early close) loaded from a local JSON file. Phase
+boundaries are computed once per trade date, so "current phase" and
+"next transition" are constant time lookups and idle loops can sleep
+until the next transition.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+from app.config.settings import settings
+from app.constants.trade_phase import TradePhase
+
+logger = logging.getLogger(__name__)
+
+class MarketSession:
+    """Phase boundaries of one trade date"""
+
+    def __init__(self, market: str, trade_date: date, open_at: datetime, close_at: datetime):
+        self.market = market
+        self.trade_date = trade_date
+        self.open_at = open_at
+        self.close_at = close_at
+        self.boundaries: List[Tuple[datetime, TradePhase]] = [
+            (open_at, TradePhase.PRE_OPEN_SELL),
+            (open_at + timedelta(seconds=settings.TRADE_BUY_START_OFFSET), TradePhase.BUY),
+            (close_at - timedelta(seconds=settings.TRADE_LIQUIDATE_OFFSET), TradePhase.LIQUIDATE),
+            (close_at - timedelta(seconds=settings.TRADE_EXIT_OFFSET), TradePhase.EXIT)
+        ]
+        self._times = [boundary.timestamp() for boundary, _ in self.boundaries]
+        self._phases = [TradePhase.WAIT] + [phase for _, phase in self.boundaries]
+
+    def phase_at(self, now: datetime) -> TradePhase:
+        return self._phases[bisect_right(self._times, now.timestamp())]
+
+    def next_boundary(self, now: datetime) -> Optional[Tuple[datetime, TradePhase]]:
+        index = bisect_right(self._times, now.timestamp())
+        return self.boundaries[index] if index < len(self.boundaries) else None
+
+class MarketCalendar:
+    """Session calendar of one market"""
+
+    MARKETS: Dict[str, Dict[str, str]] = {
+        "KRX": {"timezone": "Asia/Seoul", "open": "090000", "close": "153000"},
+        "US": {"timezone": "America/New_York", "open": "093000", "close": "160000"}
+    }
+
+    _calendars: Dict[str, "MarketCalendar"] = {}
+
+    def __init__(self, market: str = "KRX", holidays_file: Optional[str] = None):
+        if market not in self.MARKETS:
+            raise ValueError(f"Unknown market : {market}")
+        config = self.MARKETS[market]
+        self.market = market
+        self.tz = ZoneInfo(config["timezone"])
+        self.open_time = _parse_time(config["open"])
+        self.close_time = _parse_time(config["close"])
+        self.holidays: Set[date] = set()
+        self.special_sessions: Dict[date, Dict[str, time]] = {}
+        self.last_year: Optional[int] = None  # last year the holidays file lists
+        self._sessions: Dict[date, Optional[MarketSession]] = {}
+        self._uncovered_years: Set[int] = set()
+        self.load(holidays_file or settings.MARKET_CALENDAR_FILE)
+
+    @classmethod
+    def get(cls, market: str = "KRX") -> "MarketCalendar":
+        """Get the shared calendar of a market"""
+        calendar = cls._calendars.get(market)
+        if calendar is None:
+            calendar = MarketCalendar(market)
+            cls._calendars[market] = calendar
+        return calendar
+
+    def load(self, holidays_file: str):
+        """Load holidays and special sessions of this market"""
+        self._sessions.clear()
+        if not os.path.exists(holidays_file):
+            logger.warning(f"Market calendar file not found : {holidays_file}")
+            return
+        with open(holidays_file, "r", encoding="utf-8") as file:
+            data = json.load(file).get(self.market, {})
+        self.holidays = {_parse_date(value) for value in data.get("holidays", [])}
+        self.special_sessions = {
+            _parse_date(value): {key: _parse_time(hhmmss) for key, hhmmss in times.items()}
+            for value, times in data.get("special_sessions", {}).items()
+        }
+        listed = self.holidays | set(self.special_sessions)
+        self.last_year = max(day.year for day in listed) if listed else None
+        self._uncovered_years.clear()
+        logger.info(f"Market calendar {self.market} loaded: {len(self.holidays)} holidays, "
+                    f"{len(self.special_sessions)} special sessions (through {self.last_year})")
+        self._check_coverage(self.localize().date())
+
+    def _check_coverage(self, day: date):
+        """Warn (once per year) about dates past the last year of the holidays file"""
+        if self.last_year is None or day.year <= self.last_year or day.year in self._uncovered_years:
+            return
+        self._uncovered_years.add(day.year)
+        logger.error(f"Market calendar {self.market} has no holidays for {day.year} "
+                     f"(listed through {self.last_year}); holidays are treated as trading days")
+
+    def localize(self, now: Optional[datetime] = None) -> datetime:
+        """Current / given time in the market timezone (naive times are market local)"""
+        if now is None:
+            return datetime.now(self.tz)
+        if now.tzinfo is None:
+            return now.replace(tzinfo=self.tz)
+        return now.astimezone(self.tz)
+
+    def is_business_day(self, day: Optional[date] = None) -> bool:
+        """Whether the market is open on a date"""
+        day = day or self.localize().date()
+        self._check_coverage(day)
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session(self, day: date) -> Optional[MarketSession]:
+        """Phase boundaries of a date (None when the market is closed)"""
+        if day in self._sessions:
+            return self._sessions[day]
+        session = None
+        if self.is_business_day(day):
+            special = self.special_sessions.get(day, {})
+            open_at = datetime.combine(day, special.get("open", self.open_time), self.tz)
+            close_at = datetime.combine(day, special.get("close", self.close_time), self.tz)
+            session = MarketSession(self.market, day, open_at, close_at)
+        self._sessions[day] = session
+        return session
+
+    def phase(self, now: Optional[datetime] = None) -> TradePhase:
+        """Session phase at a time (EXIT on closed days)"""
+        now = self.localize(now)
+        session = self.session(now.date())
+        return session.phase_at(now) if session else TradePhase.EXIT
+
+    def is_trading_hours(self, now: Optional[datetime] = None) -> bool:
+        """Whether the regular session is open"""
+        now = self.localize(now)
+        session = self.session(now.date())
+        return session is not None and session.open_at <= now < session.close_at
+
+    def next_transition(self, now: Optional[datetime] = None) -> Tuple[datetime, TradePhase]:
+        """Time and phase of the next phase change (the next session open after the close)"""
+        now = self.localize(now)
+        session = self.session(now.date())
+        boundary = session.next_boundary(now) if session else None
+        if boundary is not None:
+            return boundary
+
+        day = now.date()
+        for _ in range(366):
+            day += timedelta(days=1)
+            session = self.session(day)
+            if session is not None:
+                return session.boundaries[0]
+        raise ValueError(f"No {self.market} session within a year after {now.date()}")
+
+    def seconds_until_next_phase(self, now: Optional[datetime] = None) -> float:
+        """Seconds from a time to the next phase change"""
+        now = self.localize(now)
+        at, _ = self.next_transition(now)
+        return max((at - now).total_seconds(), 0.0)
+
+    async def sleep_until_next_phase(self, max_seconds: Optional[float] = None) -> TradePhase:
+        """Sleep until the next phase change (or max_seconds) and return the phase then"""
+        delay = self.seconds_until_next_phase()
+        if max_seconds is not None:
+            delay = min(delay, max_seconds)
+        await asyncio.sleep(delay)
+        return self.phase()
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y%m%d").date()
+
+def _parse_time(value: str) -> time:
+    return datetime.strptime(value, "%H%M%S").time()
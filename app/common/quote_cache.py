@@ -0,0 +1,90 @@
+"""
+Quote Cache
+
+Short-TTL in-process cache for quotes with LRU eviction and single-flight
+request coalescing, so concurrent callers asking for the same stock share
+one HTTP call.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from app.common.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+class QuoteCache:
+    """TTL + LRU cache with single-flight loading (ttl_ms None: entries never expire)"""
+
+    def __init__(self, ttl_ms: Optional[int] = 500, max_size: int = 5000):
+        self.ttl = None if ttl_ms is None else ttl_ms / 1000.0
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._single_flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a fresh cached value (None if missing or expired)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries"""
+        if self.ttl is not None and self.ttl <= 0:
+            return
+        self._entries[key] = (None if self.ttl is None else time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Get a cached value or load it once for all concurrent callers"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self._single_flight.in_flight(key):
+            self.coalesced += 1
+        else:
+            self.misses += 1
+
+        def on_result(result: Any):
+            if cacheable is None or cacheable(result):
+                self.put(key, result)
+
+        return await self._single_flight.do(key, loader, on_result)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or every entry when key is None"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "ttl_ms": None if self.ttl is None else int(self.ttl * 1000),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,48 @@
+"""
+Single Flight
+
+Request coalescing: concurrent callers asking for the same key share one
+in-progress call instead of each making their own.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """One in-progress call per key, shared by every concurrent caller"""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a call for the key is in progress"""
+        return key in self._in_flight
+
+    async def do(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        on_result: Optional[Callable[[Any], None]] = None
+    ) -> Any:
+        """
+        Run loader once for all concurrent callers of a key; on_result gets a
+        successful result once. A caller giving up does not cancel the call.
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(loader())
+            self._in_flight[key] = future
+
+            def on_done(done: "asyncio.Future[Any]"):
+                self._in_flight.pop(key, None)
+                # exception() also marks a failure nobody waited for as retrieved
+                if done.cancelled() or done.exception() is not None:
+                    return
+                if on_result is not None:
+                    on_result(done.result())
+
+            future.add_done_callback(on_done)
+        return await asyncio.shield(future)
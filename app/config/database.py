@@ -4,7 +4,10 @@ Database Configuration
 Database connection and session management.
 """
 
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Union
+from sqlalchemy import create_engine, inspect, text, UniqueConstraint
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
 from app.config.settings import settings
@@ -13,20 +16,37 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+def get_pool_options(database_url: str) -> Dict[str, Any]:
+    """Connection pool options of an engine (SQLite keeps its default pool)"""
+    if database_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True
+    }
+
 # Create sync engine
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
-    pool_recycle=300
+    **get_pool_options(settings.DATABASE_URL)
 )
 
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync driver URL to its asyncio driver"""
+    return (database_url
+            .replace("mysql+pymysql", "mysql+aiomysql")
+            .replace("sqlite://", "sqlite+aiosqlite://", 1))
+
 # Create async engine
+ASYNC_DATABASE_URL = settings.DATABASE_ASYNC_URL or get_async_database_url(settings.DATABASE_URL)
 async_engine = create_async_engine(
-    settings.DATABASE_URL.replace("mysql+pymysql", "mysql+aiomysql"),
+    ASYNC_DATABASE_URL,
     echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
-    pool_recycle=300
+    **get_pool_options(ASYNC_DATABASE_URL)
 )
 
 # Create session factories
@@ -48,22 +68,75 @@ async def init_db():
         # Create all tables
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
+        ensure_indexes(engine)
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise
 
-def get_db() -> Session:
-    """Get database session"""
+def ensure_indexes(bind: Engine = engine) -> List[str]:
+    """
+    Add the indexes / unique constraints declared on the models that an
+    existing database is missing (create_all only creates new tables).
+    Returns the names created; a failure (e.g. duplicated rows for a unique
+    key) is logged and the rest are still created.
+    """
+    inspector = inspect(bind)
+    preparer = bind.dialect.identifier_preparer
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        existing |= {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+        wanted = [(index.name, index.unique, [column.name for column in index.columns])
+                  for index in table.indexes]
+        wanted += [(constraint.name, True, [column.name for column in constraint.columns])
+                   for constraint in table.constraints
+                   if isinstance(constraint, UniqueConstraint) and constraint.name]
+        for name, unique, columns in wanted:
+            if name in existing:
+                continue
+            ddl = (f"CREATE {'UNIQUE ' if unique else ''}INDEX {preparer.quote(name)} "
+                   f"ON {preparer.format_table(table)} "
+                   f"({', '.join(preparer.quote(column) for column in columns)})")
+            try:
+                with bind.begin() as conn:
+                    conn.execute(text(ddl))
+                created.append(name)
+                logger.info(f"Index created : {table.name}.{name}")
+            except Exception as e:
+                logger.error(f"Error creating index {table.name}.{name}: {e}")
+    return created
+
+def get_db() -> Iterator[Session]:
+    """Get database session (closed when the request is done)"""
     db = SessionLocal()
     try:
-        return db
+        yield db
     finally:
         db.close()
 
-async def get_async_db() -> AsyncSession:
+async def get_async_db() -> AsyncIterator[AsyncSession]:
     """Get async database session"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
+
+@asynccontextmanager
+async def open_session() -> AsyncIterator[Union[Session, AsyncSession]]:
+    """
+    Open a session for the SA data path: an AsyncSession when DATABASE_ASYNC
+    is set, otherwise a Session whose queries block the event loop
+    """
+    if settings.DATABASE_ASYNC:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
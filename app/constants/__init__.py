@@ -5,5 +5,6 @@ Application constants and enumerations.
 """
 
 from .common_constant import CommonConstant
+from .trade_phase import TradePhase
 
-__all__ = ["CommonConstant"]
+__all__ = ["CommonConstant", "TradePhase"]
@@ -0,0 +1,16 @@
+"""
+Trade Phases
+
+Market session phases driving the auto trade loop.
+"""
+
+from enum import Enum
+
+class TradePhase(Enum):
+    """Auto trade session phases (in daily order)"""
+    
+    WAIT = "WAIT"                    # before the open
+    PRE_OPEN_SELL = "PRE_OPEN_SELL"  # sell positions left from the previous day
+    BUY = "BUY"                      # breakout buy window
+    LIQUIDATE = "LIQUIDATE"          # sell every position before the close
+    EXIT = "EXIT"                    # session over (or market closed)
@@ -5,14 +5,14 @@ This module contains controllers for Korea Investment securities API integration
 Converted from the Kotlin krinvest package.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Header
+from typing import Dict, Any, Optional
 from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
-from app.services.krinvest.kr_inv_ord_service import KrInvOrdService
 from app.services.krinvest.kr_inv_inq_service import KrInvInqService
 from app.services.sa.sa_api_service import SaApiService
+from app.services.service_registry import (
+    get_kr_inv_oauth_service, get_kr_inv_inq_service, get_sa_api_service
+)
 from app.models import AuthInfo
 
 router = APIRouter()
@@ -23,20 +23,20 @@ async def krinvest_root():
     return {"message": "Korea Investment API endpoints"}
 
 @router.get("/approval")
-async def get_approval(db: Session = Depends(get_db)):
+async def get_approval(oauth_service: KrInvOauthService = Depends(get_kr_inv_oauth_service)):
     """Get approval key for real-time websocket connection"""
     try:
-        oauth_service = KrInvOauthService(db)
         approval_key = await oauth_service.api_oauth2_approval()
         return {"approval_key": approval_key}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/tokenP")
-async def get_token_p(auth_info: Dict[str, Any], db: Session = Depends(get_db)):
+async def get_token_p(
+    auth_info: Dict[str, Any], oauth_service: KrInvOauthService = Depends(get_kr_inv_oauth_service)
+):
     """Get access token"""
     try:
-        oauth_service = KrInvOauthService(db)
         # Convert dict to AuthInfo entity
         auth_entity = AuthInfo(**auth_info)
         access_token = await oauth_service.api_oauth2_token(auth_entity)
@@ -47,12 +47,12 @@ async def get_token_p(auth_info: Dict[str, Any], db: Session = Depends(get_db)):
 @router.get("/order-cash-buy/{stock_code}/{stock_qty}/{stock_price}")
 async def order_cash_buy_by_price(
     stock_code: str, stock_qty: str, stock_price: str, 
-    db: Session = Depends(get_db)
+    api_service: SaApiService = Depends(get_sa_api_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Place a buy order with specific price"""
     try:
-        api_service = SaApiService(db)
-        result = await api_service.order_cash_buy_by_price(stock_code, stock_qty, stock_price)
+        result = await api_service.order_cash_buy_by_price(stock_code, stock_qty, stock_price, idempotency_key)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -60,12 +60,12 @@ async def order_cash_buy_by_price(
 @router.get("/order-marketprice-buy/{stock_code}/{stock_qty}")
 async def order_cash_buy_by_market_price(
     stock_code: str, stock_qty: str,
-    db: Session = Depends(get_db)
+    api_service: SaApiService = Depends(get_sa_api_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Place a buy order at market price"""
     try:
-        api_service = SaApiService(db)
-        result = await api_service.order_cash_buy_by_market_price(stock_code, stock_qty)
+        result = await api_service.order_cash_buy_by_market_price(stock_code, stock_qty, idempotency_key)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -73,41 +73,53 @@ async def order_cash_buy_by_market_price(
 @router.get("/order-cash-sell/{stock_code}/{stock_qty}")
 async def order_cash_sell_by_market_price(
     stock_code: str, stock_qty: str,
-    db: Session = Depends(get_db)
+    api_service: SaApiService = Depends(get_sa_api_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Place a sell order at market price"""
     try:
-        api_service = SaApiService(db)
-        result = await api_service.order_cash_sell_by_market_price(stock_code, stock_qty)
+        result = await api_service.order_cash_sell_by_market_price(stock_code, stock_qty, idempotency_key)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/order-rvsecncl/{order_number}")
-async def order_rvsecncl(order_number: str, db: Session = Depends(get_db)):
+async def order_rvsecncl(order_number: str, api_service: SaApiService = Depends(get_sa_api_service)):
     """Cancel an order"""
     try:
-        api_service = SaApiService(db)
         result = await api_service.order_rvsecncl(order_number)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/inquire-price/{stock_code}")
-async def inquire_price(stock_code: str, db: Session = Depends(get_db)):
+async def inquire_price(stock_code: str, inq_service: KrInvInqService = Depends(get_kr_inv_inq_service)):
     """Get current stock price"""
     try:
-        inq_service = KrInvInqService(db)
         result = await inq_service.api_inquire_price(stock_code)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/inquire-prices")
+async def inquire_prices(stock_codes: str, inq_service: KrInvInqService = Depends(get_kr_inv_inq_service)):
+    """Get current prices of comma separated stock codes"""
+    try:
+        codes = [code.strip() for code in stock_codes.split(",") if code.strip()]
+        result = await inq_service.inquire_prices(codes)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/quote-cache/stats")
+async def quote_cache_stats():
+    """Get quote cache hit/miss counters"""
+    return KrInvInqService.quote_cache.stats()
+
 @router.get("/inquire-balance")
-async def inquire_balance(account_number: str, db: Session = Depends(get_db)):
+async def inquire_balance(account_number: str, inq_service: KrInvInqService = Depends(get_kr_inv_inq_service)):
     """Get account balance"""
     try:
-        inq_service = KrInvInqService(db)
         result = await inq_service.api_inquire_balance(account_number)
         return result
     except Exception as e:
@@ -5,5 +5,8 @@ Background processes and scheduled tasks.
 """
 
 from .run_main_stock_analysis import RunMainStockAnalysis
+from .run_auto_trade import RunAutoTrade
+from .run_backtest import RunBacktest
+from .run_param_sweep import RunParamSweep
 
-__all__ = ["RunMainStockAnalysis"]
+__all__ = ["RunMainStockAnalysis", "RunAutoTrade", "RunBacktest", "RunParamSweep"]
@@ -0,0 +1,243 @@
+"""
+Run Auto Trade
+
+Asyncio trading loop replacing the sequential sample loops
+(sample/KoreaStockAutoTrade.py). Each pass quotes every candidate
+symbol concurrently (bounded by the API rate limiter, not the symbol
+count) and runs the buy / sell checks as concurrent tasks, while the
+session phases (pre-open sell, buy window, forced liquidation, exit)
+from the market calendar are handled as a state machine. Idle phases
+sleep until the next phase transition instead of polling. Orders go
+through the shared order pipeline with keys derived from the trade date,
+stock and side, so a repeated order intent reaches the broker once.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from app.config.settings import settings
+from app.constants.trade_phase import TradePhase
+from app.models import AuthInfo
+from app.common.kr_auth_info import KrAuthInfo
+from app.common.market_calendar import MarketCalendar
+from app.common.kr_rate_limiter import KrRateLimiter
+from app.services.krinvest.kr_inv_inq_service import KrInvInqService
+from app.services.krinvest.kr_inv_ord_service import KrInvOrdService
+from app.services.krinvest.kr_inv_order_pipeline import KrInvOrderPipeline
+from app.services.sa.sa_check_to_buy_service import SaCheckToBuyService
+from app.services.sa.sa_check_to_sell_service import SaCheckToSellService
+from app.services.service_registry import ServiceRegistry
+
+logger = logging.getLogger(__name__)
+
+class RunAutoTrade:
+    """Auto trade loop runner"""
+
+    def __init__(
+        self,
+        kr_inv_inq_service: KrInvInqService,
+        kr_inv_ord_service: KrInvOrdService,
+        sa_check_to_buy_service: SaCheckToBuyService,
+        sa_check_to_sell_service: SaCheckToSellService,
+        symbol_list: List[str],
+        kr_inv_order_pipeline: Optional[KrInvOrderPipeline] = None,
+        auth_info_entity: Optional[AuthInfo] = None,
+        target_buy_count: Optional[int] = None,
+        buy_percent: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        interval: Optional[float] = None,
+        market_calendar: Optional[MarketCalendar] = None,
+        now: Optional[Callable[[], datetime]] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+    ):
+        self.kr_inv_inq_service = kr_inv_inq_service
+        self.kr_inv_ord_service = kr_inv_ord_service
+        # Shared with the order endpoints so every order of an account is queued together
+        self.kr_inv_order_pipeline = kr_inv_order_pipeline or ServiceRegistry.get().kr_inv_order_pipeline
+        self.sa_check_to_buy_service = sa_check_to_buy_service
+        self.sa_check_to_sell_service = sa_check_to_sell_service
+        self.symbol_list = list(dict.fromkeys(symbol_list))
+        self.auth_info_entity = auth_info_entity
+        self.target_buy_count = target_buy_count or settings.TRADE_TARGET_BUY_COUNT
+        self.buy_percent = buy_percent or settings.TRADE_BUY_PERCENT
+        self.concurrency = concurrency or settings.TRADE_CHECK_CONCURRENCY
+        self.interval = settings.TRADE_LOOP_INTERVAL if interval is None else interval
+        self.market_calendar = market_calendar or MarketCalendar.get("KRX")
+        self.now = now or self.market_calendar.localize
+        self.sleep = sleep
+
+        self.phase: Optional[TradePhase] = None
+        self.tr_date: Optional[str] = None
+        self.holdings: Dict[str, int] = {}  # stock code -> quantity
+        self.bought: Set[str] = set()
+        self.cash = 0
+        self.buy_amount = 0.0
+        self.sold_out = False
+        self._order_lock = asyncio.Lock()
+        self._stopped = False
+        logger.info("RunAutoTrade Init...")
+
+    def get_phase(self, now: datetime) -> TradePhase:
+        """Session phase of a point in time"""
+        return self.market_calendar.phase(now)
+
+    def is_idle(self, phase: TradePhase) -> bool:
+        """Whether a phase has nothing left to do until the next transition"""
+        return (phase == TradePhase.WAIT
+                or (phase in (TradePhase.PRE_OPEN_SELL, TradePhase.LIQUIDATE) and self.sold_out))
+
+    def stop(self):
+        """Stop the loop after the current pass"""
+        self._stopped = True
+
+    async def run(self) -> Dict[str, Any]:
+        """Run the loop until the session ends"""
+        if self.auth_info_entity is None:
+            self.auth_info_entity = (KrAuthInfo.real_next(KrRateLimiter.TRADING)
+                                     if KrAuthInfo.list_real_auth_info
+                                     else KrAuthInfo.next(KrRateLimiter.TRADING))
+        await self.load_balance()
+        self.buy_amount = self.cash * self.buy_percent
+        self.bought = set(self.holdings)
+        logger.info(f"Auto trade started : {len(self.symbol_list)} symbols, cash {self.cash}, "
+                    f"holdings {self.holdings}")
+
+        self._stopped = False
+        while not self._stopped:
+            now = self.now()
+            self.tr_date = now.strftime("%Y%m%d")
+            phase = self.get_phase(now)
+            if phase != self.phase:
+                logger.info(f"Trade phase : {self.phase.value if self.phase else None} -> {phase.value}")
+                self.phase = phase
+            if phase == TradePhase.EXIT:
+                break
+            if self.is_idle(phase):
+                await self.sleep(self.market_calendar.seconds_until_next_phase(now))
+                continue
+            try:
+                await self.run_phase(phase)
+            except Exception as e:
+                logger.error(f"Error in auto trade pass ({phase.value}): {e}")
+            await self.sleep(self.interval)
+
+        logger.info("Auto trade finished")
+        return {"phase": self.phase.value if self.phase else None, "holdings": self.holdings,
+                "bought": sorted(self.bought), "sold_out": self.sold_out}
+
+    async def run_phase(self, phase: TradePhase):
+        """Run one pass of a phase"""
+        if phase in (TradePhase.PRE_OPEN_SELL, TradePhase.LIQUIDATE):
+            if not self.sold_out:
+                await self.sell_all()
+        elif phase == TradePhase.BUY:
+            await self.run_buy_pass()
+
+    async def run_buy_pass(self):
+        """Quote candidates and holdings together, then check them concurrently"""
+        now = self.now()
+        tr_date, tr_time = now.strftime("%Y%m%d"), now.strftime("%H%M%S")
+        candidates = ([code for code in self.symbol_list if code not in self.bought]
+                      if len(self.bought) < self.target_buy_count else [])
+        codes = candidates + [code for code in self.holdings if code not in candidates]
+        if not codes:
+            return
+
+        quotes = await self.kr_inv_inq_service.inquire_prices(codes, self.concurrency)
+        prices = dict(zip(quotes["stock_code"], quotes["price"]))
+        for stock_code, error in quotes["errors"].items():
+            logger.warning(f"Quote failed for {stock_code}: {error}")
+        if candidates:
+            # Breakout targets need today's open, which only the quotes carry during the session
+            open_prices = {code: open_price for code, open_price in zip(quotes["stock_code"], quotes["open_price"])
+                           if code in candidates}
+            await self.sa_check_to_buy_service.update_open_prices(tr_date, open_prices)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check(stock_code: str):
+            async with semaphore:
+                price = prices.get(stock_code)
+                if price is None:
+                    return
+                if stock_code in self.holdings:
+                    await self.check_to_sell(stock_code, tr_date, tr_time)
+                elif stock_code in candidates:
+                    await self.check_to_buy(stock_code, tr_date, tr_time, price)
+
+        results = await asyncio.gather(*(check(code) for code in codes), return_exceptions=True)
+        for stock_code, result in zip(codes, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error checking {stock_code}: {result}")
+
+    async def check_to_buy(self, stock_code: str, tr_date: str, tr_time: str, price: float):
+        """Buy a stock when the buy check recommends it"""
+        result = await self.sa_check_to_buy_service.check_buy_condition(stock_code, tr_date, tr_time, price)
+        if not result.get("buy_recommended"):
+            return
+
+        # Orders are serialized so concurrent checks never exceed the target count
+        async with self._order_lock:
+            if stock_code in self.bought or len(self.bought) >= self.target_buy_count:
+                return
+            qty = int(self.buy_amount // price) if price > 0 else 0
+            if qty <= 0:
+                return
+            logger.info(f"{stock_code} buy signal at {price} (target {result.get('target_price')}): qty {qty}")
+            response = await self.kr_inv_order_pipeline.submit(
+                self.auth_info_entity, "BUY", stock_code, str(qty),
+                idempotency_key=f"{tr_date}-{stock_code}-BUY"
+            )
+            if response.get("rt_cd") == "0":
+                self.bought.add(stock_code)
+                self.holdings[stock_code] = self.holdings.get(stock_code, 0) + qty
+                self.sold_out = False
+            else:
+                logger.warning(f"Buy order failed for {stock_code}: {response.get('msg1')}")
+
+    async def check_to_sell(self, stock_code: str, tr_date: str, tr_time: str):
+        """Sell a held stock when the sell check recommends it"""
+        result = await self.sa_check_to_sell_service.check_sell_condition(stock_code, tr_date, tr_time)
+        if result.get("sell_recommended"):
+            await self.sell(stock_code)
+
+    async def sell(self, stock_code: str) -> bool:
+        """Sell the whole position of a stock at market price"""
+        qty = self.holdings.get(stock_code, 0)
+        if qty <= 0:
+            return False
+        # A stock is sold at most once per phase (pre-open, buy window, liquidation)
+        tr_date = self.tr_date or self.now().strftime("%Y%m%d")
+        phase = self.phase.value if self.phase else None
+        response = await self.kr_inv_order_pipeline.submit(
+            self.auth_info_entity, "SELL", stock_code, str(qty),
+            idempotency_key=f"{tr_date}-{stock_code}-SELL-{phase}"
+        )
+        if response.get("rt_cd") == "0":
+            self.holdings.pop(stock_code, None)
+            return True
+        logger.warning(f"Sell order failed for {stock_code}: {response.get('msg1')}")
+        return False
+
+    async def sell_all(self):
+        """Sell every position concurrently"""
+        codes = list(self.holdings)
+        results = await asyncio.gather(*(self.sell(code) for code in codes), return_exceptions=True)
+        for stock_code, result in zip(codes, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error selling {stock_code}: {result}")
+        await self.load_balance()
+        self.bought = set()
+        self.sold_out = not self.holdings
+
+    async def load_balance(self):
+        """Load holdings and cash from the balance inquiry"""
+        response = await self.kr_inv_ord_service.api_inquire_balance(self.auth_info_entity)
+        self.holdings = {
+            item["pdno"]: int(item["hldg_qty"])
+            for item in response.get("output1") or []
+            if int(item.get("hldg_qty") or 0) > 0
+        }
+        summary = response.get("output2") or [{}]
+        self.cash = int(summary[0].get("dnca_tot_amt") or 0)
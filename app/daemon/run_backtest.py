@@ -0,0 +1,232 @@
+"""
+Run Backtest
+
+Event-driven replay of stored minute bars through the same buy / sell
+check services and session phases as RunAutoTrade, with a simulated
+clock (the time of the bar being replayed), simulated market fills
+(bar close plus slippage, commission and sell tax) and a portfolio
+ledger. Bars come from the database (bars_from_rows) or the memory-mapped
+archive (SaArchiveService.load_minute_bars), as per-symbol NumPy arrays.
+The buy check service must hold its own SaBreakoutService, so a backtest
+never replaces the targets of live trading in the same process.
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+import numpy as np
+from app.config.settings import settings
+from app.constants.trade_phase import TradePhase
+from app.common.market_calendar import MarketCalendar
+from app.services.sa.sa_breakout_service import SaBreakoutService
+from app.services.sa.sa_check_to_buy_service import SaCheckToBuyService
+from app.services.sa.sa_check_to_sell_service import SaCheckToSellService
+
+logger = logging.getLogger(__name__)
+
+Bars = Mapping[str, Mapping[str, np.ndarray]]
+
+class SimulatedClock:
+    """Clock set to the time of the bar being replayed"""
+
+    def __init__(self, market_calendar: MarketCalendar):
+        self.market_calendar = market_calendar
+        self.current: Optional[datetime] = None
+
+    def set(self, now: datetime):
+        self.current = self.market_calendar.localize(now)
+
+    def __call__(self) -> datetime:
+        if self.current is None:
+            raise ValueError("Simulated clock is not started")
+        return self.current
+
+class BacktestLedger:
+    """Cash, positions and fills of a simulated account"""
+
+    def __init__(
+        self,
+        initial_cash: float,
+        commission_rate: Optional[float] = None,
+        sell_tax_rate: Optional[float] = None,
+        slippage_bps: Optional[float] = None
+    ):
+        self.initial_cash = initial_cash
+        self.cash = initial_cash
+        self.commission_rate = settings.BACKTEST_COMMISSION_RATE if commission_rate is None else commission_rate
+        self.sell_tax_rate = settings.BACKTEST_SELL_TAX_RATE if sell_tax_rate is None else sell_tax_rate
+        self.slippage = (settings.BACKTEST_SLIPPAGE_BPS if slippage_bps is None else slippage_bps) / 10000.0
+        self.positions: Dict[str, Tuple[int, float]] = {}  # stock code -> (quantity, average cost)
+        self.last_prices: Dict[str, float] = {}
+        self.fills: List[Dict[str, Any]] = []
+        self.equity_curve: List[Tuple[str, float]] = []  # (tr_date, equity at the last bar)
+
+    def buy(self, stock_code: str, qty: int, price: float, at: datetime) -> bool:
+        """Fill a market buy (price moved up by slippage); False if cash is short"""
+        fill_price = price * (1 + self.slippage)
+        commission = fill_price * qty * self.commission_rate
+        cost = fill_price * qty + commission
+        if qty <= 0 or cost > self.cash:
+            return False
+        held_qty, average = self.positions.get(stock_code, (0, 0.0))
+        self.positions[stock_code] = (held_qty + qty, (average * held_qty + cost) / (held_qty + qty))
+        self.cash -= cost
+        self.fills.append({"time": at, "stock_code": stock_code, "side": "BUY", "qty": qty,
+                           "price": fill_price, "fee": commission, "pnl": 0.0})
+        return True
+
+    def sell(self, stock_code: str, price: float, at: datetime) -> bool:
+        """Fill a market sell of the whole position (price moved down by slippage)"""
+        qty, average = self.positions.pop(stock_code, (0, 0.0))
+        if qty <= 0:
+            return False
+        fill_price = price * (1 - self.slippage)
+        fee = fill_price * qty * (self.commission_rate + self.sell_tax_rate)
+        proceeds = fill_price * qty - fee
+        self.cash += proceeds
+        self.fills.append({"time": at, "stock_code": stock_code, "side": "SELL", "qty": qty,
+                           "price": fill_price, "fee": fee, "pnl": proceeds - average * qty})
+        return True
+
+    def equity(self) -> float:
+        """Cash plus positions marked at their last price"""
+        return self.cash + sum(qty * self.last_prices.get(code, average)
+                               for code, (qty, average) in self.positions.items())
+
+    def summary(self) -> Dict[str, Any]:
+        """Performance summary"""
+        equity = self.equity()
+        sells = [fill for fill in self.fills if fill["side"] == "SELL"]
+        curve = np.array([value for _, value in self.equity_curve] or [equity])
+        peaks = np.maximum.accumulate(np.r_[self.initial_cash, curve])
+        return {
+            "initial_cash": self.initial_cash,
+            "final_equity": equity,
+            "return": equity / self.initial_cash - 1.0,
+            "trades": len(sells),
+            "win_rate": (sum(fill["pnl"] > 0 for fill in sells) / len(sells)) if sells else None,
+            "max_drawdown": float(np.max(1.0 - np.r_[self.initial_cash, curve] / peaks)),
+            "fees": sum(fill["fee"] for fill in self.fills)
+        }
+
+class RunBacktest:
+    """Backtest runner"""
+
+    def __init__(
+        self,
+        sa_check_to_buy_service: SaCheckToBuyService,
+        sa_check_to_sell_service: SaCheckToSellService,
+        bars: Bars,
+        initial_cash: Optional[float] = None,
+        target_buy_count: Optional[int] = None,
+        buy_percent: Optional[float] = None,
+        market_calendar: Optional[MarketCalendar] = None,
+        ledger: Optional[BacktestLedger] = None
+    ):
+        sa_breakout_service = getattr(sa_check_to_buy_service, "sa_breakout_service", None)
+        if sa_breakout_service is not None and SaBreakoutService.is_shared(sa_breakout_service):
+            raise ValueError("Backtest buy checks need their own SaBreakoutService, not the live one")
+        self.sa_check_to_buy_service = sa_check_to_buy_service
+        self.sa_check_to_sell_service = sa_check_to_sell_service
+        self.bars = bars
+        self.target_buy_count = target_buy_count or settings.TRADE_TARGET_BUY_COUNT
+        self.buy_percent = buy_percent or settings.TRADE_BUY_PERCENT
+        self.market_calendar = market_calendar or MarketCalendar.get("KRX")
+        self.clock = SimulatedClock(self.market_calendar)
+        self.ledger = ledger or BacktestLedger(initial_cash or settings.BACKTEST_INITIAL_CASH)
+        self.bought: Set[str] = set()
+        self.buy_amount = 0.0
+        logger.info("RunBacktest Init...")
+
+    @staticmethod
+    def bars_from_rows(rows: Sequence[Sequence]) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Per-symbol arrays from (stock_code, date_time, open, high, low, close, volume)
+        rows ordered by stock code and time (SaDbService column finders)
+        """
+        bars: Dict[str, Dict[str, np.ndarray]] = {}
+        if not rows:
+            return bars
+        columns = list(zip(*rows))
+        codes = np.array(columns[0])
+        bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        times = np.array(columns[1], dtype="datetime64[ms]")
+        values = {name: np.array(column, dtype=np.float64) for name, column in zip(
+            ["open_price", "high_price", "low_price", "close_price", "volume"], columns[2:7]
+        )}
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(codes)]):
+            bars[str(codes[lo])] = {"date_time": times[lo:hi],
+                                    **{name: array[lo:hi] for name, array in values.items()}}
+        return bars
+
+    def _events(self) -> Tuple[np.ndarray, List[int], List[float], List[str]]:
+        """All bars merged in time order: (unique times, group bounds, symbol per event, price per event)"""
+        codes = list(self.bars)
+        times = np.concatenate([self.bars[code]["date_time"].astype("datetime64[ms]") for code in codes])
+        prices = np.concatenate([np.asarray(self.bars[code]["close_price"], dtype=np.float64) for code in codes])
+        symbols = np.repeat(np.arange(len(codes)), [len(self.bars[code]["date_time"]) for code in codes])
+        order = np.argsort(times, kind="stable")
+        times, prices, symbols = times[order], prices[order], symbols[order]
+        starts = np.flatnonzero(np.r_[True, times[1:] != times[:-1]])
+        return times[starts], np.r_[starts, len(times)].tolist(), prices.tolist(), \
+            [codes[index] for index in symbols.tolist()]
+
+    async def run(self) -> Dict[str, Any]:
+        """Replay every bar in time order and return the performance summary"""
+        if not self.bars:
+            return self.ledger.summary()
+        times, bounds, prices, symbols = self._events()
+        positions, last_prices = self.ledger.positions, self.ledger.last_prices
+        day: Optional[date] = None
+        tr_date = ""
+
+        for step, moment in enumerate(times.astype("datetime64[s]").astype(datetime).tolist()):
+            if moment.date() != day:
+                if day is not None:
+                    self.ledger.equity_curve.append((tr_date, self.ledger.equity()))
+                day, tr_date = moment.date(), moment.strftime("%Y%m%d")
+                self.start_day()
+            self.clock.set(moment)
+            tr_time = moment.strftime("%H%M%S")
+            phase = self.market_calendar.phase(moment)
+            buying = phase == TradePhase.BUY
+
+            for event in range(bounds[step], bounds[step + 1]):
+                stock_code, price = symbols[event], prices[event]
+                last_prices[stock_code] = price
+                # Most bars need no decision: skip the call unless held or still a buy candidate
+                if stock_code in positions or (
+                    buying and stock_code not in self.bought and len(self.bought) < self.target_buy_count
+                ):
+                    await self.on_bar(phase, stock_code, price, tr_date, tr_time, moment)
+
+        self.ledger.equity_curve.append((tr_date, self.ledger.equity()))
+        summary = self.ledger.summary()
+        logger.info(f"Backtest finished : {summary}")
+        return summary
+
+    def start_day(self):
+        """Daily reset, as RunAutoTrade does when it starts"""
+        self.buy_amount = self.ledger.cash * self.buy_percent
+        self.bought = set(self.ledger.positions)
+
+    async def on_bar(self, phase: TradePhase, stock_code: str, price: float,
+                     tr_date: str, tr_time: str, moment: datetime):
+        """Handle one bar of one symbol in the session phase of its time"""
+        held = stock_code in self.ledger.positions
+        if phase in (TradePhase.PRE_OPEN_SELL, TradePhase.LIQUIDATE):
+            if held:
+                self.ledger.sell(stock_code, price, moment)
+        elif phase == TradePhase.BUY:
+            if held:
+                result = await self.sa_check_to_sell_service.check_sell_condition(stock_code, tr_date, tr_time)
+                if result.get("sell_recommended"):
+                    self.ledger.sell(stock_code, price, moment)
+            elif stock_code not in self.bought and len(self.bought) < self.target_buy_count:
+                result = await self.sa_check_to_buy_service.check_buy_condition(
+                    stock_code, tr_date, tr_time, price
+                )
+                if result.get("buy_recommended"):
+                    qty = int(self.buy_amount // price) if price > 0 else 0
+                    if self.ledger.buy(stock_code, qty, price, moment):
+                        self.bought.add(stock_code)
@@ -6,6 +6,7 @@ Main analysis runner for stock trading decisions.
 """
 
 import logging
+from datetime import datetime
 from typing import Dict, Any
 from app.services.krinvest.kr_inv_inq_service import KrInvInqService
 from app.services.krinvest.kr_inv_ord_service import KrInvOrdService
@@ -42,6 +43,20 @@ class RunMainStockAnalysis:
         self.sa_common_service = sa_common_service
         logger.info("RunMainStockAnalysis Init...")
     
+    async def _get_price_info(self, stock_code: str, tr_date: str, tr_time: str) -> Dict[str, Any]:
+        """
+        Price at the test time: the last stored minute bar at or before it for a past
+        trade date (replay), the live quote otherwise
+        """
+        at = datetime.strptime(f"{tr_date}{tr_time:0<6}", "%Y%m%d%H%M%S")
+        if at.date() < datetime.now().date():
+            rows = await self.sa_db_service.find_minute_data_columns_by_stock_codes_and_period(
+                [stock_code], at.replace(hour=0, minute=0, second=0), at
+            )
+            if rows:
+                return {"output": {"stck_prpr": str(int(rows[-1][5]))}, "source": "MINUTE_DATA"}
+        return await self.kr_inv_inq_service.api_inquire_price(stock_code)
+    
     async def run_check_to_buy_test(
         self, stock_code: str, stock_name: str, tr_date: str, tr_time: str
     ) -> Dict[str, Any]:
@@ -50,11 +65,12 @@ class RunMainStockAnalysis:
             logger.info(f"Running buy check test for {stock_code} ({stock_name})")
             
             # Get current price
-            price_info = await self.kr_inv_inq_service.api_inquire_price(stock_code)
+            price_info = await self._get_price_info(stock_code, tr_date, tr_time)
             
             # Check buy conditions
             buy_condition = await self.sa_check_to_buy_service.check_buy_condition(
-                stock_code, tr_date, tr_time
+                stock_code, tr_date, tr_time,
+                self.kr_inv_inq_service.get_current_price(price_info)
             )
             
             # Get statistics
@@ -91,7 +107,7 @@ class RunMainStockAnalysis:
             logger.info(f"Running sell check test for {stock_code} ({stock_name})")
             
             # Get current price
-            price_info = await self.kr_inv_inq_service.api_inquire_price(stock_code)
+            price_info = await self._get_price_info(stock_code, tr_date, tr_time)
             
             # Check sell conditions
             sell_condition = await self.sa_check_to_sell_service.check_sell_condition(
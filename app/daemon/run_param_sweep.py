@@ -0,0 +1,237 @@
+"""
+Run Param Sweep
+
+Strategy parameter search (grid or random) distributed over a process pool.
+The historical matrices are copied once into shared memory and every worker
+maps them as NumPy views, so tasks only carry parameter sets. Each finished
+batch is appended to a JSON lines checkpoint by the parent process; a rerun
+with the same checkpoint skips the parameter sets already there. The first
+line of a checkpoint fingerprints the strategy and the data, and a
+checkpoint of another strategy or other data is refused.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from app.config.settings import settings
+from app.utils.vector_backtest_util import VectorBacktestUtil
+
+logger = logging.getLogger(__name__)
+
+Strategy = Callable[[Mapping[str, np.ndarray], Dict[str, Any]], Dict[str, float]]
+
+# (shared memory name, shape, dtype) of each array
+ArrayDescriptors = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+def default_cost_rate() -> float:
+    """Cost per unit of turnover: commission and slippage each way, sell tax on half"""
+    return (settings.BACKTEST_COMMISSION_RATE + settings.BACKTEST_SLIPPAGE_BPS / 10000.0
+            + settings.BACKTEST_SELL_TAX_RATE / 2)
+
+def breakout_strategy(data: Mapping[str, np.ndarray], params: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Volatility breakout of sample/KoreaStockAutoTrade.py on day bars:
+    params k, buy_percent (equity per stock) and target_buy_count (stocks a day)
+    """
+    entered, trade_return, score = VectorBacktestUtil.breakout(
+        data["open_price"], data["high_price"], data["low_price"], data["close_price"], params["k"]
+    )
+    selected = VectorBacktestUtil.top_n(entered, score, int(params["target_buy_count"]))
+    result = VectorBacktestUtil.evaluate(
+        VectorBacktestUtil.weights(selected, float(params["buy_percent"])), trade_return,
+        params.get("cost_rate", default_cost_rate()), intraday=True
+    )
+    return {name: float(result[name]) for name in ["total_return", "max_drawdown", "sharpe", "mean_turnover"]}
+
+# Arrays of the sweep mapped in a worker process (set by the pool initializer)
+_worker_data: Dict[str, np.ndarray] = {}
+_worker_blocks: List[shared_memory.SharedMemory] = []
+
+def _attach_shared(descriptors: ArrayDescriptors):
+    """Pool initializer: map the shared arrays without copying"""
+    for name, (block_name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_blocks.append(block)
+        _worker_data[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+def _run_batch(strategy: Strategy, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Worker task: evaluate a batch of parameter sets on the shared arrays"""
+    return [{"params": params, **strategy(_worker_data, params)} for params in batch]
+
+class SharedArrays:
+    """NumPy arrays copied into named shared memory blocks (owned by the creating process)"""
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        self.blocks: List[shared_memory.SharedMemory] = []
+        self.descriptors: ArrayDescriptors = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self.blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.descriptors[name] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Release and remove the blocks"""
+        for block in self.blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self.blocks = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class RunParamSweep:
+    """Parameter sweep runner"""
+
+    def __init__(
+        self,
+        strategy: Strategy,
+        data: Mapping[str, np.ndarray],
+        checkpoint_file: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.strategy = strategy
+        self.data = data
+        self.checkpoint_file = checkpoint_file or settings.SWEEP_CHECKPOINT_FILE
+        self.max_workers = max_workers or settings.SWEEP_MAX_WORKERS or os.cpu_count() or 1
+        self.batch_size = batch_size or settings.SWEEP_BATCH_SIZE
+        self._fingerprint: Optional[Dict[str, Any]] = None
+        logger.info("RunParamSweep Init...")
+
+    @staticmethod
+    def grid(space: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Every combination of the parameter values"""
+        names = list(space)
+        return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+    @staticmethod
+    def random_search(space: Mapping[str, Any], count: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Random parameter sets: a (low, high) tuple is sampled uniformly (integers when
+        both bounds are int), a list is sampled as choices
+        """
+        rng = random.Random(seed)
+        samples = []
+        for _ in range(count):
+            params = {}
+            for name, values in space.items():
+                if isinstance(values, tuple):
+                    low, high = values
+                    params[name] = (rng.randint(low, high) if isinstance(low, int) and isinstance(high, int)
+                                    else rng.uniform(low, high))
+                else:
+                    params[name] = rng.choice(list(values))
+            samples.append(params)
+        return samples
+
+    @staticmethod
+    def params_key(params: Mapping[str, Any]) -> str:
+        return json.dumps(params, sort_keys=True, default=str)
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """Strategy name and the shape, dtype and content hash of each data array"""
+        if self._fingerprint is None:
+            data = {}
+            for name in sorted(self.data):
+                array = np.ascontiguousarray(self.data[name])
+                data[name] = [list(array.shape), array.dtype.str,
+                              hashlib.blake2b(array.data, digest_size=16).hexdigest()]
+            strategy = f"{getattr(self.strategy, '__module__', '')}.{getattr(self.strategy, '__qualname__', '')}"
+            self._fingerprint = {"strategy": strategy, "data": data}
+        return self._fingerprint
+
+    def load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Results already in the checkpoint file, by parameter key. A line torn by an
+        interruption is cut off so the next append starts on a fresh line. Raises
+        ValueError when the checkpoint belongs to another strategy or other data.
+        """
+        results = {}
+        if not os.path.exists(self.checkpoint_file):
+            return results
+        with open(self.checkpoint_file, "rb+") as file:
+            content = file.read()
+            complete = content.rfind(b"\n") + 1
+            if complete < len(content):
+                file.truncate(complete)
+        lines = content[:complete].splitlines()
+        if not lines:
+            return results
+        try:
+            header = json.loads(lines[0]).get("fingerprint")
+        except (json.JSONDecodeError, AttributeError):
+            header = None
+        if header != self.fingerprint():
+            raise ValueError(f"Checkpoint {self.checkpoint_file} was written for another strategy or other data")
+        for line in lines[1:]:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            results[self.params_key(result["params"])] = result
+        return results
+
+    def _append_checkpoint(self, results: List[Dict[str, Any]]):
+        with open(self.checkpoint_file, "a", encoding="utf-8") as file:
+            if file.tell() == 0:
+                file.write(json.dumps({"fingerprint": self.fingerprint()}) + "\n")
+            file.writelines(json.dumps(result, default=str) + "\n" for result in results)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def run(self, param_sets: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Evaluate every parameter set (skipping checkpointed ones); returns results in input order"""
+        done = self.load_checkpoint()
+        pending = [params for params in param_sets if self.params_key(params) not in done]
+        logger.info(f"Parameter sweep : {len(param_sets)} sets, {len(param_sets) - len(pending)} checkpointed, "
+                    f"{len(pending)} to run on {self.max_workers} workers")
+        if pending:
+            try:
+                self._run_pending(pending, done)
+            except Exception as e:
+                logger.error(f"Error running parameter sweep: {e}")
+                raise
+        return [done[self.params_key(params)] for params in param_sets]
+
+    def _run_pending(self, pending: List[Dict[str, Any]], done: Dict[str, Dict[str, Any]]):
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        with SharedArrays(self.data) as shared, ProcessPoolExecutor(
+            max_workers=self.max_workers, initializer=_attach_shared, initargs=(shared.descriptors,)
+        ) as executor:
+            # Keep a bounded window of batches in flight so results stream into the checkpoint
+            queue = iter(batches)
+            running = {executor.submit(_run_batch, self.strategy, batch)
+                       for batch in itertools.islice(queue, self.max_workers * 2)}
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    results = future.result()
+                    self._append_checkpoint(results)
+                    done.update((self.params_key(result["params"]), result) for result in results)
+                    batch = next(queue, None)
+                    if batch is not None:
+                        running.add(executor.submit(_run_batch, self.strategy, batch))
+
+    @staticmethod
+    def best(results: Sequence[Dict[str, Any]], metric: str = "sharpe") -> Optional[Dict[str, Any]]:
+        """Result with the highest metric"""
+        return max(results, key=lambda result: result[metric], default=None)
@@ -12,6 +12,9 @@ from app.controllers.krinvest import router as krinvest_router
 from app.controllers.sa import router as sa_router
 from app.config.database import init_db
 from app.config.settings import settings
+from app.utils import WebClientUtil
+from app.services.sa.sa_stat_minute_service import SaStatMinuteService
+from app.services.service_registry import ServiceRegistry
 import logging
 
 # Configure logging
@@ -41,13 +44,33 @@ app.add_middleware(
 async def startup_event():
     """Initialize application on startup"""
     logger.info("Starting PyStockAuto application...")
+    WebClientUtil.init_client(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        timeout=settings.HTTP_TIMEOUT,
+        http2=settings.HTTP_HTTP2
+    )
     await init_db()
     logger.info("Database initialized successfully")
+    ServiceRegistry.init()
+    try:
+        await ServiceRegistry.kr_inv_oauth_service.init_auth_info()
+    except Exception as e:
+        logger.error(f"Error loading auth info: {e}")
+    ServiceRegistry.kr_inv_token_manager.start()
+    SaStatMinuteService.load_state()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up on shutdown"""
     logger.info("Shutting down PyStockAuto application...")
+    if ServiceRegistry.kr_inv_token_manager is not None:
+        await ServiceRegistry.kr_inv_token_manager.stop()
+    if ServiceRegistry.kr_inv_order_pipeline is not None:
+        await ServiceRegistry.kr_inv_order_pipeline.stop()
+    SaStatMinuteService.save_state()
+    await WebClientUtil.close_client()
 
 # Include routers
 app.include_router(hello_router, prefix="/api", tags=["hello"])
@@ -4,7 +4,7 @@ Database Models
 This module contains all SQLAlchemy models converted from Kotlin entities.
 """
 
-from sqlalchemy import Column, String, DateTime, Integer, Float, Text, Boolean
+from sqlalchemy import Column, String, DateTime, Integer, Float, Text, Boolean, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -26,6 +26,9 @@ class StockCode(Base):
 class StockList(Base):
     """Stock List Entity - converted from StockListEntity.kt"""
     __tablename__ = "stock_list"
+    __table_args__ = (
+        UniqueConstraint("stock_code", name="uk_stock_list_stock_code"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     stock_code = Column(String(20), nullable=False)
@@ -67,6 +70,9 @@ class AccountInfo(Base):
 class OrderHistory(Base):
     """Order History Entity - converted from OrderHistoryEntity.kt"""
     __tablename__ = "order_history"
+    __table_args__ = (
+        Index("idx_order_history_stock_code_order_type", "stock_code", "order_type"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     order_id = Column(String(50), unique=True, nullable=False)
@@ -113,6 +119,10 @@ class SearchLog(Base):
 class MinuteData(Base):
     """Minute Data Entity - converted from MinuteDataEntity.kt"""
     __tablename__ = "minute_data"
+    __table_args__ = (
+        UniqueConstraint("stock_code", "date_time", name="uk_minute_data_stock_code_date_time"),
+        Index("idx_minute_data_date_time", "date_time"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     stock_code = Column(String(20), nullable=False)
@@ -126,6 +136,9 @@ class MinuteData(Base):
 class AskingPrice(Base):
     """Asking Price Entity - converted from AskingPriceEntity.kt"""
     __tablename__ = "asking_price"
+    __table_args__ = (
+        Index("idx_asking_price_stock_code_timestamp", "stock_code", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     stock_code = Column(String(20), nullable=False)
@@ -138,6 +151,9 @@ class AskingPrice(Base):
 class DayStatEntity(Base):
     """Day Statistics Entity - converted from DayStatEntity.kt"""
     __tablename__ = "day_stat"
+    __table_args__ = (
+        UniqueConstraint("stock_code", "tr_date", name="uk_day_stat_stock_code_tr_date"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     stock_code = Column(String(20), nullable=False)
@@ -152,6 +168,9 @@ class DayStatEntity(Base):
 class MinuteStat(Base):
     """Minute Statistics Entity - converted from MinuteStatEntity.kt"""
     __tablename__ = "minute_stat"
+    __table_args__ = (
+        Index("idx_minute_stat_stock_code_tr_date_tr_time", "stock_code", "tr_date", "tr_time"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     stock_code = Column(String(20), nullable=False)
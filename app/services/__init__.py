@@ -7,5 +7,6 @@ This module contains business logic services converted from Kotlin services.
 from .stock_service import StockService
 from .auth_service import AuthService
 from .order_service import OrderService
+from .service_registry import ServiceRegistry
 
-__all__ = ["StockService", "AuthService", "OrderService"]
+__all__ = ["StockService", "AuthService", "OrderService", "ServiceRegistry"]
@@ -7,5 +7,9 @@ Services for Korea Investment securities API integration.
 from .kr_inv_oauth_service import KrInvOauthService
 from .kr_inv_inq_service import KrInvInqService
 from .kr_inv_ord_service import KrInvOrdService
+from .kr_inv_ws_service import KrInvWsService
+from .kr_inv_token_manager import KrInvTokenManager
+from .kr_inv_order_pipeline import KrInvOrderPipeline
 
-__all__ = ["KrInvOauthService", "KrInvInqService", "KrInvOrdService"]
+__all__ = ["KrInvOauthService", "KrInvInqService", "KrInvOrdService", "KrInvWsService", "KrInvTokenManager",
+           "KrInvOrderPipeline"]
@@ -5,12 +5,17 @@ Converted from KrInvInqService.kt
 Handles stock inquiry operations through Korea Investment API.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, TYPE_CHECKING
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 from sqlalchemy.orm import Session
+from app.config.settings import settings
 from app.models import AuthInfo, StockCode
 from app.utils import WebClientUtil, JsonUtil
 from app.common.kr_auth_info import KrAuthInfo
+from app.common.kr_rate_limiter import KrRateLimiter
+from app.common.quote_cache import QuoteCache
+from app.common.market_calendar import MarketCalendar
 
 if TYPE_CHECKING:
     from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
@@ -20,26 +25,48 @@ logger = logging.getLogger(__name__)
 class KrInvInqService:
     """Korea Investment Inquiry Service - converted from KrInvInqService.kt"""
     
-    def __init__(self, db_session: Session):
+    # Quote cache shared by all instances; concurrent identical requests are sent once
+    quote_cache = QuoteCache(settings.QUOTE_CACHE_TTL_MS, settings.QUOTE_CACHE_MAX_SIZE)
+    
+    def __init__(
+        self, db_session: Optional[Session] = None,
+        kr_inv_oauth_service: Optional["KrInvOauthService"] = None
+    ):
         self.db = db_session
-        # Dynamic import to avoid circular dependency
-        from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
-        self.kr_inv_oauth_service = KrInvOauthService(db_session)
+        if kr_inv_oauth_service is None:
+            # Dynamic import to avoid circular dependency
+            from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
+            kr_inv_oauth_service = KrInvOauthService(db_session)
+        self.kr_inv_oauth_service = kr_inv_oauth_service
         self.is_biz_day = False
         logger.info("KoreaInvestInquireService Init ........")
         self._set_biz_date_yn()
     
-    async def api_inquire_price(self, stock_code: str, debug: bool = False) -> Dict[str, Any]:
+    async def api_inquire_price(
+        self, stock_code: str, debug: bool = False, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Domestic stock quote > Current stock price quote
         국내주식시세 > 주식현재가 시세
         """
-        auth_info_entity = KrAuthInfo.next()
+        if not use_cache:
+            return await self._api_inquire_price(stock_code, debug)
+        
+        return await self.quote_cache.get_or_load(
+            stock_code,
+            lambda: self._api_inquire_price(stock_code, debug),
+            cacheable=lambda response: "error" not in response
+        )
+    
+    async def _api_inquire_price(self, stock_code: str, debug: bool = False) -> Dict[str, Any]:
+        """Current stock price quote request (uncached)"""
+        auth_info_entity = KrAuthInfo.next(KrRateLimiter.QUOTATION)
         
         uri = "/uapi/domestic-stock/v1/quotations/inquire-price"
-        url = f"{auth_info_entity.domain}{uri}"
+        url = f"{KrAuthInfo.get_base_url(auth_info_entity)}{uri}"
         
-        headers = self._get_default_headers(auth_info_entity, "FHKST01010100")
+        tr_id = "FHKST01010100"
+        headers = self._get_default_headers(auth_info_entity, tr_id)
         
         parameters = {
             "FID_COND_MRKT_DIV_CODE": "J",  # J: Stock, ETF, ETN
@@ -47,12 +74,12 @@ class KrInvInqService:
         }
         
         try:
-            response = await WebClientUtil.api_get_send(url, headers, parameters)
+            async with KrAuthInfo.lease(auth_info_entity):
+                await KrRateLimiter.acquire(auth_info_entity, tr_id)
+                result = await WebClientUtil.get_request(url, headers=headers, params=parameters)
             
             if debug:
-                logger.info(f"API Response: {response}")
-            
-            result = JsonUtil.get_json_object_as_dict(response)
+                logger.info(f"API Response: {result}")
             
             if self._is_success_response(result):
                 return result
@@ -64,6 +91,55 @@ class KrInvInqService:
             logger.error(f"Exception in api_inquire_price: {e}")
             return {"error": str(e)}
     
+    async def inquire_prices(self, stock_codes: List[str], concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Domestic stock quote > Current stock price quote for many stocks
+        국내주식시세 > 주식현재가 시세 (다종목 일괄 조회)
+        
+        Requests fan out concurrently across app keys (bounded by concurrency) and
+        the result is columnar: parallel lists indexed by position in "stock_code".
+        """
+        codes = list(dict.fromkeys(stock_codes))
+        semaphore = asyncio.Semaphore(concurrency or settings.KI_INQUIRE_CONCURRENCY)
+        
+        async def fetch(stock_code: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.api_inquire_price(stock_code)
+        
+        responses = await asyncio.gather(*(fetch(code) for code in codes))
+        
+        result = {
+            "stock_code": [],
+            "price": [],
+            "open_price": [],
+            "volume": [],
+            "change": [],
+            "change_rate": [],
+            "errors": {}
+        }
+        for stock_code, response in zip(codes, responses):
+            output = response.get("output")
+            if "error" in response or not output:
+                result["errors"][stock_code] = response.get("error", "No output")
+                continue
+            try:
+                row = (
+                    int(output["stck_prpr"]),
+                    int(output["stck_oprc"]),
+                    int(output["acml_vol"]),
+                    int(output["prdy_vrss"]),
+                    float(output["prdy_ctrt"])
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                result["errors"][stock_code] = f"Invalid output: {e}"
+                continue
+            
+            result["stock_code"].append(stock_code)
+            for column, value in zip(("price", "open_price", "volume", "change", "change_rate"), row):
+                result[column].append(value)
+        
+        return result
+    
     def _get_default_headers(self, auth_info: AuthInfo, tr_id: str) -> Dict[str, str]:
         """Get default headers for API requests"""
         return {
@@ -75,13 +151,19 @@ class KrInvInqService:
             "custtype": "P"  # P: Personal, B: Business
         }
     
+    @staticmethod
+    def get_current_price(response: Dict[str, Any]) -> Optional[int]:
+        """Get the current price (stck_prpr) from an inquire-price response"""
+        try:
+            return int(response["output"]["stck_prpr"])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
     def _is_success_response(self, response: Dict[str, Any]) -> bool:
         """Check if the API response indicates success"""
         return response.get("rt_cd") == "0"
     
     def _set_biz_date_yn(self):
         """Set business date flag"""
-        # This would typically check if today is a business day
-        # For now, we'll assume it's always a business day
-        self.is_biz_day = True
+        self.is_biz_day = MarketCalendar.get("KRX").is_business_day()
         logger.info(f"Business day flag set to: {self.is_biz_day}")
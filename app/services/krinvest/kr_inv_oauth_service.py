@@ -5,6 +5,7 @@ Converted from KrInvOauthService.kt
 Handles authentication and token management for Korea Investment API.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
@@ -12,22 +13,30 @@ from sqlalchemy.orm import Session
 from app.models import AuthInfo
 from app.utils import DateUtil, WebClientUtil, JsonUtil
 from app.common.kr_auth_info import KrAuthInfo
-from app.services.sa.sa_db_service import SaDbService
+from app.common.single_flight import SingleFlight
+from app.exceptions import BizRuntimeException
+from app.services.krinvest.kr_inv_token_manager import KrInvTokenManager
+from app.services.sa.async_sa_db_service import create_sa_db_service
 
 logger = logging.getLogger(__name__)
 
 class KrInvOauthService:
     """Korea Investment OAuth Service - converted from KrInvOauthService.kt"""
     
-    def __init__(self, db_session: Session):
+    # Access token requests in progress by app key, shared by every instance
+    _token_requests = SingleFlight()
+    
+    def __init__(self, db_session: Optional[Session] = None):
         self.db = db_session
-        self.sa_db_service = SaDbService(db_session)
+        self.sa_db_service = create_sa_db_service(db_session)
         logger.info("KoreaInvestOauthService Init ........")
-        
-        # Initialize auth info
-        auth_info_list = self.sa_db_service.find_all_auth_info_with_account()
+    
+    async def init_auth_info(self) -> int:
+        """Load auth info with accounts and issue their access tokens (application startup)"""
+        auth_info_list = await self.sa_db_service.find_all_auth_info_with_account()
         KrAuthInfo.set_auth_info_list(auth_info_list)
-        self._validate_auth_info(KrAuthInfo.list_auth_info)
+        await self._validate_auth_info(KrAuthInfo.list_auth_info)
+        return len(auth_info_list)
     
     async def api_oauth2_approval(self, auth_info_entity: AuthInfo = None) -> str:
         """
@@ -37,79 +46,101 @@ class KrInvOauthService:
         if auth_info_entity is None:
             auth_info_entity = KrAuthInfo.next()
         
-        current_time = DateUtil.get_current_datetime_string()
-        
-        if auth_info_entity.access_token_expired_date < current_time:
-            logger.info(f"authInfoEntity approval : {auth_info_entity.account_number} {auth_info_entity.approval_key}")
-            
-            uri = "/oauth2/Approval"
-            
-            headers = {
-                "content-type": "application/json"
-            }
-            
-            req_body = {
-                "grant_type": "client_credentials",
-                "appkey": auth_info_entity.app_key,
-                "secretkey": auth_info_entity.app_secret
-            }
-            
-            base_url = KrAuthInfo.get_base_url(auth_info_entity)
-            response = await WebClientUtil.post_request(
-                f"{base_url}{uri}",
-                data=req_body,
-                headers=headers
-            )
-            
-            logger.info(f"approval response: {response}")
-            
-            auth_info_entity.approval_key = response.get("approval_key", "")
-            
-            # Update entity
-            updated_auth_info = await self.sa_db_service.save_auth_info(auth_info_entity)
-            logger.info(f"authInfo approval : {updated_auth_info.account_number} {updated_auth_info.approval_key}")
-        
-        return auth_info_entity.approval_key
+        approval_key = KrInvTokenManager.get_approval_key(auth_info_entity)
+        if approval_key:
+            return approval_key
+        return await self.issue_approval_key(auth_info_entity)
+    
+    async def issue_approval_key(self, auth_info_entity: AuthInfo) -> str:
+        """Request a new approval key and save it"""
+        logger.info(f"authInfoEntity approval : {auth_info_entity.account_number} {auth_info_entity.approval_key}")
+        
+        uri = "/oauth2/Approval"
+        
+        headers = {
+            "content-type": "application/json"
+        }
+        
+        req_body = {
+            "grant_type": "client_credentials",
+            "appkey": auth_info_entity.app_key,
+            "secretkey": auth_info_entity.app_secret
+        }
+        
+        base_url = KrAuthInfo.get_base_url(auth_info_entity)
+        response = await WebClientUtil.post_request(
+            f"{base_url}{uri}",
+            data=req_body,
+            headers=headers
+        )
+        
+        logger.info(f"approval response: {response}")
+        
+        approval_key = response.get("approval_key", "")
+        if not approval_key:
+            raise BizRuntimeException(f"Approval key not issued : {response}")
+        auth_info_entity.approval_key = approval_key
+        KrInvTokenManager.cache_approval_key(auth_info_entity)
+        
+        # Update entity
+        updated_auth_info = await self.sa_db_service.save_auth_info(auth_info_entity)
+        logger.info(f"authInfo approval : {updated_auth_info.account_number} {updated_auth_info.approval_key}")
+        
+        return approval_key
     
     async def api_oauth2_token(self, auth_info_entity: AuthInfo) -> str:
         """
         Access token issuance
         접근토큰 발급
         """
-        current_time = DateUtil.get_current_datetime_string()
-        
-        if auth_info_entity.access_token_expired_date < current_time:
-            logger.info(f"authInfoEntity token : {auth_info_entity.account_number} "
-                       f"{auth_info_entity.access_token_expired_date} {auth_info_entity.access_token}")
-            
-            uri = "/oauth2/tokenP"
-            
-            headers = {
-                "content-type": "application/json; charset=UTF-8"
-            }
-            
-            req_body = {
-                "grant_type": "client_credentials",
-                "appkey": auth_info_entity.app_key,
-                "appsecret": auth_info_entity.app_secret
-            }
-            
-            base_url = KrAuthInfo.get_base_url(auth_info_entity)
-            response = await WebClientUtil.post_request(
-                f"{base_url}{uri}",
-                data=req_body,
-                headers=headers
-            )
-            
-            auth_info_entity.access_token = response.get("access_token", "")
-            auth_info_entity.access_token_expired_date = response.get("access_token_token_expired", "")
-            
-            # Update entity
-            updated_auth_info = await self.sa_db_service.save_auth_info(auth_info_entity)
-            logger.info(f"authInfo token : {updated_auth_info.account_number} "
-                       f"{updated_auth_info.access_token_expired_date} {updated_auth_info.access_token}")
-        
-        return auth_info_entity.access_token
+        # Refreshed ahead of expiry by KrInvTokenManager; issued inline only when missing
+        access_token = KrInvTokenManager.get_access_token(auth_info_entity)
+        if access_token:
+            return access_token
+        return await self.issue_access_token(auth_info_entity)
+    
+    async def issue_access_token(self, auth_info_entity: AuthInfo) -> str:
+        """Request a new access token and save it (concurrent callers of a key share one request)"""
+        return await KrInvOauthService._token_requests.do(
+            auth_info_entity.app_key, lambda: self._issue_access_token(auth_info_entity)
+        )
+    
+    async def _issue_access_token(self, auth_info_entity: AuthInfo) -> str:
+        logger.info(f"authInfoEntity token : {auth_info_entity.account_number} "
+                   f"{auth_info_entity.access_token_expired_date}")
+        
+        uri = "/oauth2/tokenP"
+        
+        headers = {
+            "content-type": "application/json; charset=UTF-8"
+        }
+        
+        req_body = {
+            "grant_type": "client_credentials",
+            "appkey": auth_info_entity.app_key,
+            "appsecret": auth_info_entity.app_secret
+        }
+        
+        base_url = KrAuthInfo.get_base_url(auth_info_entity)
+        response = await WebClientUtil.post_request(
+            f"{base_url}{uri}",
+            data=req_body,
+            headers=headers
+        )
+        
+        access_token = response.get("access_token", "")
+        if not access_token:
+            raise BizRuntimeException(f"Access token not issued : {response}")
+        auth_info_entity.access_token = access_token
+        auth_info_entity.access_token_expired_date = response.get("access_token_token_expired", "")
+        KrInvTokenManager.cache_token(auth_info_entity)
+        
+        # Update entity
+        updated_auth_info = await self.sa_db_service.save_auth_info(auth_info_entity)
+        logger.info(f"authInfo token : {updated_auth_info.account_number} "
+                   f"{updated_auth_info.access_token_expired_date}")
+        
+        return access_token
     
     async def api_revoke_token(self, auth_info_entity: AuthInfo) -> str:
         """
@@ -130,6 +161,7 @@ class KrInvOauthService:
         
         auth_info_entity.access_token = ""
         auth_info_entity.access_token_expired_date = ""
+        KrInvTokenManager.cache_token(auth_info_entity)
         
         await self.sa_db_service.save_auth_info(auth_info_entity)
         
@@ -143,7 +175,12 @@ class KrInvOauthService:
         return response.get("msg1", "")
     
     async def _validate_auth_info(self, auth_info_list: List[AuthInfo]):
-        """Validate authentication information for all accounts"""
+        """Cache the stored tokens and issue missing / expired ones concurrently"""
         for auth_info in auth_info_list:
-            await self.api_oauth2_token(auth_info)
-            # await self.api_oauth2_approval(auth_info)
+            KrInvTokenManager.cache_token(auth_info)
+        results = await asyncio.gather(
+            *(self.api_oauth2_token(auth_info) for auth_info in auth_info_list), return_exceptions=True
+        )
+        for auth_info, result in zip(auth_info_list, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error issuing token of {auth_info.account_number}: {result}")
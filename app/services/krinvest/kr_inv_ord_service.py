@@ -5,12 +5,18 @@ Converted from KrInvOrdService.kt
 Handles stock order operations through Korea Investment API.
 """
 
+import asyncio
+import json
 import logging
 from typing import Dict, Any, Optional, TYPE_CHECKING
 from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.exceptions import BizRuntimeException
 from app.models import AuthInfo
 from app.utils import WebClientUtil, JsonUtil
 from app.common.kr_auth_info import KrAuthInfo
+from app.common.kr_rate_limiter import KrRateLimiter
+from app.common.quote_cache import QuoteCache
 
 if TYPE_CHECKING:
     from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
@@ -20,11 +26,20 @@ logger = logging.getLogger(__name__)
 class KrInvOrdService:
     """Korea Investment Order Service - converted from KrInvOrdService.kt"""
     
-    def __init__(self, db_session: Session):
+    # Hashkeys by (app key, order body), shared by every instance (LRU, no expiry);
+    # concurrent requests for the same body are sent once
+    _hashkeys = QuoteCache(None, settings.KI_HASHKEY_CACHE_SIZE)
+    
+    def __init__(
+        self, db_session: Optional[Session] = None,
+        kr_inv_oauth_service: Optional["KrInvOauthService"] = None
+    ):
         self.db = db_session
-        # Dynamic import to avoid circular dependency
-        from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
-        self.kr_inv_oauth_service = KrInvOauthService(db_session)
+        if kr_inv_oauth_service is None:
+            # Dynamic import to avoid circular dependency
+            from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
+            kr_inv_oauth_service = KrInvOauthService(db_session)
+        self.kr_inv_oauth_service = kr_inv_oauth_service
         logger.info("koreaInvestOrderService Init ........")
     
     async def order_cash_sell_by_market_price(
@@ -60,6 +75,19 @@ class KrInvOrdService:
             auth_info_entity, "0802U", stock_code, stock_qty, "0", "01"
         )
     
+    @staticmethod
+    def _order_cash_body(
+        auth_info_entity: AuthInfo, stock_code: str, stock_qty: str, stock_price: str, ord_dvsn: str
+    ) -> Dict[str, Any]:
+        return {
+            "CANO": auth_info_entity.account_number[:8],
+            "ACNT_PRDT_CD": auth_info_entity.account_number[8:],
+            "PDNO": stock_code,
+            "ORD_DVSN": ord_dvsn,  # 00:지정가, 01:시장가, 05:장전 시간외, 06:장후 시간외, 07:시간외 단일가
+            "ORD_QTY": stock_qty,
+            "ORD_UNPR": stock_price
+        }
+    
     async def _api_order_cash(
         self,
         auth_info_entity: AuthInfo,
@@ -74,36 +102,96 @@ class KrInvOrdService:
         국내주식주문 > 주식주문(현금)
         """
         uri = "/uapi/domestic-stock/v1/trading/order-cash"
+        req_body = self._order_cash_body(auth_info_entity, stock_code, stock_qty, stock_price, ord_dvsn)
         
+        # The hashkey round trip runs while the token is read and the rate budget is awaited
+        hashkey_task = (asyncio.ensure_future(self.api_hashkey(auth_info_entity, req_body))
+                        if settings.KI_ORDER_HASHKEY else None)
+        try:
+            headers = {
+                "content-type": "application/json; charset=UTF-8",
+                "appkey": auth_info_entity.app_key,
+                "appsecret": auth_info_entity.app_secret,
+                "authorization": f"Bearer {await self.kr_inv_oauth_service.api_oauth2_token(auth_info_entity)}",
+                "tr_id": f"{KrAuthInfo.get_tr_id(auth_info_entity)}{order_id}"
+            }
+            
+            base_url = KrAuthInfo.get_base_url(auth_info_entity)
+            async with KrAuthInfo.lease(auth_info_entity):
+                await KrRateLimiter.acquire(auth_info_entity, headers["tr_id"])
+                if hashkey_task is not None:
+                    try:
+                        headers["hashkey"] = await hashkey_task
+                    except Exception as e:
+                        # The hashkey is optional for the broker: send the order without it
+                        logger.error(f"Error issuing order hashkey, sending without it: {e}")
+                response = await WebClientUtil.post_request(
+                    f"{base_url}{uri}",
+                    data=req_body,
+                    headers=headers
+                )
+        finally:
+            if hashkey_task is not None:
+                if not hashkey_task.done():
+                    hashkey_task.cancel()
+                elif not hashkey_task.cancelled():
+                    # Retrieved so a failure left behind by an early error is not logged as never retrieved
+                    hashkey_task.exception()
+        
+        return response
+    
+    async def api_hashkey(self, auth_info_entity: AuthInfo, req_body: Dict[str, Any]) -> str:
+        """
+        Hashkey of a request body (cached per app key and body; concurrent
+        requests for the same body share one call)
+        해쉬키 발급
+        """
+        key = (auth_info_entity.app_key, json.dumps(req_body, sort_keys=True, ensure_ascii=False))
+        return await KrInvOrdService._hashkeys.get_or_load(
+            key, lambda: self._issue_hashkey(auth_info_entity, req_body)
+        )
+    
+    async def _issue_hashkey(self, auth_info_entity: AuthInfo, req_body: Dict[str, Any]) -> str:
+        """Hashkey request (uncached)"""
         headers = {
             "content-type": "application/json; charset=UTF-8",
             "appkey": auth_info_entity.app_key,
-            "appsecret": auth_info_entity.app_secret,
-            "authorization": f"Bearer {await self.kr_inv_oauth_service.api_oauth2_token(auth_info_entity)}",
-            "tr_id": f"{KrAuthInfo.get_tr_id(auth_info_entity)}{order_id}"
+            "appsecret": auth_info_entity.app_secret
         }
-        
-        req_body = {
-            "CANO": auth_info_entity.account_number[:8],
-            "ACNT_PRDT_CD": auth_info_entity.account_number[8:],
-            "PDNO": stock_code,
-            "ORD_DVSN": ord_dvsn,  # 00:지정가, 01:시장가, 05:장전 시간외, 06:장후 시간외, 07:시간외 단일가
-            "ORD_QTY": stock_qty,
-            "ORD_UNPR": stock_price
-        }
-        
-        base_url = KrAuthInfo.get_base_url(auth_info_entity)
-        response = await WebClientUtil.post_request(
-            f"{base_url}{uri}",
-            data=req_body,
-            headers=headers
+        try:
+            response = await WebClientUtil.post_request(
+                f"{KrAuthInfo.get_base_url(auth_info_entity)}/uapi/hashkey",
+                data=req_body,
+                headers=headers
+            )
+        except Exception as e:
+            logger.error(f"Error issuing hashkey: {e}")
+            raise
+        hashkey = response.get("HASH") if response else None
+        if not hashkey:
+            logger.error(f"Hashkey not issued : {response}")
+            raise BizRuntimeException(f"Hashkey not issued : {response}")
+        return hashkey
+    
+    async def precompute_order_hashkey(
+        self, auth_info_entity: AuthInfo, stock_code: str, stock_qty: str,
+        stock_price: str = "0", ord_dvsn: str = "01"
+    ) -> Optional[str]:
+        """Issue the hashkey of a cash order ahead of sending it (None when hashkeys are off)"""
+        if not settings.KI_ORDER_HASHKEY:
+            return None
+        return await self.api_hashkey(
+            auth_info_entity, self._order_cash_body(auth_info_entity, stock_code, stock_qty, stock_price, ord_dvsn)
         )
-        
-        return response
+    
+    @classmethod
+    def reset_hashkeys(cls):
+        """Forget cached hashkeys (and pick up the current cache size)"""
+        cls._hashkeys = QuoteCache(None, settings.KI_HASHKEY_CACHE_SIZE)
     
     async def order_cancel(
         self, auth_info_entity: AuthInfo, order_num: str
-    ) -> str:
+    ) -> Dict[str, Any]:
         """
         Domestic stock order > Order cancel
         국내주식주문 > 주식 정정 취소 주문
@@ -131,13 +219,15 @@ class KrInvOrdService:
         }
         
         base_url = KrAuthInfo.get_base_url(auth_info_entity)
-        response = await WebClientUtil.post_request(
-            f"{base_url}{uri}",
-            data=req_body,
-            headers=headers
-        )
+        async with KrAuthInfo.lease(auth_info_entity):
+            await KrRateLimiter.acquire(auth_info_entity, headers["tr_id"])
+            response = await WebClientUtil.post_request(
+                f"{base_url}{uri}",
+                data=req_body,
+                headers=headers
+            )
         
-        return str(response)
+        return response
     
     async def api_inquire_balance(self, auth_info_entity: AuthInfo) -> Dict[str, Any]:
         """
@@ -169,11 +259,13 @@ class KrInvOrdService:
         }
         
         base_url = KrAuthInfo.get_base_url(auth_info_entity)
-        response = await WebClientUtil.get_request(
-            f"{base_url}{uri}",
-            headers=headers,
-            params=params
-        )
+        async with KrAuthInfo.lease(auth_info_entity):
+            await KrRateLimiter.acquire(auth_info_entity, headers["tr_id"])
+            response = await WebClientUtil.get_request(
+                f"{base_url}{uri}",
+                headers=headers,
+                params=params
+            )
         
         return response
     
@@ -213,10 +305,12 @@ class KrInvOrdService:
         }
         
         base_url = KrAuthInfo.get_base_url(auth_info_entity)
-        response = await WebClientUtil.get_request(
-            f"{base_url}{uri}",
-            headers=headers,
-            params=params
-        )
+        async with KrAuthInfo.lease(auth_info_entity):
+            await KrRateLimiter.acquire(auth_info_entity, headers["tr_id"])
+            response = await WebClientUtil.get_request(
+                f"{base_url}{uri}",
+                headers=headers,
+                params=params
+            )
         
         return response
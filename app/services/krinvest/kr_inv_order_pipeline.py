@@ -0,0 +1,357 @@
+"""
+Korea Investment Order Pipeline
+
+Cash orders go through one asyncio queue per account, so the orders of an
+account reach the broker in submission order while accounts run in
+parallel. Each order carries a client idempotency key: a retried submit
+with the same key returns the first outcome instead of ordering again.
+Accepted orders are kept in an in-flight table by broker order number
+until the execution inquiry (inquire-ccnl, polled while orders are in
+flight) reports them filled or cancelled. State transitions are written to
+order_history by a background writer (latest state per order, batched), so
+submit latency is the broker round trip only and never waits on the database
+(on the sync data path the writes run on a worker thread with their own
+Session).
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.exceptions import BizRuntimeException
+from app.models import AuthInfo, OrderHistory
+from app.services.krinvest.kr_inv_ord_service import KrInvOrdService
+from app.services.sa.async_sa_db_service import create_sa_db_service
+from app.services.sa.sa_db_service import SaDbService, ORDER_HISTORY_COLUMNS, ORDER_HISTORY_KEY
+from app.utils import CommUtil
+
+logger = logging.getLogger(__name__)
+
+class PipelineOrder:
+    """Order tracked by the pipeline"""
+
+    QUEUED = "QUEUED"
+    SUBMITTED = "SUBMITTED"
+    ACCEPTED = "ACCEPTED"      # broker returned an order number; in flight
+    REJECTED = "REJECTED"      # broker answered with an error code
+    ERROR = "ERROR"            # no broker answer (transport error)
+    EXECUTED = "EXECUTED"
+    CANCELLED = "CANCELLED"
+
+    def __init__(
+        self, idempotency_key: str, auth_info_entity: AuthInfo, order_type: str,
+        stock_code: str, stock_qty: str, stock_price: str, ord_dvsn: str
+    ):
+        self.idempotency_key = idempotency_key
+        self.auth_info_entity = auth_info_entity
+        self.order_type = order_type
+        self.stock_code = stock_code
+        self.stock_qty = stock_qty
+        self.stock_price = stock_price
+        self.ord_dvsn = ord_dvsn
+        self.status = self.QUEUED
+        self.order_no: Optional[str] = None
+        self.response: Optional[Dict[str, Any]] = None
+        self.order_time = datetime.now()
+        self.execution_time: Optional[datetime] = None
+        self.done: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+
+    def same_request(self, order_type: str, stock_code: str, stock_qty: str, stock_price: str, ord_dvsn: str) -> bool:
+        return (self.order_type, self.stock_code, str(self.stock_qty), str(self.stock_price), self.ord_dvsn) == \
+            (order_type, stock_code, str(stock_qty), str(stock_price), ord_dvsn)
+
+    def to_history(self) -> Dict[str, Any]:
+        """order_history row of the current state"""
+        return {
+            "order_id": self.idempotency_key,
+            "stock_code": self.stock_code,
+            "order_type": self.order_type,
+            "quantity": int(self.stock_qty),
+            "price": float(self.stock_price or 0),
+            "status": self.status,
+            "order_time": self.order_time,
+            "execution_time": self.execution_time
+        }
+
+class KrInvOrderPipeline:
+    """Korea Investment Order Pipeline - per-account order queues with idempotency and async persistence"""
+
+    # Order type -> order-cash tr_id suffix
+    TR_ID_SUFFIX = {"BUY": "0802U", "SELL": "0801U"}
+
+    def __init__(
+        self,
+        kr_inv_ord_service: KrInvOrdService,
+        db_session: Optional[Union[Session, AsyncSession]] = None,
+        idempotency_ttl: Optional[float] = None
+    ):
+        self.kr_inv_ord_service = kr_inv_ord_service
+        self.sa_db_service = create_sa_db_service(db_session)
+        # Sync data path: history writes run on a worker thread with sessions of this factory
+        self._session_factory = self._sync_session_factory(db_session)
+        self.idempotency_ttl = settings.ORDER_IDEMPOTENCY_TTL if idempotency_ttl is None else idempotency_ttl
+        self._orders: "OrderedDict[str, PipelineOrder]" = OrderedDict()  # idempotency key -> order
+        self._in_flight: Dict[str, PipelineOrder] = {}  # broker order number -> order
+        self._queues: Dict[str, "asyncio.Queue[PipelineOrder]"] = {}
+        self._workers: Dict[str, "asyncio.Task[None]"] = {}
+        self._unsaved: Dict[str, PipelineOrder] = {}
+        self._unsaved_event: Optional[asyncio.Event] = None
+        self._write_lock = asyncio.Lock()
+        self._writer: Optional["asyncio.Task[None]"] = None
+        self._poller: Optional["asyncio.Task[None]"] = None
+        self._hashkey_tasks: Set["asyncio.Task[None]"] = set()
+        logger.info("KoreaInvestOrderPipeline Init ........")
+
+    async def submit(
+        self,
+        auth_info_entity: AuthInfo,
+        order_type: str,
+        stock_code: str,
+        stock_qty: str,
+        stock_price: str = "0",
+        ord_dvsn: str = "01",
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a cash order and wait for the broker response
+        (the first response again for a known idempotency key)
+        """
+        if order_type not in self.TR_ID_SUFFIX:
+            raise BizRuntimeException(f"Unknown order type : {order_type}")
+        self.start()
+        self._prune()
+        key = idempotency_key or CommUtil.generate_request_id()
+        order = self._orders.get(key)
+        if order is not None:
+            if not order.same_request(order_type, stock_code, stock_qty, stock_price, ord_dvsn):
+                raise BizRuntimeException(f"Idempotency key reused for a different order : {key}")
+            logger.info(f"Duplicate order submission {key} ({order.status})")
+        else:
+            order = PipelineOrder(key, auth_info_entity, order_type, stock_code, stock_qty, stock_price, ord_dvsn)
+            self._orders[key] = order
+            self._record(order)
+            self._queue(auth_info_entity.account_number).put_nowait(order)
+            if settings.KI_ORDER_HASHKEY:
+                # Issued while the order waits behind earlier orders of the account
+                task = asyncio.ensure_future(self._warm_hashkey(order))
+                self._hashkey_tasks.add(task)
+                task.add_done_callback(self._hashkey_tasks.discard)
+        # Shielded: a caller giving up does not cancel the order for other waiters
+        return await asyncio.shield(order.done)
+
+    def _queue(self, account_number: str) -> "asyncio.Queue[PipelineOrder]":
+        queue = self._queues.get(account_number)
+        if queue is None:
+            queue = self._queues[account_number] = asyncio.Queue()
+            self._workers[account_number] = asyncio.ensure_future(self._run_account(queue))
+        return queue
+
+    async def _run_account(self, queue: "asyncio.Queue[PipelineOrder]"):
+        """Send the orders of one account one at a time"""
+        while True:
+            order = await queue.get()
+            try:
+                await self._send(order)
+            finally:
+                queue.task_done()
+
+    async def _warm_hashkey(self, order: PipelineOrder):
+        try:
+            await self.kr_inv_ord_service.precompute_order_hashkey(
+                order.auth_info_entity, order.stock_code, order.stock_qty, order.stock_price, order.ord_dvsn
+            )
+        except Exception as e:
+            # The order issues it again when sent
+            logger.error(f"Error precomputing hashkey of order {order.idempotency_key}: {e}")
+
+    async def _send(self, order: PipelineOrder):
+        order.status = PipelineOrder.SUBMITTED
+        self._record(order)
+        try:
+            response = await self.kr_inv_ord_service._api_order_cash(
+                order.auth_info_entity, self.TR_ID_SUFFIX[order.order_type], order.stock_code,
+                order.stock_qty, order.stock_price, order.ord_dvsn
+            )
+        except Exception as e:
+            logger.error(f"Error sending order {order.idempotency_key}: {e}")
+            order.status = PipelineOrder.ERROR
+            self._record(order)
+            order.done.set_exception(e)
+            # Retrieved here so an order nobody waits for anymore does not log "never retrieved"
+            order.done.exception()
+            return
+        order.response = response
+        order.order_no = (response.get("output") or {}).get("ODNO")
+        if response.get("rt_cd") == "0" and order.order_no:
+            order.status = PipelineOrder.ACCEPTED
+            self._in_flight[order.order_no] = order
+        else:
+            order.status = PipelineOrder.REJECTED
+            logger.warning(f"Order {order.idempotency_key} rejected : {response.get('msg1')}")
+        self._record(order)
+        order.done.set_result(response)
+
+    def get_order(self, order_no: str) -> Optional[PipelineOrder]:
+        """In-flight order by broker order number"""
+        return self._in_flight.get(order_no)
+
+    def get_order_by_key(self, idempotency_key: str) -> Optional[PipelineOrder]:
+        """Order by idempotency key"""
+        return self._orders.get(idempotency_key)
+
+    def in_flight_orders(self) -> List[PipelineOrder]:
+        """Accepted orders not yet executed or cancelled"""
+        return list(self._in_flight.values())
+
+    def complete(self, order_no: str, status: str = PipelineOrder.EXECUTED) -> Optional[PipelineOrder]:
+        """Take an order out of flight as executed or cancelled"""
+        order = self._in_flight.pop(order_no, None)
+        if order is not None:
+            order.status = status
+            if status == PipelineOrder.EXECUTED:
+                order.execution_time = datetime.now()
+            self._record(order)
+        return order
+
+    async def poll_executions(self) -> int:
+        """
+        Complete in-flight orders the execution inquiry reports fully filled or
+        cancelled; returns orders completed
+        """
+        accounts: Dict[Tuple[str, str], List[PipelineOrder]] = {}  # (account, order date) -> orders
+        for order in self._in_flight.values():
+            key = (order.auth_info_entity.account_number, order.order_time.strftime("%Y%m%d"))
+            accounts.setdefault(key, []).append(order)
+        completed = 0
+        for (account_number, order_date), orders in accounts.items():
+            try:
+                response = await self.kr_inv_ord_service.api_inquire_ccnl(orders[0].auth_info_entity, order_date)
+            except Exception as e:
+                logger.error(f"Error inquiring executions of {account_number}: {e}")
+                continue
+            executions = {str(item.get("odno", "")).lstrip("0"): item for item in response.get("output1") or []}
+            for order in orders:
+                item = executions.get(str(order.order_no).lstrip("0"))
+                if item is None:
+                    continue
+                ordered = int(item.get("ord_qty") or 0)
+                filled = int(item.get("tot_ccld_qty") or 0)
+                if ordered and filled >= ordered:
+                    self.complete(order.order_no)
+                    completed += 1
+                elif item.get("cncl_yn") == "Y" or (int(item.get("rmn_qty") or 0) == 0 and filled < ordered):
+                    self.complete(order.order_no, PipelineOrder.CANCELLED)
+                    completed += 1
+        return completed
+
+    async def _run_poller(self):
+        while True:
+            await asyncio.sleep(settings.ORDER_FILL_POLL_INTERVAL)
+            if self._in_flight:
+                await self.poll_executions()
+
+    def _prune(self):
+        """Forget idempotency keys of finished orders older than the TTL (oldest first)"""
+        now = datetime.now()
+        while self._orders:
+            key, order = next(iter(self._orders.items()))
+            if (now - order.order_time).total_seconds() < self.idempotency_ttl or not order.done.done():
+                break
+            # An order still in flight stays reachable by order number
+            del self._orders[key]
+
+    def _record(self, order: PipelineOrder):
+        """Mark an order for the writer (only its latest state is written)"""
+        self._unsaved[order.idempotency_key] = order
+        if self._unsaved_event is not None:
+            self._unsaved_event.set()
+
+    async def flush(self) -> int:
+        """Write the latest state of changed orders; returns rows written"""
+        if not self._unsaved:
+            return 0
+        batch, self._unsaved = self._unsaved, {}
+        try:
+            return await self._save([order.to_history() for order in batch.values()])
+        except Exception as e:
+            logger.error(f"Error saving order history: {e}")
+            # Keep them for the next flush unless a newer state is already waiting
+            for key, order in batch.items():
+                self._unsaved.setdefault(key, order)
+            raise
+
+    @staticmethod
+    def _sync_session_factory(
+        db_session: Optional[Union[Session, AsyncSession]]
+    ) -> Optional[Callable[[], Session]]:
+        """Session factory of the sync data path (None on the async data path)"""
+        if isinstance(db_session, AsyncSession) or (db_session is None and settings.DATABASE_ASYNC):
+            return None
+        if db_session is None:
+            return SessionLocal
+        return sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+
+    async def _save(self, rows: List[Dict[str, Any]]) -> int:
+        async with self._write_lock:
+            if self._session_factory is None:
+                return await self.sa_db_service.save_all_order_history_list(rows)
+            # One write at a time, finished even when the writer is cancelled,
+            # so states are never committed out of order
+            write = asyncio.ensure_future(asyncio.to_thread(self._save_sync, rows))
+            try:
+                return await asyncio.shield(write)
+            except asyncio.CancelledError:
+                await asyncio.wait([write])
+                raise
+
+    def _save_sync(self, rows: List[Dict[str, Any]]) -> int:
+        """Upsert order history rows on a session of its own (worker thread)"""
+        db = self._session_factory()
+        try:
+            return SaDbService(db)._bulk_upsert(OrderHistory, rows, ORDER_HISTORY_COLUMNS, ORDER_HISTORY_KEY)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _run_writer(self):
+        while True:
+            await self._unsaved_event.wait()
+            self._unsaved_event.clear()
+            try:
+                await self.flush()
+            except Exception:
+                await asyncio.sleep(settings.ORDER_PERSIST_RETRY_DELAY)
+                self._unsaved_event.set()
+
+    def start(self):
+        """Start the order history writer and the execution poller"""
+        if self._writer is None:
+            self._unsaved_event = asyncio.Event()
+            if self._unsaved:
+                self._unsaved_event.set()
+            self._writer = asyncio.ensure_future(self._run_writer())
+        if self._poller is None:
+            self._poller = asyncio.ensure_future(self._run_poller())
+
+    async def stop(self):
+        """Send the queued orders, stop the workers and write the remaining states"""
+        for queue in self._queues.values():
+            await queue.join()
+        tasks = (list(self._workers.values()) + list(self._hashkey_tasks)
+                 + [task for task in (self._writer, self._poller) if task])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queues.clear()
+        self._workers.clear()
+        self._writer = None
+        self._poller = None
+        self._unsaved_event = None
+        await self.flush()
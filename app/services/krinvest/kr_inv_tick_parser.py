@@ -0,0 +1,179 @@
+"""
+Korea Investment Tick Parser
+
+Decodes real-time websocket frames ("0|H0STCNT0|001|005930^...") by field index
+straight into a preallocated NumPy ring buffer, and decrypts AES encrypted
+execution notices (H0STCNI0 / H0STCNI9).
+실시간체결가 프레임 파싱 / 체결통보 복호화
+"""
+
+import base64
+import logging
+import struct
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 국내주식 실시간체결가 (KRX)
+H0STCNT0_FIELDS = [
+    "MKSC_SHRN_ISCD", "STCK_CNTG_HOUR", "STCK_PRPR", "PRDY_VRSS_SIGN", "PRDY_VRSS",
+    "PRDY_CTRT", "WGHN_AVRG_STCK_PRC", "STCK_OPRC", "STCK_HGPR", "STCK_LWPR",
+    "ASKP1", "BIDP1", "CNTG_VOL", "ACML_VOL", "ACML_TR_PBMN",
+    "SELN_CNTG_CSNU", "SHNU_CNTG_CSNU", "NTBY_CNTG_CSNU", "CTTR", "SELN_CNTG_SMTN",
+    "SHNU_CNTG_SMTN", "CCLD_DVSN", "SHNU_RATE", "PRDY_VOL_VRSS_ACML_VOL_RATE", "OPRC_HOUR",
+    "OPRC_VRSS_PRPR_SIGN", "OPRC_VRSS_PRPR", "HGPR_HOUR", "HGPR_VRSS_PRPR_SIGN", "HGPR_VRSS_PRPR",
+    "LWPR_HOUR", "LWPR_VRSS_PRPR_SIGN", "LWPR_VRSS_PRPR", "BSOP_DATE", "NEW_MKOP_CLS_CODE",
+    "TRHT_YN", "ASKP_RSQN1", "BIDP_RSQN1", "TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN",
+    "VOL_TNRT", "PRDY_SMNS_HOUR_ACML_VOL", "PRDY_SMNS_HOUR_ACML_VOL_RATE", "HOUR_CLS_CODE",
+    "MRKT_TRTM_CLS_CODE", "VI_STND_PRC"
+]
+
+# 국내주식 실시간호가 (KRX)
+H0STASP0_FIELDS = (
+    ["MKSC_SHRN_ISCD", "BSOP_HOUR", "HOUR_CLS_CODE"]
+    + [f"ASKP{i}" for i in range(1, 11)]
+    + [f"BIDP{i}" for i in range(1, 11)]
+    + [f"ASKP_RSQN{i}" for i in range(1, 11)]
+    + [f"BIDP_RSQN{i}" for i in range(1, 11)]
+    + ["TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN", "OVTM_TOTAL_ASKP_RSQN", "OVTM_TOTAL_BIDP_RSQN",
+       "ANTC_CNPR", "ANTC_CNQN", "ANTC_VOL", "ANTC_CNTG_VRSS", "ANTC_CNTG_VRSS_SIGN",
+       "ANTC_CNTG_PRDY_CTRT", "ACML_VOL", "TOTAL_ASKP_RSQN_ICDC", "TOTAL_BIDP_RSQN_ICDC",
+       "OVTM_TOTAL_ASKP_ICDC", "OVTM_TOTAL_BIDP_ICDC", "STCK_DEAL_CLS_CODE"]
+)
+
+# Structured record of one H0STCNT0 trade tick (packed, integer fields first)
+TICK_DTYPE = np.dtype([
+    ("stock_code", "S6"),     # MKSC_SHRN_ISCD
+    ("time", "<i4"),          # STCK_CNTG_HOUR (HHMMSS)
+    ("price", "<i8"),         # STCK_PRPR
+    ("change", "<i8"),        # PRDY_VRSS
+    ("open", "<i8"),          # STCK_OPRC
+    ("high", "<i8"),          # STCK_HGPR
+    ("low", "<i8"),           # STCK_LWPR
+    ("ask1", "<i8"),          # ASKP1
+    ("bid1", "<i8"),          # BIDP1
+    ("volume", "<i8"),        # CNTG_VOL
+    ("acml_volume", "<i8"),   # ACML_VOL
+    ("side", "i1"),           # CCLD_DVSN (1: buy, 3: pre-market, 5: sell)
+    ("change_rate", "<f8"),   # PRDY_CTRT
+    ("strength", "<f8"),      # CTTR
+])
+
+# Same layout as TICK_DTYPE, used to write a record straight into the buffer memory
+_TICK_STRUCT = struct.Struct("<6si9qbdd")
+
+H0STCNT0_FIELD_SIZE = len(H0STCNT0_FIELDS)
+# H0STCNT0 field indexes of the integer and float TICK_DTYPE fields
+_TICK_INT_INDEXES = (1, 2, 4, 7, 8, 9, 10, 11, 12, 13, 21)
+_TICK_FLOAT_INDEXES = (5, 18)
+
+# 국내주식 실시간체결통보
+H0STCNI0_FIELDS = [
+    "CUST_ID", "ACNT_NO", "ODER_NO", "OODER_NO", "SELN_BYOV_CLS", "RCTF_CLS",
+    "ODER_KIND", "ODER_COND", "STCK_SHRN_ISCD", "CNTG_QTY", "CNTG_UNPR", "STCK_CNTG_HOUR",
+    "RFUS_YN", "CNTG_YN", "ACPT_YN", "BRNC_NO", "ODER_QTY", "ACNT_NAME",
+    "CNTG_ISNM", "CRDT_CLS", "CRDT_LOAN_DATE", "CNTG_ISNM40", "ODER_PRC"
+]
+
+class TickRingBuffer:
+    """Fixed size ring buffer of TICK_DTYPE records"""
+
+    def __init__(self, capacity: int = 1 << 20):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=TICK_DTYPE)
+        self.count = 0  # total records ever written
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """Get the latest n records in arrival order (view when contiguous)"""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = self.count % self.capacity
+        start = end - n
+        if start >= 0:
+            return self.data[start:end]
+        return np.concatenate((self.data[start:], self.data[:end]))
+
+    def clear(self):
+        """Forget all records (storage is kept)"""
+        self.count = 0
+
+class KrInvTickParser:
+    """Korea Investment real-time frame parser"""
+
+    TICK_TR_IDS = ("H0STCNT0",)
+    NOTICE_TR_IDS = ("H0STCNI0", "H0STCNI9")
+
+    def __init__(self, capacity: int = 1 << 20):
+        self.ticks = TickRingBuffer(capacity)
+        self._ciphers: Dict[str, Tuple[bytes, bytes]] = {}
+        # Field getters of the i-th record of a frame, built on first use
+        self._getters: List[Tuple[int, itemgetter, itemgetter]] = []
+
+    def parse_ticks(self, payload: str, count: int) -> Tuple[int, int]:
+        """
+        Decode a H0STCNT0 payload of count records into the ring buffer
+
+        Returns (first sequence number, number of records written); the records
+        are self.ticks.latest(n).
+        """
+        # Single record frames (the common case) only need the leading fields split
+        values = payload.split("^", _TICK_INT_INDEXES[-1] + 1) if count == 1 else payload.split("^")
+        data = self.ticks.data
+        capacity = self.ticks.capacity
+        first = self.ticks.count
+        pack_into = _TICK_STRUCT.pack_into
+        itemsize = TICK_DTYPE.itemsize
+        getters = self._getters
+        while len(getters) < count:
+            base = len(getters) * H0STCNT0_FIELD_SIZE
+            getters.append((
+                base,
+                itemgetter(*(base + index for index in _TICK_INT_INDEXES)),
+                itemgetter(*(base + index for index in _TICK_FLOAT_INDEXES))
+            ))
+
+        for i in range(count):
+            base, pick_ints, pick_floats = getters[i]
+            rate, strength = pick_floats(values)
+            pack_into(
+                data, ((first + i) % capacity) * itemsize,
+                values[base].encode(), *map(int, pick_ints(values)), float(rate), float(strength)
+            )
+
+        self.ticks.count = first + count
+        return first, count
+
+    def parse_frame(self, message: str) -> Tuple[str, int]:
+        """Decode a tick frame into the ring buffer, returning (tr_id, records written)"""
+        _, tr_id, count, payload = message.split("|", 3)
+        if tr_id not in self.TICK_TR_IDS:
+            raise ValueError(f"Not a tick frame : {tr_id}")
+        return tr_id, self.parse_ticks(payload, int(count))[1]
+
+    def set_cipher(self, tr_id: str, key: str, iv: str):
+        """Register AES key/iv received in the subscribe response of a TR ID"""
+        self._ciphers[tr_id] = (key.encode("utf-8"), iv.encode("utf-8"))
+
+    def decrypt(self, tr_id: str, payload: str) -> str:
+        """Decrypt an AES-256-CBC encrypted payload (base64)"""
+        if tr_id not in self._ciphers:
+            raise ValueError(f"No AES key for {tr_id}")
+        try:
+            from Crypto.Cipher import AES
+            from Crypto.Util.Padding import unpad
+        except ImportError as e:
+            raise ImportError("pycryptodome is required to decrypt execution notices") from e
+
+        key, iv = self._ciphers[tr_id]
+        cipher = AES.new(key, AES.MODE_CBC, iv)
+        return unpad(cipher.decrypt(base64.b64decode(payload)), AES.block_size).decode("utf-8")
+
+    def parse_notice(self, tr_id: str, payload: str) -> List[Dict[str, str]]:
+        """Decrypt and decode an execution notice"""
+        values = self.decrypt(tr_id, payload).split("^")
+        return [dict(zip(H0STCNI0_FIELDS, values))]
@@ -0,0 +1,175 @@
+"""
+Korea Investment Token Manager
+
+Keeps every key's access token and approval key fresh from a background
+task. Tokens are cached in memory with a parsed expiry, so the request
+path only does a dictionary lookup, and each key is refreshed some time
+before it expires (while refreshing, KrAuthInfo routes requests to other
+keys), so a trading request never waits on the token endpoint.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from app.config.settings import settings
+from app.models import AuthInfo
+from app.common.kr_auth_info import KrAuthInfo
+
+if TYPE_CHECKING:
+    from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
+
+logger = logging.getLogger(__name__)
+
+TOKEN_EXPIRED_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class KrInvTokenManager:
+    """Background access token / approval key refresher"""
+
+    # Cache by app key, shared by every instance
+    _tokens: Dict[str, Tuple[str, float]] = {}  # app key -> (access token, expires at)
+    _approval_keys: Dict[str, Tuple[str, float]] = {}  # app key -> (approval key, issued at)
+
+    def __init__(
+        self,
+        kr_inv_oauth_service: "KrInvOauthService",
+        refresh_margin: Optional[float] = None,
+        interval: Optional[float] = None,
+        retry_delay: Optional[float] = None,
+        now: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+    ):
+        self.kr_inv_oauth_service = kr_inv_oauth_service
+        self.refresh_margin = settings.KI_TOKEN_REFRESH_MARGIN if refresh_margin is None else refresh_margin
+        self.interval = interval or settings.KI_TOKEN_REFRESH_INTERVAL
+        self.retry_delay = retry_delay or settings.KI_TOKEN_REFRESH_RETRY_DELAY
+        self.now = now
+        self.sleep = sleep
+        self._retry_at: Dict[Tuple[str, bool], float] = {}  # (app key, approval) -> retry time
+        self._task: Optional["asyncio.Task[None]"] = None
+        logger.info("KoreaInvestTokenManager Init ........")
+
+    @classmethod
+    def cache_token(cls, auth_info_entity: AuthInfo):
+        """Cache an entity's access token with its parsed expiry"""
+        token = auth_info_entity.access_token
+        expired_date = auth_info_entity.access_token_expired_date
+        if not token or not expired_date:
+            cls._tokens.pop(auth_info_entity.app_key, None)
+            return
+        try:
+            expires_at = datetime.strptime(expired_date, TOKEN_EXPIRED_DATE_FORMAT).timestamp()
+        except ValueError:
+            logger.warning(f"Unknown token expiry format : {expired_date}")
+            expires_at = 0.0
+        cls._tokens[auth_info_entity.app_key] = (token, expires_at)
+
+    @classmethod
+    def cache_approval_key(cls, auth_info_entity: AuthInfo, issued_at: Optional[float] = None):
+        """Cache an entity's approval key with its issue time"""
+        if auth_info_entity.approval_key:
+            cls._approval_keys[auth_info_entity.app_key] = (
+                auth_info_entity.approval_key, time.time() if issued_at is None else issued_at
+            )
+
+    @classmethod
+    def get_access_token(cls, auth_info_entity: AuthInfo, now: Optional[float] = None) -> Optional[str]:
+        """Cached access token of a key (None if missing or expired)"""
+        entry = cls._tokens.get(auth_info_entity.app_key)
+        if entry is None or entry[1] <= (time.time() if now is None else now):
+            return None
+        return entry[0]
+
+    @classmethod
+    def get_approval_key(cls, auth_info_entity: AuthInfo, now: Optional[float] = None) -> Optional[str]:
+        """Cached approval key of a key (None if missing or older than its lifetime)"""
+        entry = cls._approval_keys.get(auth_info_entity.app_key)
+        if entry is None or entry[1] + settings.KI_APPROVAL_KEY_TTL <= (time.time() if now is None else now):
+            return None
+        return entry[0]
+
+    @classmethod
+    def reset(cls):
+        """Forget cached tokens"""
+        cls._tokens.clear()
+        cls._approval_keys.clear()
+
+    def token_refresh_at(self, auth_info_entity: AuthInfo) -> float:
+        """Time the access token of a key is due for refresh"""
+        entry = self._tokens.get(auth_info_entity.app_key)
+        due = entry[1] - self.refresh_margin if entry else 0.0
+        return max(due, self._retry_at.get((auth_info_entity.app_key, False), 0.0))
+
+    def approval_refresh_at(self, auth_info_entity: AuthInfo) -> float:
+        """Time the approval key of a key is due for refresh"""
+        entry = self._approval_keys.get(auth_info_entity.app_key)
+        due = entry[1] + settings.KI_APPROVAL_KEY_TTL - self.refresh_margin if entry else 0.0
+        return max(due, self._retry_at.get((auth_info_entity.app_key, True), 0.0))
+
+    async def refresh(self, auth_info_entity: AuthInfo, approval: bool = False) -> bool:
+        """Issue a new access token (or approval key) of a key while requests use the others"""
+        retry_key = (auth_info_entity.app_key, approval)
+        if not approval:
+            KrAuthInfo.set_refreshing(auth_info_entity, True)
+        try:
+            if approval:
+                await self.kr_inv_oauth_service.issue_approval_key(auth_info_entity)
+            else:
+                await self.kr_inv_oauth_service.issue_access_token(auth_info_entity)
+            self._retry_at.pop(retry_key, None)
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing {'approval key' if approval else 'token'} "
+                         f"of {auth_info_entity.account_number}: {e}")
+            self._retry_at[retry_key] = self.now() + self.retry_delay
+            return False
+        finally:
+            if not approval:
+                KrAuthInfo.set_refreshing(auth_info_entity, False)
+
+    async def refresh_due(self, auth_info_list: Optional[List[AuthInfo]] = None) -> int:
+        """Refresh every token / approval key that is due, concurrently; returns refreshes done"""
+        if auth_info_list is None:
+            auth_info_list = KrAuthInfo.list_auth_info
+        now = self.now()
+        jobs = [self.refresh(auth) for auth in auth_info_list if self.token_refresh_at(auth) <= now]
+        if settings.KI_APPROVAL_KEY_REFRESH:
+            jobs += [self.refresh(auth, approval=True)
+                     for auth in auth_info_list if self.approval_refresh_at(auth) <= now]
+        return sum(await asyncio.gather(*jobs))
+
+    def seconds_until_next_refresh(self, auth_info_list: Optional[List[AuthInfo]] = None) -> float:
+        """Seconds until the earliest refresh, capped by the check interval"""
+        if auth_info_list is None:
+            auth_info_list = KrAuthInfo.list_auth_info
+        due_times = [self.token_refresh_at(auth) for auth in auth_info_list]
+        if settings.KI_APPROVAL_KEY_REFRESH:
+            due_times += [self.approval_refresh_at(auth) for auth in auth_info_list]
+        if not due_times:
+            return self.interval
+        return min(max(min(due_times) - self.now(), 0.0), self.interval)
+
+    async def run(self):
+        """Refresh loop (runs until cancelled)"""
+        while True:
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                logger.error(f"Error in token refresh loop: {e}")
+            await self.sleep(self.seconds_until_next_refresh())
+
+    def start(self):
+        """Start the background refresh task"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """Stop the background refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,262 @@
+"""
+Korea Investment WebSocket Service
+
+Real-time market data (trade ticks H0STCNT0, order book H0STASP0) over the
+Korea Investment websocket using the approval key.
+국내주식 실시간체결가 / 실시간호가 웹소켓 수신
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.models import AuthInfo
+from app.common.kr_auth_info import KrAuthInfo
+from app.exceptions import BizRuntimeException
+from app.services.krinvest.kr_inv_tick_parser import (
+    KrInvTickParser, H0STCNT0_FIELDS, H0STASP0_FIELDS
+)
+
+if TYPE_CHECKING:
+    from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
+
+logger = logging.getLogger(__name__)
+
+# Called with (tr_id, records); H0STCNT0 records are a TICK_DTYPE array viewing the
+# parser ring buffer, other TR IDs are lists of dicts
+Listener = Callable[[str, Any], Any]
+
+class KrInvWsSession:
+    """One websocket connection (one approval key) and its subscriptions"""
+
+    def __init__(self, service: "KrInvWsService", auth_info_entity: AuthInfo, ws_url: str):
+        self.service = service
+        self.auth_info_entity = auth_info_entity
+        self.ws_url = ws_url
+        self.subscriptions: Set[Tuple[str, str]] = set()
+        self.connected = asyncio.Event()
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    def start(self):
+        """Start the connect/receive loop"""
+        self._stopped = False
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop the loop and close the connection"""
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def send_subscription(self, tr_id: str, tr_key: str, subscribe: bool = True):
+        """Send a register ("1") / unregister ("2") request if connected"""
+        if self._ws is None:
+            return  # sent on (re)connect
+        message = {
+            "header": {
+                "approval_key": self.auth_info_entity.approval_key,
+                "custtype": "P",
+                "tr_type": "1" if subscribe else "2",
+                "content-type": "utf-8"
+            },
+            "body": {"input": {"tr_id": tr_id, "tr_key": tr_key}}
+        }
+        await self._ws.send(json.dumps(message))
+
+    async def _run(self):
+        """Connect, resubscribe and receive, reconnecting with backoff"""
+        import websockets
+
+        delay = settings.KI_WS_RECONNECT_DELAY
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=None) as ws:
+                    self._ws = ws
+                    delay = settings.KI_WS_RECONNECT_DELAY
+                    for tr_id, tr_key in list(self.subscriptions):
+                        await self.send_subscription(tr_id, tr_key)
+                    self.connected.set()
+                    logger.info(f"Websocket connected : {self.auth_info_entity.account_number} "
+                                f"({len(self.subscriptions)} subscriptions)")
+                    async for message in ws:
+                        await self.service.on_message(self, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Websocket error ({self.ws_url}): {e}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+
+            if self._stopped:
+                break
+            logger.info(f"Websocket reconnecting in {delay:.1f}s : {self.auth_info_entity.account_number}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.KI_WS_RECONNECT_MAX_DELAY)
+
+    async def pong(self, message: str):
+        """Echo a PINGPONG frame back to the server"""
+        if self._ws is not None:
+            await self._ws.send(message)
+
+class KrInvWsService:
+    """Korea Investment WebSocket Service - real-time trade ticks and order book"""
+
+    FIELDS: Dict[str, List[str]] = {
+        "H0STCNT0": H0STCNT0_FIELDS,
+        "H0STASP0": H0STASP0_FIELDS
+    }
+
+    def __init__(self, db_session: Optional[Session] = None, ws_url: Optional[str] = None,
+                 max_subscriptions: Optional[int] = None):
+        self.kr_inv_oauth_service: Optional["KrInvOauthService"] = None
+        if db_session is not None:
+            # Dynamic import to avoid circular dependency
+            from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
+            self.kr_inv_oauth_service = KrInvOauthService(db_session)
+        self.ws_url = ws_url
+        self.max_subscriptions = max_subscriptions or settings.KI_WS_MAX_SUBSCRIPTIONS
+        self.parser = KrInvTickParser(settings.KI_WS_TICK_BUFFER_SIZE)
+        self.sessions: List[KrInvWsSession] = []
+        self._listeners: Dict[str, List[Listener]] = {}
+        logger.info("KoreaInvestWebsocketService Init ........")
+
+    async def start(self, auth_info_list: Optional[List[AuthInfo]] = None):
+        """Open one websocket session per approval key"""
+        if auth_info_list is None:
+            auth_info_list = KrAuthInfo.list_real_auth_info or KrAuthInfo.list_auth_info
+
+        for auth_info_entity in auth_info_list:
+            if not auth_info_entity.approval_key:
+                if self.kr_inv_oauth_service is None:
+                    raise BizRuntimeException(f"No approval key : {auth_info_entity.account_number}")
+                await self.kr_inv_oauth_service.api_oauth2_approval(auth_info_entity)
+            session = KrInvWsSession(self, auth_info_entity,
+                                     self.ws_url or KrAuthInfo.get_ws_url(auth_info_entity))
+            session.start()
+            self.sessions.append(session)
+
+    async def stop(self):
+        """Close every websocket session"""
+        for session in self.sessions:
+            await session.stop()
+        self.sessions.clear()
+
+    async def subscribe(self, tr_id: str, tr_key: str) -> KrInvWsSession:
+        """Register a real-time feed on the least loaded session with capacity"""
+        for session in self.sessions:
+            if (tr_id, tr_key) in session.subscriptions:
+                return session
+
+        available = [s for s in self.sessions if len(s.subscriptions) < self.max_subscriptions]
+        if not available:
+            raise BizRuntimeException(
+                f"Websocket subscription limit reached ({self.max_subscriptions} x {len(self.sessions)})"
+            )
+        session = min(available, key=lambda s: len(s.subscriptions))
+        session.subscriptions.add((tr_id, tr_key))
+        await session.send_subscription(tr_id, tr_key)
+        return session
+
+    async def unsubscribe(self, tr_id: str, tr_key: str):
+        """Unregister a real-time feed"""
+        for session in self.sessions:
+            if (tr_id, tr_key) in session.subscriptions:
+                session.subscriptions.discard((tr_id, tr_key))
+                await session.send_subscription(tr_id, tr_key, subscribe=False)
+
+    def add_listener(self, tr_id: str, listener: Listener):
+        """Add an in-process subscriber called with (tr_id, records)"""
+        self._listeners.setdefault(tr_id, []).append(listener)
+
+    def remove_listener(self, tr_id: str, listener: Listener):
+        """Remove an in-process subscriber"""
+        if listener in self._listeners.get(tr_id, []):
+            self._listeners[tr_id].remove(listener)
+
+    def add_queue(self, tr_id: str, maxsize: int = 10000) -> "asyncio.Queue[Any]":
+        """Get a queue fed with records of a TR ID (oldest dropped when full)"""
+        queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=maxsize)
+
+        def put(_: str, records: Any):
+            if queue.full():
+                queue.get_nowait()
+            # Queued tick arrays are copied so a lagging consumer never sees overwritten rows
+            queue.put_nowait(records.copy() if isinstance(records, np.ndarray) else records)
+
+        self.add_listener(tr_id, put)
+        return queue
+
+    async def on_message(self, session: KrInvWsSession, message: str):
+        """Handle a websocket frame"""
+        if message[:1] in ("0", "1"):
+            encrypted, tr_id, count, payload = message.split("|", 3)
+            try:
+                if tr_id in KrInvTickParser.TICK_TR_IDS:
+                    _, written = self.parser.parse_ticks(payload, int(count))
+                    records = self.parser.ticks.latest(written)
+                elif encrypted == "1":
+                    records = self.parser.parse_notice(tr_id, payload)
+                else:
+                    records = self.parse_records(tr_id, int(count), payload)
+            except Exception as e:
+                logger.error(f"Error parsing websocket frame {tr_id}: {e}")
+                return
+            if len(records):
+                await self._publish(tr_id, records)
+            return
+
+        try:
+            data = json.loads(message)
+        except ValueError:
+            logger.warning(f"Unknown websocket frame : {message[:100]}")
+            return
+
+        header = data.get("header", {})
+        if header.get("tr_id") == "PINGPONG":
+            await session.pong(message)
+            return
+
+        body = data.get("body", {})
+        output = body.get("output") or {}
+        if output.get("key") and output.get("iv"):
+            self.parser.set_cipher(header.get("tr_id"), output["key"], output["iv"])
+        logger.info(f"Websocket response : {header.get('tr_id')} {header.get('tr_key')} "
+                    f"{body.get('rt_cd')} {body.get('msg1')}")
+
+    def parse_records(self, tr_id: str, count: int, payload: str) -> List[Dict[str, str]]:
+        """Decode a plain "f1^f2^..." payload of count records into one dict per record"""
+        field_names = self.FIELDS.get(tr_id)
+        if field_names is None:
+            logger.warning(f"Unknown real-time TR ID : {tr_id}")
+            return []
+
+        values = payload.split("^")
+        size = len(field_names)
+        return [
+            dict(zip(field_names, values[i * size:(i + 1) * size]))
+            for i in range(count)
+        ]
+
+    async def _publish(self, tr_id: str, records: Any):
+        """Deliver records to in-process subscribers"""
+        for listener in list(self._listeners.get(tr_id, [])):
+            try:
+                result = listener(tr_id, records)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in websocket listener for {tr_id}: {e}")
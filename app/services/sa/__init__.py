@@ -5,6 +5,7 @@ Services for Stock Analysis functionality.
 """
 
 from .sa_db_service import SaDbService
+from .async_sa_db_service import AsyncSaDbService, create_sa_db_service
 from .sa_service import SaService
 from .sa_api_service import SaApiService
 from .sa_common_service import SaCommonService
@@ -12,14 +13,24 @@ from .sa_stat_day_service import SaStatDayService
 from .sa_stat_minute_service import SaStatMinuteService
 from .sa_check_to_buy_service import SaCheckToBuyService
 from .sa_check_to_sell_service import SaCheckToSellService
+from .sa_minute_bar_store import SaMinuteBarStore
+from .sa_breakout_service import SaBreakoutService
+from .sa_minute_retention_service import SaMinuteRetentionService
+from .sa_archive_service import SaArchiveService
 
 __all__ = [
     "SaDbService",
+    "AsyncSaDbService",
+    "create_sa_db_service",
     "SaService", 
     "SaApiService",
     "SaCommonService",
     "SaStatDayService",
     "SaStatMinuteService",
     "SaCheckToBuyService",
-    "SaCheckToSellService"
+    "SaCheckToSellService",
+    "SaMinuteBarStore",
+    "SaBreakoutService",
+    "SaMinuteRetentionService",
+    "SaArchiveService"
 ]
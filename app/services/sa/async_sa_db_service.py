@@ -0,0 +1,344 @@
+"""
+Async SA Database Service
+
+AsyncSession implementation of the SaDbService API, so database I/O is
+awaited instead of blocking the event loop. create_sa_db_service picks
+the implementation matching the session it is given, or a session per
+call implementation for long-lived (singleton) services.
+"""
+
+import inspect
+import logging
+from datetime import datetime
+from typing import Any, AsyncContextManager, Callable, List, Mapping, Optional, Sequence, Tuple, Union
+from sqlalchemy import and_, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config.database import open_session
+from app.models import (
+    StockList, DayStatEntity, MinuteStat, MinuteData, AuthInfo,
+    OrderHistory, MonitoringList, StockCode, RunningThread, AskingPrice, OrderCash
+)
+from app.services.sa.sa_db_service import (
+    SaDbService, STOCK_LIST_COLUMNS, STOCK_LIST_KEY, MINUTE_DATA_COLUMNS, MINUTE_DATA_KEY,
+    DAY_STAT_COLUMNS, DAY_STAT_KEY, ORDER_HISTORY_COLUMNS, ORDER_HISTORY_KEY
+)
+
+logger = logging.getLogger(__name__)
+
+def create_sa_db_service(db_session: Optional[Union[Session, AsyncSession]] = None) -> SaDbService:
+    """Get the SaDbService implementation for a sync or async session (None: a session per call)"""
+    if db_session is None:
+        return SessionScopedSaDbService()
+    if isinstance(db_session, AsyncSession):
+        return AsyncSaDbService(db_session)
+    return SaDbService(db_session)
+
+class SessionScopedSaDbService:
+    """
+    SaDbService API opening a session per call (one unit of work), for
+    services created once at startup instead of once per request. Calls
+    only stop blocking the event loop with DATABASE_ASYNC set; otherwise
+    each call runs its Session queries on the loop.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncContextManager] = open_session):
+        self.session_factory = session_factory
+
+    def __getattr__(self, name: str):
+        method = getattr(SaDbService, name, None)
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            raise AttributeError(f"{type(self).__name__} has no method {name}")
+
+        async def call(*args, **kwargs):
+            async with self.session_factory() as db_session:
+                return await getattr(create_sa_db_service(db_session), name)(*args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+class AsyncSaDbService(SaDbService):
+    """SA Database Service on an AsyncSession"""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+        logger.info("AsyncStockAutoDbService Init ........")
+
+    async def _save(self, entity: Any, name: str, merge: bool = False) -> Any:
+        """Add (or merge) an entity, commit and refresh it"""
+        try:
+            if merge:
+                entity = await self.db.merge(entity)
+            else:
+                self.db.add(entity)
+            await self.db.commit()
+            await self.db.refresh(entity)
+            return entity
+        except Exception as e:
+            logger.error(f"Error saving {name}: {e}")
+            await self.db.rollback()
+            raise
+
+    async def _first(self, stmt, name: str) -> Optional[Any]:
+        try:
+            return (await self.db.execute(stmt.limit(1))).scalars().first()
+        except Exception as e:
+            logger.error(f"Error finding {name}: {e}")
+            raise
+
+    async def _all(self, stmt, name: str) -> List[Any]:
+        try:
+            return list((await self.db.execute(stmt)).scalars().all())
+        except Exception as e:
+            logger.error(f"Error finding {name}: {e}")
+            raise
+
+    async def _bulk_upsert_async(
+        self,
+        model,
+        rows: Sequence[Union[Any, Mapping[str, Any]]],
+        columns: List[str],
+        key_columns: List[str],
+        batch_size: Optional[int],
+        name: str,
+        overwrite: bool = True
+    ) -> int:
+        if not rows:
+            return 0
+        try:
+            for stmt in self._upsert_statements(model, rows, columns, key_columns, batch_size, overwrite):
+                await self.db.execute(stmt)
+            await self.db.commit()
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error saving {name}: {e}")
+            await self.db.rollback()
+            raise
+
+    # stockListRepository methods
+    async def save_all_stock_list(
+        self, entity_list: Sequence[Union[StockList, Mapping[str, Any]]], batch_size: Optional[int] = None
+    ) -> int:
+        """Save (upsert by stock code) all stock list entities, returning the row count"""
+        return await self._bulk_upsert_async(
+            StockList, entity_list, STOCK_LIST_COLUMNS, STOCK_LIST_KEY, batch_size, "stock list"
+        )
+
+    async def find_all_stock_list(self) -> List[StockList]:
+        """Find all stock list"""
+        return await self._all(select(StockList), "all stock list")
+
+    async def find_stock_by_stock_name(self, stock_name: str) -> Optional[StockList]:
+        """Find stock by stock name"""
+        return await self._first(
+            select(StockList).where(StockList.stock_name == stock_name), f"stock by name {stock_name}"
+        )
+
+    async def find_stock_by_stock_code(self, stock_code: str) -> Optional[StockList]:
+        """Find stock by stock code"""
+        return await self._first(
+            select(StockList).where(StockList.stock_code == stock_code), f"stock by code {stock_code}"
+        )
+
+    # dayInfoRepository methods
+    async def save_day_info(self, entity: DayStatEntity) -> DayStatEntity:
+        """Save day info entity"""
+        return await self._save(entity, "day info")
+
+    async def find_day_info_by_stock_code_and_tr_date(self, stock_code: str, tr_date: str) -> Optional[DayStatEntity]:
+        """Find day info by stock code and transaction date"""
+        return await self._first(
+            select(DayStatEntity).where(
+                and_(DayStatEntity.stock_code == stock_code, DayStatEntity.tr_date == tr_date)
+            ),
+            f"day info for {stock_code} on {tr_date}"
+        )
+
+    async def find_day_info_columns_by_stock_codes_and_period(
+        self, stock_codes: Optional[List[str]], start_tr_date: Optional[str] = None, end_tr_date: Optional[str] = None
+    ) -> List[Tuple]:
+        """Find day info of many stocks as plain row tuples ordered by stock code and date"""
+        try:
+            return list((await self.db.execute(
+                self._day_info_columns_statement(stock_codes, start_tr_date, end_tr_date)
+            )).all())
+        except Exception as e:
+            logger.error(f"Error finding day info columns: {e}")
+            raise
+
+    async def save_all_day_info_list(
+        self, entity_list: Sequence[Union[DayStatEntity, Mapping[str, Any]]], batch_size: Optional[int] = None,
+        overwrite: bool = True
+    ) -> int:
+        """
+        Save (upsert by stock code and date) all day info entities, returning the row count
+        (overwrite=False only inserts missing days and keeps stored ones)
+        """
+        return await self._bulk_upsert_async(
+            DayStatEntity, entity_list, DAY_STAT_COLUMNS, DAY_STAT_KEY, batch_size, "day info list", overwrite
+        )
+
+    # minuteDataRepository methods
+    async def save_all_minute_data_list(
+        self, entity_list: Sequence[Union[MinuteData, Mapping[str, Any]]], batch_size: Optional[int] = None
+    ) -> int:
+        """Save (upsert by stock code and time) all minute data entities, returning the row count"""
+        return await self._bulk_upsert_async(
+            MinuteData, entity_list, MINUTE_DATA_COLUMNS, MINUTE_DATA_KEY, batch_size, "minute data list"
+        )
+
+    async def find_minute_data_by_stock_code_and_tr_date_and_tr_time_period_desc(
+        self, stock_code: str, tr_date: str, start_tr_time: str, end_tr_time: str
+    ) -> List[MinuteData]:
+        """Find minute data by time period in descending order"""
+        return await self._all(
+            select(MinuteData).where(
+                and_(
+                    MinuteData.stock_code == stock_code,
+                    MinuteData.date_time >= f"{tr_date} {start_tr_time}",
+                    MinuteData.date_time <= f"{tr_date} {end_tr_time}"
+                )
+            ).order_by(desc(MinuteData.date_time)),
+            "minute data by period"
+        )
+
+    async def find_minute_data_columns_by_stock_codes_and_period(
+        self, stock_codes: Optional[List[str]], start_date_time: datetime, end_date_time: datetime
+    ) -> List[Tuple]:
+        """Find minute data of many stocks as plain row tuples ordered by stock code and time"""
+        try:
+            return list((await self.db.execute(
+                self._minute_data_columns_statement(stock_codes, start_date_time, end_date_time)
+            )).all())
+        except Exception as e:
+            logger.error(f"Error finding minute data columns: {e}")
+            raise
+
+    async def find_minute_data_day_rollup(self, start_date_time: datetime, end_date_time: datetime) -> List[Tuple]:
+        """Aggregate the minute bars in [start, end) per stock as plain row tuples"""
+        try:
+            return list((await self.db.execute(
+                self._minute_data_day_rollup_statement(start_date_time, end_date_time)
+            )).all())
+        except Exception as e:
+            logger.error(f"Error rolling up minute data: {e}")
+            raise
+
+    async def find_minute_data_first_date_time(self) -> Optional[datetime]:
+        """Find the time of the oldest stored minute bar"""
+        try:
+            return (await self.db.execute(select(func.min(MinuteData.date_time)))).scalar()
+        except Exception as e:
+            logger.error(f"Error finding first minute data time: {e}")
+            raise
+
+    async def delete_minute_data_before(
+        self, end_date_time: datetime, start_date_time: Optional[datetime] = None
+    ) -> int:
+        """Delete minute bars before a time (from start_date_time if given), returning the row count"""
+        try:
+            result = await self.db.execute(self._minute_data_delete_statement(end_date_time, start_date_time))
+            await self.db.commit()
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"Error deleting minute data: {e}")
+            await self.db.rollback()
+            raise
+
+    async def find_minute_data_by_tr_time(self, stock_code: str, tr_date: str, tr_time: str) -> Optional[MinuteData]:
+        """Find minute data by specific time"""
+        return await self._first(
+            select(MinuteData).where(
+                and_(
+                    MinuteData.stock_code == stock_code,
+                    MinuteData.date_time == f"{tr_date} {tr_time}"
+                )
+            ),
+            "minute data by time"
+        )
+
+    async def save_minute_data(self, entity: MinuteData) -> MinuteData:
+        """Save minute data entity"""
+        return await self._save(entity, "minute data")
+
+    # minuteStatRepository methods
+    async def save_minute_stat(self, entity: MinuteStat) -> MinuteStat:
+        """Save minute stat entity"""
+        return await self._save(entity, "minute stat")
+
+    # authInfoRepository methods
+    async def find_all_auth_info_with_account(self) -> List[AuthInfo]:
+        """Find all auth info with account"""
+        return await self._all(
+            select(AuthInfo).where(AuthInfo.account_number.isnot(None)), "auth info with account"
+        )
+
+    async def save_auth_info(self, entity: AuthInfo) -> AuthInfo:
+        """Save auth info entity"""
+        return await self._save(entity, "auth info", merge=bool(entity.id))
+
+    # orderHistoryRepository methods
+    async def save_order_history(self, entity: OrderHistory) -> OrderHistory:
+        """Save order history entity"""
+        return await self._save(entity, "order history")
+
+    async def save_all_order_history_list(
+        self, entity_list: Sequence[Union[OrderHistory, Mapping[str, Any]]], batch_size: Optional[int] = None
+    ) -> int:
+        """Save (upsert by order id) all order history entities, returning the row count"""
+        return await self._bulk_upsert_async(
+            OrderHistory, entity_list, ORDER_HISTORY_COLUMNS, ORDER_HISTORY_KEY, batch_size, "order history list"
+        )
+
+    async def find_order_history_by_stock_code_and_order_type(
+        self, stock_code: str, order_type: str
+    ) -> List[OrderHistory]:
+        """Find order history by stock code and order type"""
+        return await self._all(
+            select(OrderHistory).where(
+                and_(OrderHistory.stock_code == stock_code, OrderHistory.order_type == order_type)
+            ),
+            "order history"
+        )
+
+    # monitoringListRepository methods
+    async def save_monitoring_list(self, entity: MonitoringList) -> MonitoringList:
+        """Save monitoring list entity"""
+        return await self._save(entity, "monitoring list")
+
+    async def find_all_monitoring_list_active(self) -> List[MonitoringList]:
+        """Find all active monitoring list"""
+        return await self._all(
+            select(MonitoringList).where(MonitoringList.is_active == True), "active monitoring list"
+        )
+
+    # stockCodeRepository methods
+    async def save_stock_code(self, entity: StockCode) -> StockCode:
+        """Save stock code entity"""
+        return await self._save(entity, "stock code")
+
+    async def find_all_stock_code(self) -> List[StockCode]:
+        """Find all stock codes"""
+        return await self._all(select(StockCode), "all stock codes")
+
+    # runningThreadRepository methods
+    async def save_running_thread(self, entity: RunningThread) -> RunningThread:
+        """Save running thread entity"""
+        return await self._save(entity, "running thread")
+
+    async def find_running_thread_by_thread_name(self, thread_name: str) -> Optional[RunningThread]:
+        """Find running thread by thread name"""
+        return await self._first(
+            select(RunningThread).where(RunningThread.thread_name == thread_name),
+            f"running thread by name {thread_name}"
+        )
+
+    # askingPriceRepository methods
+    async def save_asking_price(self, entity: AskingPrice) -> AskingPrice:
+        """Save asking price entity"""
+        return await self._save(entity, "asking price")
+
+    # orderCachRepository methods
+    async def save_order_cash(self, entity: OrderCash) -> OrderCash:
+        """Save order cash entity"""
+        return await self._save(entity, "order cash")
@@ -6,73 +6,100 @@ Main API service that orchestrates stock analysis and trading operations.
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.services.krinvest.kr_inv_ord_service import KrInvOrdService
 from app.services.krinvest.kr_inv_inq_service import KrInvInqService
-from app.services.sa.sa_db_service import SaDbService
+from app.services.krinvest.kr_inv_order_pipeline import KrInvOrderPipeline, PipelineOrder
+from app.services.sa.async_sa_db_service import create_sa_db_service
 from app.common.kr_auth_info import KrAuthInfo
+from app.common.kr_rate_limiter import KrRateLimiter
 
 logger = logging.getLogger(__name__)
 
 class SaApiService:
     """SA API Service - converted from SaApiService.kt"""
     
-    def __init__(self, db_session: Session):
+    def __init__(
+        self, db_session: Optional[Session] = None,
+        kr_inv_ord_service: Optional[KrInvOrdService] = None,
+        kr_inv_inq_service: Optional[KrInvInqService] = None,
+        kr_inv_order_pipeline: Optional[KrInvOrderPipeline] = None
+    ):
         self.db = db_session
-        self.kr_inv_ord_service = KrInvOrdService(db_session)
-        self.kr_inv_inq_service = KrInvInqService(db_session)
-        self.sa_db_service = SaDbService(db_session)
+        self.kr_inv_ord_service = kr_inv_ord_service or KrInvOrdService(db_session)
+        self.kr_inv_inq_service = kr_inv_inq_service or KrInvInqService(db_session)
+        self.kr_inv_order_pipeline = kr_inv_order_pipeline
+        self.sa_db_service = create_sa_db_service(db_session)
         logger.info("SaApiService Init...")
     
     async def order_cash_buy_by_price(
-        self, stock_code: str, stock_qty: str, stock_price: str
+        self, stock_code: str, stock_qty: str, stock_price: str, idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """Order cash buy by specific price"""
         try:
-            auth_info = KrAuthInfo.next()
-            result = await self.kr_inv_ord_service.order_cash_buy_by_price(
-                auth_info, stock_code, stock_qty, stock_price
-            )
+            auth_info = KrAuthInfo.next(KrRateLimiter.TRADING)
+            if self.kr_inv_order_pipeline is not None:
+                result = await self.kr_inv_order_pipeline.submit(
+                    auth_info, "BUY", stock_code, stock_qty, stock_price, "00", idempotency_key
+                )
+            else:
+                result = await self.kr_inv_ord_service.order_cash_buy_by_price(
+                    auth_info, stock_code, stock_qty, stock_price
+                )
             return {"status": "success", "result": result}
         except Exception as e:
             logger.error(f"Error in order_cash_buy_by_price: {e}")
             return {"status": "error", "message": str(e)}
     
     async def order_cash_buy_by_market_price(
-        self, stock_code: str, stock_qty: str
+        self, stock_code: str, stock_qty: str, idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """Order cash buy by market price"""
         try:
-            auth_info = KrAuthInfo.next()
-            result = await self.kr_inv_ord_service.order_cash_buy_by_market_price(
-                auth_info, stock_code, stock_qty
-            )
+            auth_info = KrAuthInfo.next(KrRateLimiter.TRADING)
+            if self.kr_inv_order_pipeline is not None:
+                result = await self.kr_inv_order_pipeline.submit(
+                    auth_info, "BUY", stock_code, stock_qty, "0", "01", idempotency_key
+                )
+            else:
+                result = await self.kr_inv_ord_service.order_cash_buy_by_market_price(
+                    auth_info, stock_code, stock_qty
+                )
             return {"status": "success", "result": result}
         except Exception as e:
             logger.error(f"Error in order_cash_buy_by_market_price: {e}")
             return {"status": "error", "message": str(e)}
     
     async def order_cash_sell_by_market_price(
-        self, stock_code: str, stock_qty: str
+        self, stock_code: str, stock_qty: str, idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """Order cash sell by market price"""
         try:
-            auth_info = KrAuthInfo.next()
-            result = await self.kr_inv_ord_service.order_cash_sell_by_market_price(
-                auth_info, stock_code, stock_qty
-            )
+            auth_info = KrAuthInfo.next(KrRateLimiter.TRADING)
+            if self.kr_inv_order_pipeline is not None:
+                result = await self.kr_inv_order_pipeline.submit(
+                    auth_info, "SELL", stock_code, stock_qty, "0", "01", idempotency_key
+                )
+            else:
+                result = await self.kr_inv_ord_service.order_cash_sell_by_market_price(
+                    auth_info, stock_code, stock_qty
+                )
             return {"status": "success", "result": result}
         except Exception as e:
             logger.error(f"Error in order_cash_sell_by_market_price: {e}")
             return {"status": "error", "message": str(e)}
     
-    async def order_rvsecncl(self, order_number: str) -> str:
+    async def order_rvsecncl(self, order_number: str) -> Dict[str, Any]:
         """Cancel order"""
         try:
-            auth_info = KrAuthInfo.next()
+            # The order's own account when the pipeline placed it
+            order = self.kr_inv_order_pipeline.get_order(order_number) if self.kr_inv_order_pipeline else None
+            auth_info = order.auth_info_entity if order is not None else KrAuthInfo.next(KrRateLimiter.TRADING)
             result = await self.kr_inv_ord_service.order_cancel(auth_info, order_number)
+            if order is not None and result.get("rt_cd") == "0":
+                self.kr_inv_order_pipeline.complete(order_number, PipelineOrder.CANCELLED)
             return result
         except Exception as e:
             logger.error(f"Error in order_rvsecncl: {e}")
-            return f"Error: {str(e)}"
+            return {"status": "error", "message": str(e)}
@@ -0,0 +1,232 @@
+"""
+SA Archive Service
+
+Historical archive for backtests. Minute bars are exported from the
+database to Parquet partitioned by trade date (archive/minute/tr_date=
+YYYYMMDD/), day info to one Parquet file per year, and a year of minute
+bars is repacked into one uncompressed Arrow IPC file per symbol, which
+is memory-mapped so the OHLCV columns are read as NumPy arrays without
+copying. Requires pyarrow (imported lazily).
+"""
+
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.services.sa.async_sa_db_service import create_sa_db_service
+from app.utils.indicator_util import IndicatorUtil
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ["open_price", "high_price", "low_price", "close_price"]
+BAR_COLUMNS = PRICE_COLUMNS + ["volume"]
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("pyarrow is required for the historical archive") from e
+    return pyarrow
+
+def bar_table(rows: Sequence[Sequence], key_column: str = "date_time"):
+    """
+    Arrow table of (stock_code, key, open, high, low, close, volume) rows.
+    Missing prices are stored as NaN and missing volume as 0, so no column
+    has a null mask and every column maps to NumPy without a copy.
+    """
+    pa = _pyarrow()
+    columns = list(zip(*rows)) if rows else [()] * 7
+    key_type = pa.timestamp("ms") if key_column == "date_time" else pa.string()
+    arrays = {
+        "stock_code": pa.array(columns[0], pa.string()),
+        key_column: pa.array(columns[1], key_type),
+    }
+    for name, values in zip(PRICE_COLUMNS, columns[2:6]):
+        arrays[name] = pa.array(np.asarray(values, dtype=np.float64))
+    arrays["volume"] = pa.array(np.asarray([value or 0 for value in columns[6]], dtype=np.int64))
+    return pa.table(arrays)
+
+class SaArchiveService:
+    """SA Archive Service - Parquet / Arrow historical archive"""
+
+    def __init__(self, db_session: Optional[Session] = None, root: Optional[str] = None):
+        self.db = db_session
+        self.sa_db_service = create_sa_db_service(db_session)
+        self.root = root or settings.ARCHIVE_ROOT
+        logger.info("SaArchiveService Init...")
+
+    def minute_dir(self) -> str:
+        return os.path.join(self.root, "minute")
+
+    def minute_ipc_dir(self, year: int) -> str:
+        return os.path.join(self.root, "minute_ipc", str(year))
+
+    def day_file(self, year: int) -> str:
+        return os.path.join(self.root, "day", f"{year}.parquet")
+
+    def write_minute_day(self, tr_date: str, table) -> str:
+        """Write one trade date of minute bars (sorted by symbol and time) as a Parquet partition"""
+        pa = _pyarrow()
+        directory = os.path.join(self.minute_dir(), f"tr_date={tr_date}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "part-0.parquet")
+        table = table.sort_by([("stock_code", "ascending"), ("date_time", "ascending")])
+        pa.parquet.write_table(table, path, compression=settings.ARCHIVE_COMPRESSION,
+                               row_group_size=settings.ARCHIVE_ROW_GROUP_SIZE)
+        return path
+
+    async def export_minute_data(self, start_date: date, end_date: date) -> int:
+        """Export the minute bars of [start_date, end_date) to Parquet, a trade date at a time; returns rows"""
+        try:
+            exported = 0
+            day = start_date
+            while day < end_date:
+                start = datetime.combine(day, datetime.min.time())
+                rows = await self.sa_db_service.find_minute_data_columns_by_stock_codes_and_period(
+                    None, start, start + timedelta(days=1) - timedelta(microseconds=1)
+                )
+                if rows:
+                    self.write_minute_day(day.strftime("%Y%m%d"), bar_table(rows))
+                    exported += len(rows)
+                day += timedelta(days=1)
+            logger.info(f"Minute data archived : {start_date} ~ {end_date}, {exported} rows")
+            return exported
+        except Exception as e:
+            logger.error(f"Error exporting minute data: {e}")
+            raise
+
+    async def export_day_info(self, year: int) -> int:
+        """Export a year of day info to Parquet; returns rows"""
+        try:
+            pa = _pyarrow()
+            rows = await self.sa_db_service.find_day_info_columns_by_stock_codes_and_period(
+                None, f"{year}0101", f"{year}1231"
+            )
+            os.makedirs(os.path.dirname(self.day_file(year)), exist_ok=True)
+            pa.parquet.write_table(bar_table(rows, "tr_date"), self.day_file(year),
+                                   compression=settings.ARCHIVE_COMPRESSION)
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error exporting day info of {year}: {e}")
+            raise
+
+    def minute_dataset(self):
+        """Parquet dataset of the archived minute bars (tr_date partition column)"""
+        pa = _pyarrow()
+        return pa.dataset.dataset(
+            self.minute_dir(), format="parquet",
+            partitioning=pa.dataset.partitioning(pa.schema([("tr_date", pa.string())]), flavor="hive")
+        )
+
+    def build_minute_ipc(self, year: int, symbol_batch: Optional[int] = None) -> int:
+        """
+        Repack a year of archived minute bars into one Arrow IPC file per symbol
+        (minute_ipc/YYYY/<stock_code>.arrow); returns the number of symbols
+        """
+        pa = _pyarrow()
+        ds = pa.dataset
+        dataset = self.minute_dataset()
+        in_year = (ds.field("tr_date") >= f"{year}0101") & (ds.field("tr_date") <= f"{year}1231")
+        codes = sorted(set(dataset.to_table(columns=["stock_code"], filter=in_year)
+                           .column("stock_code").unique().to_pylist()))
+        directory = self.minute_ipc_dir(year)
+        os.makedirs(directory, exist_ok=True)
+
+        # A batch of symbols at a time bounds memory to batch x one year of bars
+        symbol_batch = symbol_batch or settings.ARCHIVE_IPC_SYMBOL_BATCH
+        columns = ["stock_code", "date_time"] + BAR_COLUMNS
+        for start in range(0, len(codes), symbol_batch):
+            batch = codes[start:start + symbol_batch]
+            table = dataset.to_table(
+                columns=columns, filter=in_year & ds.field("stock_code").isin(batch)
+            ).sort_by([("stock_code", "ascending"), ("date_time", "ascending")])
+            stock_codes = table.column("stock_code").to_numpy(zero_copy_only=False)
+            bounds = np.flatnonzero(stock_codes[1:] != stock_codes[:-1]) + 1
+            for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(stock_codes)]):
+                symbol = table.slice(lo, hi - lo).drop_columns(["stock_code"]).combine_chunks()
+                path = os.path.join(directory, f"{stock_codes[lo]}.arrow")
+                with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, symbol.schema) as writer:
+                    writer.write_table(symbol, max_chunksize=len(symbol) or None)
+        logger.info(f"Minute IPC files built for {year}: {len(codes)} symbols")
+        return len(codes)
+
+    def load_minute_bars(self, stock_codes: Sequence[str], year: int) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Memory-map the IPC files of symbols: {stock_code: {"date_time": datetime64[ms],
+        "open_price".."volume": arrays}}, zero copy (views on the mapped files)
+        """
+        pa = _pyarrow()
+        bars = {}
+        for stock_code in stock_codes:
+            path = os.path.join(self.minute_ipc_dir(year), f"{stock_code}.arrow")
+            if not os.path.exists(path):
+                continue
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            bars[stock_code] = {
+                name: table.column(name).combine_chunks().to_numpy(zero_copy_only=True)
+                for name in ["date_time"] + BAR_COLUMNS
+            }
+        return bars
+
+    def load_minute_matrix(
+        self, stock_codes: Sequence[str], year: int, value_columns: Sequence[str] = PRICE_COLUMNS,
+        fill_forward: bool = True
+    ) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Load symbols as symbol x time matrices on the union of their bar times
+        (same layout as IndicatorUtil.to_matrix)
+        """
+        bars = self.load_minute_bars(stock_codes, year)
+        codes = [code for code in stock_codes if code in bars]
+        if not codes:
+            return [], np.array([], dtype="datetime64[ms]"), {name: np.empty((0, 0)) for name in value_columns}
+        first_times = bars[codes[0]]["date_time"]
+        aligned = all(np.array_equal(bars[code]["date_time"], first_times) for code in codes[1:])
+        if aligned:
+            # Every symbol has the same bar times (the usual case): stack without re-indexing
+            matrices = {name: np.vstack([bars[code][name] for code in codes]).astype(np.float64)
+                        for name in value_columns}
+            times = first_times
+        else:
+            times = np.unique(np.concatenate([bars[code]["date_time"] for code in codes]))
+            matrices = {name: np.full((len(codes), len(times)), np.nan) for name in value_columns}
+            for row, code in enumerate(codes):
+                index = np.searchsorted(times, bars[code]["date_time"])
+                for name in value_columns:
+                    matrices[name][row, index] = bars[code][name]
+        if fill_forward:
+            matrices = {name: IndicatorUtil.fill_forward(matrix) for name, matrix in matrices.items()}
+        return codes, times, matrices
+
+    def load_day_matrix(
+        self, stock_codes: Optional[Sequence[str]], start_year: int, end_year: int,
+        value_columns: Sequence[str] = PRICE_COLUMNS, fill_forward: bool = True
+    ) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """Load archived day info of years as symbol x date matrices"""
+        pa = _pyarrow()
+        tables = [pa.parquet.read_table(self.day_file(year)) for year in range(start_year, end_year + 1)
+                  if os.path.exists(self.day_file(year))]
+        if not tables:
+            return [], np.array([]), {name: np.empty((0, 0)) for name in value_columns}
+        table = pa.concat_tables(tables)
+        if stock_codes is not None:
+            table = table.filter(pa.compute.is_in(table.column("stock_code"), pa.array(list(stock_codes))))
+        codes, code_index = np.unique(table.column("stock_code").to_numpy(zero_copy_only=False),
+                                      return_inverse=True)
+        tr_dates, date_index = np.unique(table.column("tr_date").to_numpy(zero_copy_only=False),
+                                         return_inverse=True)
+        matrices = {}
+        for name in value_columns:
+            matrix = np.full((len(codes), len(tr_dates)), np.nan)
+            matrix[code_index, date_index] = table.column(name).to_numpy()
+            matrices[name] = matrix
+        if fill_forward:
+            matrices = {name: IndicatorUtil.fill_forward(matrix) for name, matrix in matrices.items()}
+        return [str(code) for code in codes], tr_dates, matrices
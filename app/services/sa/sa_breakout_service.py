@@ -0,0 +1,138 @@
+"""
+SA Breakout Service
+
+Volatility breakout targets (today open + (previous high - previous low) x k)
+for the whole universe, computed once per trade date from stored day info
+with NumPy and looked up in O(1) by the buy checks. Targets are instance
+state: live checks share the instance from get(), while a backtest keeps
+its own so replaying past dates never replaces the live targets.
+변동성 돌파 전략 매수 목표가
+"""
+
+import logging
+from typing import Dict, List, Mapping, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from app.common.single_flight import SingleFlight
+from app.config.settings import settings
+from app.services.sa.async_sa_db_service import create_sa_db_service
+from app.utils import DateUtil
+from app.utils.indicator_util import IndicatorUtil
+
+logger = logging.getLogger(__name__)
+
+class SaBreakoutService:
+    """SA Breakout Service - volatility breakout target prices"""
+
+    # Instance of the live buy checks
+    _shared: Optional["SaBreakoutService"] = None
+
+    def __init__(self, db_session: Optional[Session] = None):
+        self.db = db_session
+        self.sa_db_service = create_sa_db_service(db_session)
+        # Targets of the prepared trade date
+        self.tr_date: Optional[str] = None
+        self.k: float = settings.BREAKOUT_K
+        self._ranges: Dict[str, float] = {}
+        self._targets: Dict[str, float] = {}
+        self._preparing = SingleFlight()
+        logger.info("SaBreakoutService Init...")
+
+    @classmethod
+    def get(cls) -> "SaBreakoutService":
+        """Get the instance shared by the live buy checks (a session per call)"""
+        if cls._shared is None:
+            cls._shared = SaBreakoutService()
+        return cls._shared
+
+    @classmethod
+    def is_shared(cls, instance: "SaBreakoutService") -> bool:
+        """Whether an instance holds the live targets"""
+        return instance is cls._shared
+
+    async def prepare(
+        self, tr_date: str, stock_codes: Optional[List[str]] = None, k: Optional[float] = None
+    ) -> int:
+        """
+        Compute breakout targets of the universe for a trade date
+        (previous day range from day info; today's open from day info when stored,
+        otherwise set later with update_open_prices). Returns the number of stocks.
+        """
+        try:
+            k = settings.BREAKOUT_K if k is None else k
+            if stock_codes is None:
+                stock_codes = [stock.stock_code for stock in await self.sa_db_service.find_all_stock_list()]
+            start_tr_date = DateUtil.add_days(
+                DateUtil.parse_date_string(tr_date), -settings.BREAKOUT_LOOKBACK_DAYS
+            ).strftime("%Y%m%d")
+            rows = await self.sa_db_service.find_day_info_columns_by_stock_codes_and_period(
+                stock_codes, start_tr_date, tr_date
+            )
+            codes, tr_dates, day = IndicatorUtil.to_matrix(
+                rows, ["open_price", "high_price", "low_price"], fill_forward=False
+            )
+
+            ranges = np.full(len(codes), np.nan)
+            opens = np.full(len(codes), np.nan)
+            if codes:
+                # Latest stored day before the trade date, per stock
+                before = np.searchsorted(tr_dates, tr_date)
+                if before > 0:
+                    previous_range = day["high_price"][:, :before] - day["low_price"][:, :before]
+                    ranges = IndicatorUtil.fill_forward(previous_range)[:, -1]
+                if before < len(tr_dates) and tr_dates[before] == tr_date:
+                    opens = day["open_price"][:, before]
+            targets = opens + ranges * k
+
+            self.tr_date = tr_date
+            self.k = k
+            self._ranges = {
+                code: value for code, value in zip(codes, ranges.tolist()) if not np.isnan(value)
+            }
+            self._targets = {
+                code: value for code, value in zip(codes, targets.tolist()) if not np.isnan(value)
+            }
+            logger.info(f"Breakout targets prepared for {tr_date}: {len(self._ranges)} ranges, "
+                        f"{len(self._targets)} targets (k={k})")
+            return len(self._ranges)
+        except Exception as e:
+            logger.error(f"Error preparing breakout targets for {tr_date}: {e}")
+            raise
+
+    async def ensure_prepared(self, tr_date: str) -> int:
+        """
+        Prepare the targets of a trade date unless already prepared; concurrent
+        callers share one prepare. Returns the number of stocks.
+        """
+        if self.tr_date == tr_date:
+            return len(self._ranges)
+        return await self._preparing.do(tr_date, lambda: self.prepare(tr_date))
+
+    def update_open_prices(self, open_prices: Mapping[str, float]) -> int:
+        """Set today's open prices (e.g. from the first quotes after the open)"""
+        updated = 0
+        for stock_code, open_price in open_prices.items():
+            previous_range = self._ranges.get(stock_code)
+            if previous_range is not None and open_price:
+                self._targets[stock_code] = float(open_price) + previous_range * self.k
+                updated += 1
+        return updated
+
+    def get_target_price(self, stock_code: str) -> Optional[float]:
+        """Get the breakout target of a stock (None if not prepared)"""
+        return self._targets.get(stock_code)
+
+    def is_breakout(self, stock_code: str, current_price: float) -> bool:
+        """Whether the current price is above the breakout target"""
+        target_price = self._targets.get(stock_code)
+        return target_price is not None and current_price > target_price
+
+    def find_breakouts(self, current_prices: Mapping[str, float]) -> List[str]:
+        """Stock codes whose current price is above the breakout target"""
+        return [code for code, price in current_prices.items() if self.is_breakout(code, price)]
+
+    def reset(self):
+        """Forget prepared targets"""
+        self.tr_date = None
+        self._ranges = {}
+        self._targets = {}
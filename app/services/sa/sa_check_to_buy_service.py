@@ -6,37 +6,57 @@ Analyzes buy conditions for stocks.
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Mapping, Optional
 from sqlalchemy.orm import Session
-from app.services.sa.sa_db_service import SaDbService
+from app.services.sa.async_sa_db_service import create_sa_db_service
+from app.services.sa.sa_breakout_service import SaBreakoutService
 
 logger = logging.getLogger(__name__)
 
 class SaCheckToBuyService:
     """SA Check To Buy Service - converted from SaCheckToBuyService.kt"""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, sa_breakout_service: Optional[SaBreakoutService] = None):
         self.db = db_session
-        self.sa_db_service = SaDbService(db_session)
+        self.sa_db_service = create_sa_db_service(db_session)
+        # Live checks share the breakout targets; backtests pass their own instance
+        self.sa_breakout_service = sa_breakout_service or SaBreakoutService.get()
         logger.info("SaCheckToBuyService Init...")
     
-    async def check_buy_condition(self, stock_code: str, tr_date: str, tr_time: str) -> Dict[str, Any]:
+    async def check_buy_condition(
+        self, stock_code: str, tr_date: str, tr_time: str, current_price: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Check if stock meets buy conditions"""
         try:
-            # TODO: Implement comprehensive buy condition checking
-            # This would include technical indicators, market conditions, etc.
+            # Breakout targets are computed once per trade date for the whole universe
+            await self.sa_breakout_service.ensure_prepared(tr_date)
             
-            score = 0.5  # Placeholder score
-            signals = ["RSI_OVERSOLD", "MOVING_AVERAGE_CROSSOVER"]
+            target_price = self.sa_breakout_service.get_target_price(stock_code)
+            signals = []
+            score = 0.0
+            if current_price is not None and self.sa_breakout_service.is_breakout(stock_code, current_price):
+                signals.append("VOLATILITY_BREAKOUT")
+                score = 1.0
             
             return {
                 "stock_code": stock_code,
                 "buy_recommended": score > 0.7,
                 "score": score,
                 "signals": signals,
+                "current_price": current_price,
+                "target_price": target_price,
                 "analysis_date": tr_date,
                 "analysis_time": tr_time
             }
         except Exception as e:
             logger.error(f"Error checking buy condition for {stock_code}: {e}")
             raise
+    
+    async def update_open_prices(self, tr_date: str, open_prices: Mapping[str, float]) -> int:
+        """Set today's open prices of the breakout targets (stored day info has none on the trade date)"""
+        try:
+            await self.sa_breakout_service.ensure_prepared(tr_date)
+            return self.sa_breakout_service.update_open_prices(open_prices)
+        except Exception as e:
+            logger.error(f"Error updating open prices for {tr_date}: {e}")
+            raise
@@ -8,7 +8,7 @@ Analyzes sell conditions for stocks.
 import logging
 from typing import Dict, Any
 from sqlalchemy.orm import Session
-from app.services.sa.sa_db_service import SaDbService
+from app.services.sa.async_sa_db_service import create_sa_db_service
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ class SaCheckToSellService:
     
     def __init__(self, db_session: Session):
         self.db = db_session
-        self.sa_db_service = SaDbService(db_session)
+        self.sa_db_service = create_sa_db_service(db_session)
         logger.info("SaCheckToSellService Init...")
     
     async def check_sell_condition(self, stock_code: str, tr_date: str, tr_time: str) -> Dict[str, Any]:
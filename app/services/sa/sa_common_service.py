@@ -8,8 +8,9 @@ Common utilities and functions for Stock Analysis.
 import logging
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
-from app.services.sa.sa_db_service import SaDbService
+from app.services.sa.async_sa_db_service import create_sa_db_service
 from app.utils import DateUtil, CommUtil
+from app.common.market_calendar import MarketCalendar
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +19,7 @@ class SaCommonService:
     
     def __init__(self, db_session: Session):
         self.db = db_session
-        self.sa_db_service = SaDbService(db_session)
+        self.sa_db_service = create_sa_db_service(db_session)
         logger.info("SaCommonService Init...")
     
     async def get_stock_status(self, stock_code: str) -> Dict[str, Any]:
@@ -45,5 +46,4 @@ class SaCommonService:
     
     def is_trading_hours(self) -> bool:
         """Check if current time is within trading hours"""
-        # TODO: Implement proper trading hours check
-        return True
+        return MarketCalendar.get("KRX").is_trading_hours()
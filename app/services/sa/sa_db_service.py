@@ -6,9 +6,12 @@ Handles all database operations for Stock Analysis functionality.
 """
 
 import logging
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Mapping, Sequence, Tuple, Union
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, or_, desc, asc, select, insert, delete, func
+from sqlalchemy.dialects import mysql, sqlite
+from app.config.settings import settings
 from app.models import (
     StockList, DayStatEntity, MinuteStat, MinuteData, AuthInfo,
     OrderHistory, MonitoringList, StockCode, SearchResultLogEntity,
@@ -18,6 +21,19 @@ from app.utils import DateUtil
 
 logger = logging.getLogger(__name__)
 
+# Columns written by the bulk save paths and the unique key each upsert conflicts on
+STOCK_LIST_COLUMNS = ["stock_code", "stock_name", "market", "sector"]
+STOCK_LIST_KEY = ["stock_code"]
+MINUTE_DATA_COLUMNS = ["stock_code", "date_time", "open_price", "high_price",
+                       "low_price", "close_price", "volume"]
+MINUTE_DATA_KEY = ["stock_code", "date_time"]
+DAY_STAT_COLUMNS = ["stock_code", "tr_date", "open_price", "high_price",
+                    "low_price", "close_price", "volume"]
+DAY_STAT_KEY = ["stock_code", "tr_date"]
+ORDER_HISTORY_COLUMNS = ["order_id", "stock_code", "order_type", "quantity", "price",
+                         "status", "order_time", "execution_time"]
+ORDER_HISTORY_KEY = ["order_id"]
+
 class SaDbService:
     """SA Database Service - converted from SaDbService.kt"""
     
@@ -25,20 +41,149 @@ class SaDbService:
         self.db = db_session
         logger.info("StockAutoDbService Init ........")
     
+    def _dialect_name(self) -> str:
+        return self.db.get_bind().dialect.name
+    
+    def _upsert_statements(
+        self,
+        model,
+        rows: Sequence[Union[Any, Mapping[str, Any]]],
+        columns: List[str],
+        key_columns: List[str],
+        batch_size: Optional[int] = None,
+        overwrite: bool = True
+    ) -> List[Any]:
+        """
+        Build chunked multi-row INSERTs of rows (entities or mappings) that update
+        existing rows on unique key conflict, or keep them when overwrite is off
+        (MySQL ON DUPLICATE KEY UPDATE / SQLite ON CONFLICT DO UPDATE / DO NOTHING)
+        """
+        values = [
+            {column: (row.get(column) if isinstance(row, Mapping) else getattr(row, column))
+             for column in columns}
+            for row in rows
+        ]
+        update_columns = [column for column in columns if column not in key_columns]
+        if "updated_at" in model.__table__.columns:
+            update_columns.append("updated_at")
+        batch_size = batch_size or settings.DB_BULK_BATCH_SIZE
+        dialect = self._dialect_name()
+        
+        statements = []
+        for start in range(0, len(values), batch_size):
+            chunk = values[start:start + batch_size]
+            if dialect == "mysql":
+                stmt = mysql.insert(model).values(chunk)
+                if overwrite:
+                    stmt = stmt.on_duplicate_key_update(
+                        {column: stmt.inserted[column] for column in update_columns}
+                    )
+                else:
+                    # Assigning a key column to itself leaves the existing row as it is
+                    stmt = stmt.on_duplicate_key_update({key_columns[0]: model.__table__.c[key_columns[0]]})
+            elif dialect == "sqlite":
+                stmt = sqlite.insert(model).values(chunk)
+                if overwrite:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=key_columns,
+                        set_={column: stmt.excluded[column] for column in update_columns}
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=key_columns)
+            else:
+                stmt = insert(model).values(chunk)
+            statements.append(stmt)
+        return statements
+    
+    def _bulk_upsert(
+        self,
+        model,
+        rows: Sequence[Union[Any, Mapping[str, Any]]],
+        columns: List[str],
+        key_columns: List[str],
+        batch_size: Optional[int] = None,
+        overwrite: bool = True
+    ) -> int:
+        """Upsert rows in chunks, returning the row count"""
+        if not rows:
+            return 0
+        for stmt in self._upsert_statements(model, rows, columns, key_columns, batch_size, overwrite):
+            self.db.execute(stmt)
+        self.db.commit()
+        return len(rows)
+    
+    @staticmethod
+    def _day_info_columns_statement(
+        stock_codes: Optional[List[str]], start_tr_date: Optional[str], end_tr_date: Optional[str]
+    ):
+        conditions = [DayStatEntity.stock_code.in_(stock_codes)] if stock_codes is not None else []
+        if start_tr_date:
+            conditions.append(DayStatEntity.tr_date >= start_tr_date)
+        if end_tr_date:
+            conditions.append(DayStatEntity.tr_date <= end_tr_date)
+        return select(
+            DayStatEntity.stock_code, DayStatEntity.tr_date, DayStatEntity.open_price,
+            DayStatEntity.high_price, DayStatEntity.low_price, DayStatEntity.close_price,
+            DayStatEntity.volume
+        ).where(and_(*conditions)).order_by(DayStatEntity.stock_code, DayStatEntity.tr_date)
+    
+    @staticmethod
+    def _minute_data_columns_statement(
+        stock_codes: Optional[List[str]], start_date_time: datetime, end_date_time: datetime
+    ):
+        conditions = [MinuteData.date_time >= start_date_time, MinuteData.date_time <= end_date_time]
+        if stock_codes is not None:
+            conditions.append(MinuteData.stock_code.in_(stock_codes))
+        return select(
+            MinuteData.stock_code, MinuteData.date_time, MinuteData.open_price,
+            MinuteData.high_price, MinuteData.low_price, MinuteData.close_price,
+            MinuteData.volume
+        ).where(and_(*conditions)).order_by(MinuteData.stock_code, MinuteData.date_time)
+    
+    @staticmethod
+    def _minute_data_day_rollup_statement(start_date_time: datetime, end_date_time: datetime):
+        """Per stock OHLCV of the minute bars in [start, end): first open, max high, min low, last close, volume sum"""
+        bars = select(
+            MinuteData.stock_code,
+            func.min(MinuteData.date_time).label("first_time"),
+            func.max(MinuteData.date_time).label("last_time"),
+            func.max(MinuteData.high_price).label("high_price"),
+            func.min(MinuteData.low_price).label("low_price"),
+            func.sum(MinuteData.volume).label("volume")
+        ).where(
+            and_(MinuteData.date_time >= start_date_time, MinuteData.date_time < end_date_time)
+        ).group_by(MinuteData.stock_code).subquery()
+        first_bar = aliased(MinuteData)
+        last_bar = aliased(MinuteData)
+        return select(
+            bars.c.stock_code, first_bar.open_price, bars.c.high_price,
+            bars.c.low_price, last_bar.close_price, bars.c.volume
+        ).select_from(bars).join(
+            first_bar, and_(first_bar.stock_code == bars.c.stock_code, first_bar.date_time == bars.c.first_time)
+        ).join(
+            last_bar, and_(last_bar.stock_code == bars.c.stock_code, last_bar.date_time == bars.c.last_time)
+        ).order_by(bars.c.stock_code)
+    
+    @staticmethod
+    def _minute_data_delete_statement(end_date_time: datetime, start_date_time: Optional[datetime] = None):
+        conditions = [MinuteData.date_time < end_date_time]
+        if start_date_time is not None:
+            conditions.append(MinuteData.date_time >= start_date_time)
+        return delete(MinuteData).where(and_(*conditions))
+    
     # stockListRepository methods
-    async def save_all_stock_list(self, entity_list: List[StockList]) -> List[StockList]:
-        """Save all stock list entities"""
+    async def save_all_stock_list(
+        self, entity_list: Sequence[Union[StockList, Mapping[str, Any]]], batch_size: Optional[int] = None
+    ) -> int:
+        """Save (upsert by stock code) all stock list entities, returning the row count"""
         try:
-            for entity in entity_list:
-                self.db.add(entity)
-            self.db.commit()
-            return entity_list
+            return self._bulk_upsert(StockList, entity_list, STOCK_LIST_COLUMNS, STOCK_LIST_KEY, batch_size)
         except Exception as e:
             logger.error(f"Error saving stock list: {e}")
             self.db.rollback()
             raise
     
-    def find_all_stock_list(self) -> List[StockList]:
+    async def find_all_stock_list(self) -> List[StockList]:
         """Find all stock list"""
         try:
             return self.db.query(StockList).all()
@@ -85,14 +230,46 @@ class SaDbService:
             logger.error(f"Error finding day info for {stock_code} on {tr_date}: {e}")
             raise
     
+    async def find_day_info_columns_by_stock_codes_and_period(
+        self, stock_codes: Optional[List[str]], start_tr_date: Optional[str] = None, end_tr_date: Optional[str] = None
+    ) -> List[Tuple]:
+        """
+        Find day info of many stocks (None: all) as plain row tuples (no ORM objects)
+        ordered by stock code and date:
+        (stock_code, tr_date, open_price, high_price, low_price, close_price, volume)
+        """
+        try:
+            return self.db.execute(
+                self._day_info_columns_statement(stock_codes, start_tr_date, end_tr_date)
+            ).all()
+        except Exception as e:
+            logger.error(f"Error finding day info columns: {e}")
+            raise
+    
+    async def save_all_day_info_list(
+        self, entity_list: Sequence[Union[DayStatEntity, Mapping[str, Any]]], batch_size: Optional[int] = None,
+        overwrite: bool = True
+    ) -> int:
+        """
+        Save (upsert by stock code and date) all day info entities, returning the row count
+        (overwrite=False only inserts missing days and keeps stored ones)
+        """
+        try:
+            return self._bulk_upsert(
+                DayStatEntity, entity_list, DAY_STAT_COLUMNS, DAY_STAT_KEY, batch_size, overwrite
+            )
+        except Exception as e:
+            logger.error(f"Error saving day info list: {e}")
+            self.db.rollback()
+            raise
+    
     # minuteDataRepository methods
-    async def save_all_minute_data_list(self, entity_list: List[MinuteData]) -> List[MinuteData]:
-        """Save all minute data entities"""
+    async def save_all_minute_data_list(
+        self, entity_list: Sequence[Union[MinuteData, Mapping[str, Any]]], batch_size: Optional[int] = None
+    ) -> int:
+        """Save (upsert by stock code and time) all minute data entities, returning the row count"""
         try:
-            for entity in entity_list:
-                self.db.add(entity)
-            self.db.commit()
-            return entity_list
+            return self._bulk_upsert(MinuteData, entity_list, MINUTE_DATA_COLUMNS, MINUTE_DATA_KEY, batch_size)
         except Exception as e:
             logger.error(f"Error saving minute data list: {e}")
             self.db.rollback()
@@ -114,7 +291,55 @@ class SaDbService:
             logger.error(f"Error finding minute data by period: {e}")
             raise
     
-    def find_minute_data_by_tr_time(self, stock_code: str, tr_date: str, tr_time: str) -> Optional[MinuteData]:
+    async def find_minute_data_columns_by_stock_codes_and_period(
+        self, stock_codes: Optional[List[str]], start_date_time: datetime, end_date_time: datetime
+    ) -> List[Tuple]:
+        """
+        Find minute data of many stocks (None: all) as plain row tuples (no ORM objects)
+        ordered by stock code and time:
+        (stock_code, date_time, open_price, high_price, low_price, close_price, volume)
+        """
+        try:
+            return self.db.execute(
+                self._minute_data_columns_statement(stock_codes, start_date_time, end_date_time)
+            ).all()
+        except Exception as e:
+            logger.error(f"Error finding minute data columns: {e}")
+            raise
+    
+    async def find_minute_data_day_rollup(self, start_date_time: datetime, end_date_time: datetime) -> List[Tuple]:
+        """
+        Aggregate the minute bars in [start, end) per stock as plain row tuples:
+        (stock_code, open_price, high_price, low_price, close_price, volume)
+        """
+        try:
+            return self.db.execute(self._minute_data_day_rollup_statement(start_date_time, end_date_time)).all()
+        except Exception as e:
+            logger.error(f"Error rolling up minute data: {e}")
+            raise
+    
+    async def find_minute_data_first_date_time(self) -> Optional[datetime]:
+        """Find the time of the oldest stored minute bar"""
+        try:
+            return self.db.execute(select(func.min(MinuteData.date_time))).scalar()
+        except Exception as e:
+            logger.error(f"Error finding first minute data time: {e}")
+            raise
+    
+    async def delete_minute_data_before(
+        self, end_date_time: datetime, start_date_time: Optional[datetime] = None
+    ) -> int:
+        """Delete minute bars before a time (from start_date_time if given), returning the row count"""
+        try:
+            result = self.db.execute(self._minute_data_delete_statement(end_date_time, start_date_time))
+            self.db.commit()
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"Error deleting minute data: {e}")
+            self.db.rollback()
+            raise
+    
+    async def find_minute_data_by_tr_time(self, stock_code: str, tr_date: str, tr_time: str) -> Optional[MinuteData]:
         """Find minute data by specific time"""
         try:
             return self.db.query(MinuteData).filter(
@@ -153,7 +378,7 @@ class SaDbService:
             raise
     
     # authInfoRepository methods
-    def find_all_auth_info_with_account(self) -> List[AuthInfo]:
+    async def find_all_auth_info_with_account(self) -> List[AuthInfo]:
         """Find all auth info with account"""
         try:
             return self.db.query(AuthInfo).filter(AuthInfo.account_number.isnot(None)).all()
@@ -165,8 +390,8 @@ class SaDbService:
         """Save auth info entity"""
         try:
             if entity.id:
-                # Update existing
-                self.db.merge(entity)
+                # Update existing (a detached entity is copied onto the session's instance)
+                entity = self.db.merge(entity)
             else:
                 # Create new
                 self.db.add(entity)
@@ -191,7 +416,18 @@ class SaDbService:
             self.db.rollback()
             raise
     
-    def find_order_history_by_stock_code_and_order_type(
+    async def save_all_order_history_list(
+        self, entity_list: Sequence[Union[OrderHistory, Mapping[str, Any]]], batch_size: Optional[int] = None
+    ) -> int:
+        """Save (upsert by order id) all order history entities, returning the row count"""
+        try:
+            return self._bulk_upsert(OrderHistory, entity_list, ORDER_HISTORY_COLUMNS, ORDER_HISTORY_KEY, batch_size)
+        except Exception as e:
+            logger.error(f"Error saving order history list: {e}")
+            self.db.rollback()
+            raise
+    
+    async def find_order_history_by_stock_code_and_order_type(
         self, stock_code: str, order_type: str
     ) -> List[OrderHistory]:
         """Find order history by stock code and order type"""
@@ -216,7 +452,7 @@ class SaDbService:
             self.db.rollback()
             raise
     
-    def find_all_monitoring_list_active(self) -> List[MonitoringList]:
+    async def find_all_monitoring_list_active(self) -> List[MonitoringList]:
         """Find all active monitoring list"""
         try:
             return self.db.query(MonitoringList).filter(MonitoringList.is_active == True).all()
@@ -237,7 +473,7 @@ class SaDbService:
             self.db.rollback()
             raise
     
-    def find_all_stock_code(self) -> List[StockCode]:
+    async def find_all_stock_code(self) -> List[StockCode]:
         """Find all stock codes"""
         try:
             return self.db.query(StockCode).all()
@@ -258,7 +494,7 @@ class SaDbService:
             self.db.rollback()
             raise
     
-    def find_running_thread_by_thread_name(self, thread_name: str) -> Optional[RunningThread]:
+    async def find_running_thread_by_thread_name(self, thread_name: str) -> Optional[RunningThread]:
         """Find running thread by thread name"""
         try:
             return self.db.query(RunningThread).filter(RunningThread.thread_name == thread_name).first()
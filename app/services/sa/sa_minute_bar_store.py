@@ -0,0 +1,261 @@
+"""
+SA Minute Bar Store
+
+In-memory, per-stock columnar (NumPy) OHLCV minute bars with binary-search
+time slicing and write-behind flushing of new bars to the minute_data table.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.services.sa.async_sa_db_service import create_sa_db_service
+
+logger = logging.getLogger(__name__)
+
+TimeLike = Union[datetime, np.datetime64, str]
+
+def to_datetime64(value: TimeLike) -> np.datetime64:
+    """Convert datetime / "YYYYMMDD HHMMSS" string to datetime64[s]"""
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y%m%d %H%M%S")
+    return np.datetime64(value, "s")
+
+class MinuteBarSeries:
+    """Growable OHLCV arrays of one stock, kept sorted by time"""
+
+    COLUMNS = ("open_price", "high_price", "low_price", "close_price", "volume")
+
+    def __init__(self, capacity: int = 512):
+        self.size = 0
+        self.date_time = np.empty(capacity, dtype="datetime64[s]")
+        self.open_price = np.empty(capacity, dtype=np.float64)
+        self.high_price = np.empty(capacity, dtype=np.float64)
+        self.low_price = np.empty(capacity, dtype=np.float64)
+        self.close_price = np.empty(capacity, dtype=np.float64)
+        self.volume = np.empty(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, size: int):
+        """Grow the arrays (doubling) to hold size bars"""
+        capacity = len(self.date_time)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("date_time",) + self.COLUMNS:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, date_time: np.datetime64, open_price: float, high_price: float,
+               low_price: float, close_price: float, volume: int):
+        """Append a bar; a bar for an existing minute replaces it"""
+        index = self.size
+        if self.size and date_time <= self.date_time[self.size - 1]:
+            index = int(np.searchsorted(self.date_time[:self.size], date_time))
+            if index < self.size and self.date_time[index] == date_time:
+                self._set(index, date_time, open_price, high_price, low_price, close_price, volume)
+                return
+            # Late bar: shift the tail to keep the series sorted
+            self._reserve(self.size + 1)
+            for name in ("date_time",) + self.COLUMNS:
+                column = getattr(self, name)
+                column[index + 1:self.size + 1] = column[index:self.size]
+        else:
+            self._reserve(self.size + 1)
+        self._set(index, date_time, open_price, high_price, low_price, close_price, volume)
+        self.size += 1
+
+    def extend(self, date_time: np.ndarray, open_price: np.ndarray, high_price: np.ndarray,
+               low_price: np.ndarray, close_price: np.ndarray, volume: np.ndarray):
+        """Append many bars at once (merged and re-sorted if they overlap)"""
+        count = len(date_time)
+        if count == 0:
+            return
+        start = self.size
+        self._reserve(self.size + count)
+        end = start + count
+        self.date_time[start:end] = date_time
+        self.open_price[start:end] = open_price
+        self.high_price[start:end] = high_price
+        self.low_price[start:end] = low_price
+        self.close_price[start:end] = close_price
+        self.volume[start:end] = volume
+        self.size = end
+
+        times = self.date_time[:end]
+        if np.any(times[1:] <= times[:-1]):
+            # Sort, keeping the last bar written for a duplicated minute
+            order = np.argsort(times, kind="stable")
+            sorted_times = times[order]
+            keep = np.append(sorted_times[1:] != sorted_times[:-1], True)
+            order = order[keep]
+            for name in ("date_time",) + self.COLUMNS:
+                column = getattr(self, name)
+                column[:len(order)] = column[:end][order]
+            self.size = len(order)
+
+    def _set(self, index: int, date_time, open_price, high_price, low_price, close_price, volume):
+        self.date_time[index] = date_time
+        self.open_price[index] = open_price
+        self.high_price[index] = high_price
+        self.low_price[index] = low_price
+        self.close_price[index] = close_price
+        self.volume[index] = volume
+
+    def slice(self, start: Optional[np.datetime64] = None,
+              end: Optional[np.datetime64] = None) -> Dict[str, np.ndarray]:
+        """Get bars with start <= date_time <= end as array views (binary search)"""
+        times = self.date_time[:self.size]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = self.size if end is None else int(np.searchsorted(times, end, side="right"))
+        result = {"date_time": times[lo:hi]}
+        for name in self.COLUMNS:
+            result[name] = getattr(self, name)[lo:hi]
+        return result
+
+class SaMinuteBarStore:
+    """Per-stock columnar minute bar store with write-behind persistence"""
+
+    def __init__(self, db_session: Session, flush_size: Optional[int] = None):
+        self.sa_db_service = create_sa_db_service(db_session)
+        self.flush_size = flush_size or settings.MINUTE_BAR_FLUSH_SIZE
+        self._series: Dict[str, MinuteBarSeries] = {}
+        self._pending: List[Tuple[str, np.datetime64, float, float, float, float, int]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        logger.info("SaMinuteBarStore Init...")
+
+    def series(self, stock_code: str) -> MinuteBarSeries:
+        """Get (or create) the series of a stock"""
+        series = self._series.get(stock_code)
+        if series is None:
+            series = MinuteBarSeries()
+            self._series[stock_code] = series
+        return series
+
+    @property
+    def stock_codes(self) -> List[str]:
+        return list(self._series.keys())
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def append(self, stock_code: str, date_time: TimeLike, open_price: float, high_price: float,
+               low_price: float, close_price: float, volume: int, persist: bool = True):
+        """Append a bar; persisted bars are written to the DB on the next flush"""
+        date_time = to_datetime64(date_time)
+        self.series(stock_code).append(date_time, open_price, high_price, low_price, close_price, volume)
+        if persist:
+            self._pending.append((stock_code, date_time, open_price, high_price,
+                                  low_price, close_price, volume))
+            if len(self._pending) >= self.flush_size:
+                self._schedule_flush()
+
+    def get_bars(self, stock_code: str, start: Optional[TimeLike] = None,
+                 end: Optional[TimeLike] = None) -> Dict[str, np.ndarray]:
+        """Get bars of a stock between start and end (inclusive) as arrays"""
+        return self.series(stock_code).slice(
+            None if start is None else to_datetime64(start),
+            None if end is None else to_datetime64(end)
+        )
+
+    def find_minute_bars_by_tr_date_and_tr_time_period(
+        self, stock_code: str, tr_date: str, start_tr_time: str, end_tr_time: str
+    ) -> Dict[str, np.ndarray]:
+        """Columnar counterpart of find_minute_data_by_stock_code_and_tr_date_and_tr_time_period_desc (ascending)"""
+        return self.get_bars(stock_code, f"{tr_date} {start_tr_time}", f"{tr_date} {end_tr_time}")
+
+    async def load(self, stock_codes: List[str], start: TimeLike, end: TimeLike) -> int:
+        """Load bars of many stocks from the DB without building ORM objects"""
+        rows = await self.sa_db_service.find_minute_data_columns_by_stock_codes_and_period(
+            stock_codes, _to_py_datetime(start), _to_py_datetime(end)
+        )
+        if not rows:
+            return 0
+
+        codes, times, opens, highs, lows, closes, volumes = zip(*rows)
+        codes = np.array(codes)
+        times = np.array(times, dtype="datetime64[s]")
+        columns = [np.array(values, dtype=np.float64) for values in (opens, highs, lows, closes)]
+        volumes = np.array([v or 0 for v in volumes], dtype=np.int64)
+
+        # Rows are ordered by stock_code, date_time: split on code boundaries
+        boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, len(codes)]):
+            self.series(str(codes[lo])).extend(
+                times[lo:hi], *(column[lo:hi] for column in columns), volumes[lo:hi]
+            )
+        logger.info(f"Loaded {len(codes)} minute bars of {len(boundaries) + 1} stocks")
+        return len(codes)
+
+    async def flush(self) -> int:
+        """Write pending bars to the DB"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, []
+            rows = [
+                {
+                    "stock_code": stock_code, "date_time": date_time.astype(datetime),
+                    "open_price": float(open_price), "high_price": float(high_price),
+                    "low_price": float(low_price), "close_price": float(close_price),
+                    "volume": int(volume)
+                }
+                for stock_code, date_time, open_price, high_price, low_price, close_price, volume in pending
+            ]
+            try:
+                await self.sa_db_service.save_all_minute_data_list(rows)
+            except Exception:
+                # Keep the bars so the next flush retries them
+                self._pending[:0] = pending
+                raise
+            return len(pending)
+
+    def _schedule_flush(self):
+        """Flush in the background when called from a running event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self._flush_quietly())
+
+    async def _flush_quietly(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing minute bars: {e}")
+
+    def start_flusher(self, interval: Optional[float] = None):
+        """Start periodic write-behind flushing"""
+        interval = interval or settings.MINUTE_BAR_FLUSH_INTERVAL
+
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                await self._flush_quietly()
+
+        if self._flusher is None:
+            self._flusher = asyncio.ensure_future(run())
+
+    async def stop_flusher(self):
+        """Stop periodic flushing and write what is left"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+def _to_py_datetime(value: TimeLike) -> datetime:
+    return to_datetime64(value).astype(datetime)
@@ -0,0 +1,205 @@
+"""
+SA Minute Retention Service
+
+Keeps the minute_data table at a constant size: on MySQL the table is
+RANGE partitioned by month on date_time (new partitions are added ahead,
+expired ones dropped in O(1)); elsewhere expired bars are deleted a day
+at a time. Minute bars are rolled up into day_stat before they go.
+"""
+
+import inspect
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.services.sa.async_sa_db_service import create_sa_db_service
+
+logger = logging.getLogger(__name__)
+
+MINUTE_DATA_TABLE = "minute_data"
+MAX_PARTITION = "pmax"
+
+def month_start(day: date) -> date:
+    """First day of the month of a date"""
+    return day.replace(day=1)
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month some months after a date's month"""
+    month = day.year * 12 + day.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    """Partition holding a month (p202401)"""
+    return f"p{month:%Y%m}"
+
+class SaMinuteRetentionService:
+    """SA Minute Retention Service - minute data partitioning, rollup and retention"""
+
+    def __init__(self, db_session: Union[Session, AsyncSession]):
+        self.db = db_session
+        self.sa_db_service = create_sa_db_service(db_session)
+        logger.info("SaMinuteRetentionService Init...")
+
+    def _is_mysql(self) -> bool:
+        return self.db.get_bind().dialect.name == "mysql"
+
+    async def _execute(self, statement: str, params: Optional[Dict[str, Any]] = None):
+        result = self.db.execute(text(statement), params or {})
+        return await result if inspect.isawaitable(result) else result
+
+    async def list_partitions(self) -> List[Tuple[str, str]]:
+        """Partitions of minute_data with their upper bound, oldest first (empty when not partitioned)"""
+        if not self._is_mysql():
+            return []
+        try:
+            result = await self._execute(
+                "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION",
+                {"table": MINUTE_DATA_TABLE}
+            )
+            return [(name, description) for name, description in result.all()]
+        except Exception as e:
+            logger.error(f"Error listing minute data partitions: {e}")
+            raise
+
+    @staticmethod
+    def _partition_definitions(first_month: date, last_month: date) -> str:
+        definitions = []
+        month = first_month
+        while month <= last_month:
+            definitions.append(
+                f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d} 00:00:00')"
+            )
+            month = add_months(month, 1)
+        definitions.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+        return ", ".join(definitions)
+
+    async def partition_table(self, first_month: Optional[date] = None, months_ahead: Optional[int] = None) -> bool:
+        """
+        Convert minute_data to monthly RANGE COLUMNS(date_time) partitions (MySQL, one-off;
+        rebuilds the table). The primary key becomes (id, date_time), as MySQL requires every
+        unique key to contain the partitioning column. Returns False when not supported.
+        """
+        if not self._is_mysql():
+            logger.warning("Minute data partitioning needs MySQL; using day-by-day deletes instead")
+            return False
+        if await self.list_partitions():
+            return True
+        months_ahead = settings.MINUTE_DATA_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        if first_month is None:
+            first_date_time = await self.sa_db_service.find_minute_data_first_date_time()
+            first_month = (first_date_time or datetime.now()).date()
+        first_month = month_start(first_month)
+        last_month = add_months(month_start(date.today()), months_ahead)
+        try:
+            await self._execute(
+                f"ALTER TABLE {MINUTE_DATA_TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, date_time)"
+            )
+            await self._execute(
+                f"ALTER TABLE {MINUTE_DATA_TABLE} PARTITION BY RANGE COLUMNS(date_time) "
+                f"({self._partition_definitions(first_month, last_month)})"
+            )
+            logger.info(f"Minute data partitioned from {first_month} to {last_month}")
+            return True
+        except Exception as e:
+            logger.error(f"Error partitioning minute data: {e}")
+            raise
+
+    async def add_partitions(self, today: Optional[date] = None, months_ahead: Optional[int] = None) -> int:
+        """Split the catch-all partition so months up to months_ahead have their own; returns added count"""
+        partitions = await self.list_partitions()
+        if not partitions:
+            return 0
+        months_ahead = settings.MINUTE_DATA_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        last_month = add_months(month_start(today or date.today()), months_ahead)
+        bounded = [name for name, _ in partitions if name != MAX_PARTITION]
+        next_month = (add_months(datetime.strptime(bounded[-1][1:], "%Y%m").date(), 1)
+                      if bounded else month_start(today or date.today()))
+        if next_month > last_month:
+            return 0
+        try:
+            await self._execute(
+                f"ALTER TABLE {MINUTE_DATA_TABLE} REORGANIZE PARTITION {MAX_PARTITION} "
+                f"INTO ({self._partition_definitions(next_month, last_month)})"
+            )
+            added = (last_month.year - next_month.year) * 12 + last_month.month - next_month.month + 1
+            logger.info(f"Minute data partitions added : {partition_name(next_month)} ~ {partition_name(last_month)}")
+            return added
+        except Exception as e:
+            logger.error(f"Error adding minute data partitions: {e}")
+            raise
+
+    async def drop_partitions_before(self, cutoff: date) -> List[str]:
+        """Drop the monthly partitions that end on or before a date; returns dropped names"""
+        expired = [name for name, _ in await self.list_partitions()
+                   if name != MAX_PARTITION and add_months(datetime.strptime(name[1:], "%Y%m").date(), 1) <= cutoff]
+        if not expired:
+            return []
+        try:
+            await self._execute(f"ALTER TABLE {MINUTE_DATA_TABLE} DROP PARTITION {', '.join(expired)}")
+            logger.info(f"Minute data partitions dropped : {expired}")
+            return expired
+        except Exception as e:
+            logger.error(f"Error dropping minute data partitions: {e}")
+            raise
+
+    async def rollup_days(self, start_date: date, end_date: date, overwrite: bool = False) -> int:
+        """
+        Roll the minute bars of [start_date, end_date) up into day_stat; returns rows saved.
+        Days already in day_stat (from the broker) are kept unless overwrite is set.
+        """
+        saved = 0
+        day = start_date
+        while day < end_date:
+            start = datetime.combine(day, datetime.min.time())
+            rows = await self.sa_db_service.find_minute_data_day_rollup(start, start + timedelta(days=1))
+            if rows:
+                tr_date = day.strftime("%Y%m%d")
+                saved += await self.sa_db_service.save_all_day_info_list([
+                    {"stock_code": stock_code, "tr_date": tr_date, "open_price": open_price,
+                     "high_price": high_price, "low_price": low_price, "close_price": close_price,
+                     "volume": volume}
+                    for stock_code, open_price, high_price, low_price, close_price, volume in rows
+                ], overwrite=overwrite)
+            day += timedelta(days=1)
+        return saved
+
+    async def run_retention(self, today: Optional[date] = None, retention_days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Retention job: roll up and remove minute bars older than retention_days,
+        and keep partitions created ahead of time
+        """
+        try:
+            today = today or date.today()
+            retention_days = settings.MINUTE_DATA_RETENTION_DAYS if retention_days is None else retention_days
+            cutoff = today - timedelta(days=retention_days)
+
+            first_date_time = await self.sa_db_service.find_minute_data_first_date_time()
+            if isinstance(first_date_time, str):
+                first_date_time = datetime.fromisoformat(first_date_time)
+            rolled_up = deleted = 0
+            dropped: List[str] = []
+            if first_date_time is not None and first_date_time.date() < cutoff:
+                rolled_up = await self.rollup_days(first_date_time.date(), cutoff)
+                dropped = await self.drop_partitions_before(cutoff)
+                # Whatever is left before the cutoff (partial month / unpartitioned), a day at a time
+                day = first_date_time.date()
+                while day < cutoff:
+                    start = datetime.combine(day, datetime.min.time())
+                    deleted += await self.sa_db_service.delete_minute_data_before(
+                        start + timedelta(days=1), start
+                    )
+                    day += timedelta(days=1)
+            added = await self.add_partitions(today)
+
+            result = {"cutoff": cutoff.strftime("%Y%m%d"), "rolled_up": rolled_up,
+                      "dropped_partitions": dropped, "deleted": deleted, "added_partitions": added}
+            logger.info(f"Minute data retention : {result}")
+            return result
+        except Exception as e:
+            logger.error(f"Error running minute data retention: {e}")
+            raise
@@ -10,13 +10,12 @@ from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.services.krinvest.kr_inv_ord_service import KrInvOrdService
 from app.services.krinvest.kr_inv_inq_service import KrInvInqService
-from app.services.sa.sa_db_service import SaDbService
+from app.services.sa.async_sa_db_service import create_sa_db_service
 from app.services.sa.sa_stat_day_service import SaStatDayService
 from app.services.sa.sa_stat_minute_service import SaStatMinuteService
 from app.services.sa.sa_check_to_buy_service import SaCheckToBuyService
 from app.services.sa.sa_check_to_sell_service import SaCheckToSellService
 from app.services.sa.sa_common_service import SaCommonService
-from app.daemon.run_main_stock_analysis import RunMainStockAnalysis
 from app.utils import DateUtil, CommUtil
 
 logger = logging.getLogger(__name__)
@@ -28,7 +27,7 @@ class SaService:
         self.db = db_session
         self.kr_inv_ord_service = KrInvOrdService(db_session)
         self.kr_inv_inq_service = KrInvInqService(db_session)
-        self.sa_db_service = SaDbService(db_session)
+        self.sa_db_service = create_sa_db_service(db_session)
         self.sa_stat_day_service = SaStatDayService(db_session)
         self.sa_stat_minute_service = SaStatMinuteService(db_session)
         self.sa_check_to_buy_service = SaCheckToBuyService(db_session)
@@ -47,7 +46,8 @@ class SaService:
             if not stock:
                 raise ValueError(f"Stock not found: {stock_code}")
             
-            # Create analysis runner
+            # Create analysis runner (imported here: app.daemon imports the sa services)
+            from app.daemon.run_main_stock_analysis import RunMainStockAnalysis
             analysis_runner = RunMainStockAnalysis(
                 kr_inv_inq_service=self.kr_inv_inq_service,
                 kr_inv_ord_service=self.kr_inv_ord_service,
@@ -84,7 +84,8 @@ class SaService:
             if not stock:
                 raise ValueError(f"Stock not found: {stock_code}")
             
-            # Create analysis runner
+            # Create analysis runner (imported here: app.daemon imports the sa services)
+            from app.daemon.run_main_stock_analysis import RunMainStockAnalysis
             analysis_runner = RunMainStockAnalysis(
                 kr_inv_inq_service=self.kr_inv_inq_service,
                 kr_inv_ord_service=self.kr_inv_ord_service,
@@ -137,7 +138,8 @@ class SaService:
             
             # Check buy/sell signals
             buy_signal = await self.sa_check_to_buy_service.check_buy_condition(
-                stock_code, current_date, current_time
+                stock_code, current_date, current_time,
+                self.kr_inv_inq_service.get_current_price(price_info)
             )
             
             sell_signal = await self.sa_check_to_sell_service.check_sell_condition(
@@ -6,20 +6,24 @@ Handles daily statistics analysis for stocks.
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+import numpy as np
 from sqlalchemy.orm import Session
 from app.models import DayStatEntity
-from app.services.sa.sa_db_service import SaDbService
+from app.services.sa.async_sa_db_service import create_sa_db_service
 from app.utils import DateUtil
+from app.utils.indicator_util import IndicatorUtil
 
 logger = logging.getLogger(__name__)
 
+DAY_VALUE_COLUMNS = ["open_price", "high_price", "low_price", "close_price", "volume"]
+
 class SaStatDayService:
     """SA Statistics Day Service - converted from SaStatDayService.kt"""
     
     def __init__(self, db_session: Session):
         self.db = db_session
-        self.sa_db_service = SaDbService(db_session)
+        self.sa_db_service = create_sa_db_service(db_session)
         logger.info("SaStatDayService Init...")
     
     async def get_day_statistics(self, stock_code: str, tr_date: str) -> Dict[str, Any]:
@@ -46,12 +50,72 @@ class SaStatDayService:
             logger.error(f"Error getting day statistics for {stock_code}: {e}")
             raise
     
+    async def load_day_matrix(
+        self, stock_codes: List[str], start_tr_date: Optional[str] = None, end_tr_date: Optional[str] = None
+    ) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """Load daily OHLCV of many stocks as symbol x date matrices (stock codes, dates, columns)"""
+        try:
+            rows = await self.sa_db_service.find_day_info_columns_by_stock_codes_and_period(
+                stock_codes, start_tr_date, end_tr_date
+            )
+            return IndicatorUtil.to_matrix(rows, DAY_VALUE_COLUMNS)
+        except Exception as e:
+            logger.error(f"Error loading day matrix: {e}")
+            raise
+    
+    async def calculate_indicators(
+        self, stock_codes: List[str], start_tr_date: Optional[str] = None,
+        end_tr_date: Optional[str] = None, days: int = 20
+    ) -> Dict[str, Any]:
+        """Calculate screening indicators of many stocks at once (symbol x date arrays)"""
+        codes, tr_dates, day = await self.load_day_matrix(stock_codes, start_tr_date, end_tr_date)
+        if not codes:
+            return {"stock_codes": [], "tr_dates": tr_dates}
+        
+        close = day["close_price"]
+        high = day["high_price"]
+        low = day["low_price"]
+        macd, macd_signal, macd_hist = IndicatorUtil.macd(close)
+        bb_middle, bb_upper, bb_lower = IndicatorUtil.bollinger(close, days)
+        return {
+            "stock_codes": codes,
+            "tr_dates": tr_dates,
+            "sma": IndicatorUtil.sma(close, days),
+            "ema": IndicatorUtil.ema(close, days),
+            "stdev": IndicatorUtil.rolling_std(close, days),
+            "atr": IndicatorUtil.atr(high, low, close),
+            "rsi": IndicatorUtil.rsi(close),
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "macd_hist": macd_hist,
+            "bb_middle": bb_middle,
+            "bb_upper": bb_upper,
+            "bb_lower": bb_lower,
+            "vwap": IndicatorUtil.vwap(high, low, close, day["volume"], days)
+        }
+    
     async def calculate_moving_average(self, stock_code: str, days: int = 20) -> float:
         """Calculate moving average for specified days"""
-        # TODO: Implement moving average calculation
-        return 0.0
+        try:
+            _, _, day = await self.load_day_matrix([stock_code])
+            if not day["close_price"].size:
+                return 0.0
+            value = IndicatorUtil.sma(day["close_price"][0], days)[-1]
+            return 0.0 if np.isnan(value) else float(value)
+        except Exception as e:
+            logger.error(f"Error calculating moving average for {stock_code}: {e}")
+            raise
     
     async def calculate_volatility(self, stock_code: str, days: int = 20) -> float:
-        """Calculate volatility for specified days"""
-        # TODO: Implement volatility calculation
-        return 0.0
+        """Calculate volatility (stdev of daily returns) for specified days"""
+        try:
+            _, _, day = await self.load_day_matrix([stock_code])
+            close = day["close_price"]
+            if close.shape[-1] < 2:
+                return 0.0
+            returns = close[0, 1:] / close[0, :-1] - 1.0
+            value = IndicatorUtil.rolling_std(returns, days, ddof=1)[-1]
+            return 0.0 if np.isnan(value) else float(value)
+        except Exception as e:
+            logger.error(f"Error calculating volatility for {stock_code}: {e}")
+            raise
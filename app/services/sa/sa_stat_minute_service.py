@@ -6,37 +6,201 @@ Handles minute-level statistics analysis for stocks.
 """
 
 import logging
+import os
+from datetime import datetime
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
+from app.config.settings import settings
 from app.models import MinuteStat
-from app.services.sa.sa_db_service import SaDbService
-from app.utils import DateUtil
+from app.services.sa.async_sa_db_service import create_sa_db_service
+from app.utils import DateUtil, FileUtil, JsonUtil
+from app.utils.streaming_indicator import (
+    StreamingIndicator, StreamingEma, StreamingRsi, RollingMinMax, StreamingVwap, RollingVariance
+)
 
 logger = logging.getLogger(__name__)
 
+class MinuteIndicatorState:
+    """Streaming indicators of one stock, updated once per minute bar"""
+    
+    def __init__(self, stock_code: str):
+        self.stock_code = stock_code
+        self.last_time: Optional[str] = None  # "YYYYMMDD HHMMSS" of the last bar applied
+        self.close: Optional[float] = None
+        self.emas: Dict[int, StreamingEma] = {
+            window: StreamingEma(window) for window in settings.MINUTE_STAT_EMA_WINDOWS
+        }
+        self.rsi = StreamingRsi(settings.MINUTE_STAT_RSI_WINDOW)
+        self.range = RollingMinMax(settings.MINUTE_STAT_RANGE_WINDOW)
+        self.vwap = StreamingVwap()
+        self.variance = RollingVariance(settings.MINUTE_STAT_VARIANCE_WINDOW)
+    
+    def ema(self, window: int) -> StreamingEma:
+        """Get the EMA of a window, tracking it from now on if new"""
+        if window not in self.emas:
+            self.emas[window] = StreamingEma(window)
+        return self.emas[window]
+    
+    def update(self, tr_date: str, tr_time: str, high_price: float, low_price: float,
+               close_price: float, volume: float) -> bool:
+        """Apply a bar; bars at or before the last applied one are ignored (replay safe)"""
+        bar_time = f"{tr_date} {tr_time}"
+        if self.last_time is not None and bar_time <= self.last_time:
+            return False
+        
+        for ema in self.emas.values():
+            ema.update(close_price)
+        self.rsi.update(close_price)
+        self.range.update(high_price, low_price)
+        self.vwap.update((high_price + low_price + close_price) / 3.0, volume, tr_date)
+        self.variance.update(close_price)
+        self.close = close_price
+        self.last_time = bar_time
+        return True
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current indicator values"""
+        return {
+            "stock_code": self.stock_code,
+            "last_time": self.last_time,
+            "close_price": self.close,
+            "ema": {window: ema.value for window, ema in self.emas.items()},
+            "rsi": self.rsi.value,
+            "range_low": self.range.min,
+            "range_high": self.range.max,
+            "vwap": self.vwap.value,
+            "stdev": self.variance.std
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stock_code": self.stock_code,
+            "last_time": self.last_time,
+            "close": self.close,
+            "emas": {str(window): ema.to_dict() for window, ema in self.emas.items()},
+            "rsi": self.rsi.to_dict(),
+            "range": self.range.to_dict(),
+            "vwap": self.vwap.to_dict(),
+            "variance": self.variance.to_dict()
+        }
+    
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "MinuteIndicatorState":
+        state = MinuteIndicatorState(data["stock_code"])
+        state.last_time = data["last_time"]
+        state.close = data["close"]
+        state.emas = {int(window): StreamingIndicator.from_dict(ema) for window, ema in data["emas"].items()}
+        state.rsi = StreamingIndicator.from_dict(data["rsi"])
+        state.range = StreamingIndicator.from_dict(data["range"])
+        state.vwap = StreamingIndicator.from_dict(data["vwap"])
+        state.variance = StreamingIndicator.from_dict(data["variance"])
+        return state
+
 class SaStatMinuteService:
     """SA Statistics Minute Service - converted from SaStatMinuteService.kt"""
     
+    # Indicator state by stock code, shared by every service instance
+    _states: Dict[str, MinuteIndicatorState] = {}
+    
     def __init__(self, db_session: Session):
         self.db = db_session
-        self.sa_db_service = SaDbService(db_session)
+        self.sa_db_service = create_sa_db_service(db_session)
         logger.info("SaStatMinuteService Init...")
     
+    @classmethod
+    def get_state(cls, stock_code: str) -> MinuteIndicatorState:
+        """Get (or create) the indicator state of a stock"""
+        state = cls._states.get(stock_code)
+        if state is None:
+            state = MinuteIndicatorState(stock_code)
+            cls._states[stock_code] = state
+        return state
+    
+    @classmethod
+    def update_minute_bar(
+        cls, stock_code: str, tr_date: str, tr_time: str, high_price: float,
+        low_price: float, close_price: float, volume: float
+    ) -> Dict[str, Any]:
+        """Apply a new minute bar in O(1) and return the current indicators"""
+        state = cls.get_state(stock_code)
+        state.update(tr_date, tr_time, high_price, low_price, close_price, volume)
+        return state.snapshot()
+    
+    async def warm_up(self, stock_code: str, tr_date: str, end_tr_time: str = "235959") -> int:
+        """
+        Feed the stored minute data of a day newer than the last bar applied
+        (the whole day on a cold start); returns bars applied
+        """
+        try:
+            state = self.get_state(stock_code)
+            # Same "YYYYMMDD" / "HHMMSS" as state.last_time ("2024-01-02" / "09:59:59" accepted)
+            tr_date, end_tr_time = tr_date.replace("-", ""), end_tr_time.replace(":", "")
+            start_date_time = DateUtil.parse_date_string(tr_date)
+            if state.last_time is not None and state.last_time.startswith(tr_date):
+                # Only bars from the last applied minute on are read (that one is skipped by update)
+                start_date_time = datetime.strptime(state.last_time, "%Y%m%d %H%M%S")
+            end_date_time = datetime.strptime(f"{tr_date} {end_tr_time}", "%Y%m%d %H%M%S")
+            rows = await self.sa_db_service.find_minute_data_columns_by_stock_codes_and_period(
+                [stock_code], start_date_time, end_date_time
+            )
+            applied = 0
+            for _, date_time, _, high_price, low_price, close_price, volume in rows:
+                applied += state.update(date_time.strftime("%Y%m%d"), date_time.strftime("%H%M%S"),
+                                        high_price, low_price, close_price, volume or 0)
+            return applied
+        except Exception as e:
+            logger.error(f"Error warming up minute statistics for {stock_code}: {e}")
+            raise
+    
     async def get_minute_statistics(self, stock_code: str, tr_date: str, tr_time: str) -> Dict[str, Any]:
-        """Get minute statistics for a stock"""
+        """Get minute statistics for a stock (bars stored since the last call applied first)"""
         try:
-            # TODO: Implement minute statistics retrieval
+            await self.warm_up(stock_code, tr_date, tr_time)
+            state = self.get_state(stock_code)
             return {
-                "stock_code": stock_code,
                 "tr_date": tr_date,
                 "tr_time": tr_time,
-                "statistics": "minute stats placeholder"
+                **state.snapshot()
             }
         except Exception as e:
             logger.error(f"Error getting minute statistics for {stock_code}: {e}")
             raise
     
     async def calculate_minute_trend(self, stock_code: str, minutes: int = 30) -> str:
-        """Calculate trend for specified minutes"""
-        # TODO: Implement minute trend calculation
+        """Calculate trend for specified minutes (last close vs EMA of the window)"""
+        state = self._states.get(stock_code)
+        if state is None or state.close is None:
+            return "STABLE"
+        ema = state.ema(minutes).value
+        if ema is None or ema == 0:
+            return "STABLE"
+        gap = state.close / ema - 1.0
+        if gap > settings.MINUTE_STAT_TREND_THRESHOLD:
+            return "UP"
+        if gap < -settings.MINUTE_STAT_TREND_THRESHOLD:
+            return "DOWN"
         return "STABLE"
+    
+    @classmethod
+    def save_state(cls, file_path: Optional[str] = None) -> int:
+        """Write every stock's indicator state to a JSON file; returns stocks saved"""
+        file_path = file_path or settings.MINUTE_STAT_STATE_FILE
+        data = {code: state.to_dict() for code, state in cls._states.items()}
+        FileUtil.write_file(file_path, JsonUtil.to_json(data))
+        return len(data)
+    
+    @classmethod
+    def load_state(cls, file_path: Optional[str] = None) -> int:
+        """Restore indicator state saved by save_state; returns stocks restored"""
+        file_path = file_path or settings.MINUTE_STAT_STATE_FILE
+        if not os.path.exists(file_path):
+            return 0
+        data = JsonUtil.from_json(FileUtil.read_file(file_path))
+        cls._states.update({code: MinuteIndicatorState.from_dict(item) for code, item in data.items()})
+        logger.info(f"Restored minute statistics state of {len(data)} stocks")
+        return len(data)
+    
+    @classmethod
+    def reset_state(cls):
+        """Forget all indicator state"""
+        cls._states.clear()
@@ -0,0 +1,73 @@
+"""
+Service Registry
+
+Service instances shared by every request. They are created once at
+startup (init) and open a database session per unit of work, so a
+request no longer builds the whole service graph before doing any work.
+"""
+
+import logging
+from typing import Optional
+from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
+from app.services.krinvest.kr_inv_ord_service import KrInvOrdService
+from app.services.krinvest.kr_inv_inq_service import KrInvInqService
+from app.services.krinvest.kr_inv_token_manager import KrInvTokenManager
+from app.services.krinvest.kr_inv_order_pipeline import KrInvOrderPipeline
+from app.services.sa.sa_api_service import SaApiService
+
+logger = logging.getLogger(__name__)
+
+class ServiceRegistry:
+    """Singleton service instances"""
+
+    kr_inv_oauth_service: Optional[KrInvOauthService] = None
+    kr_inv_token_manager: Optional[KrInvTokenManager] = None
+    kr_inv_ord_service: Optional[KrInvOrdService] = None
+    kr_inv_inq_service: Optional[KrInvInqService] = None
+    kr_inv_order_pipeline: Optional[KrInvOrderPipeline] = None
+    sa_api_service: Optional[SaApiService] = None
+
+    @classmethod
+    def init(cls) -> "ServiceRegistry":
+        """Create the shared service instances (application startup)"""
+        cls.kr_inv_oauth_service = KrInvOauthService()
+        cls.kr_inv_token_manager = KrInvTokenManager(cls.kr_inv_oauth_service)
+        cls.kr_inv_ord_service = KrInvOrdService(kr_inv_oauth_service=cls.kr_inv_oauth_service)
+        cls.kr_inv_inq_service = KrInvInqService(kr_inv_oauth_service=cls.kr_inv_oauth_service)
+        cls.kr_inv_order_pipeline = KrInvOrderPipeline(cls.kr_inv_ord_service)
+        cls.sa_api_service = SaApiService(
+            kr_inv_ord_service=cls.kr_inv_ord_service,
+            kr_inv_inq_service=cls.kr_inv_inq_service,
+            kr_inv_order_pipeline=cls.kr_inv_order_pipeline
+        )
+        logger.info("ServiceRegistry Init...")
+        return cls
+
+    @classmethod
+    def get(cls) -> "ServiceRegistry":
+        """Get the registry, creating the services on first use"""
+        if cls.sa_api_service is None:
+            cls.init()
+        return cls
+
+    @classmethod
+    def reset(cls):
+        """Forget the shared service instances"""
+        cls.kr_inv_oauth_service = None
+        cls.kr_inv_token_manager = None
+        cls.kr_inv_ord_service = None
+        cls.kr_inv_inq_service = None
+        cls.kr_inv_order_pipeline = None
+        cls.sa_api_service = None
+
+def get_kr_inv_oauth_service() -> KrInvOauthService:
+    """Get the shared OAuth service"""
+    return ServiceRegistry.get().kr_inv_oauth_service
+
+def get_kr_inv_inq_service() -> KrInvInqService:
+    """Get the shared inquiry service"""
+    return ServiceRegistry.get().kr_inv_inq_service
+
+def get_sa_api_service() -> SaApiService:
+    """Get the shared SA API service"""
+    return ServiceRegistry.get().sa_api_service
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 import httpx
 import asyncio
+from app.utils.indicator_util import IndicatorUtil
+from app.utils.vector_backtest_util import VectorBacktestUtil
 
 logger = logging.getLogger(__name__)
 
@@ -74,28 +76,70 @@ class JsonUtil:
 class WebClientUtil:
     """Web client utility functions - converted from WebClientUtil.kt"""
     
-    @staticmethod
-    async def get_request(url: str, headers: Optional[Dict[str, str]] = None,
-                         params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # Application-scoped pooled client shared by every request so that
+    # TCP/TLS connections to the API gateway are kept alive and reused
+    _client: Optional[httpx.AsyncClient] = None
+    
+    @classmethod
+    def init_client(cls, max_connections: int = 100, max_keepalive_connections: int = 20,
+                    keepalive_expiry: float = 30.0, timeout: float = 10.0,
+                    http2: bool = False) -> httpx.AsyncClient:
+        """Create the shared pooled client (called on application startup)"""
+        if cls._client is not None and not cls._client.is_closed:
+            return cls._client
+        
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but 'h2' package is not installed, using HTTP/1.1")
+                http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        cls._client = httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+        logger.info(f"Shared http client created (max_connections={max_connections}, "
+                    f"keepalive={max_keepalive_connections}, http2={http2})")
+        return cls._client
+    
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """Get the shared pooled client, creating it with defaults if needed"""
+        if cls._client is None or cls._client.is_closed:
+            return cls.init_client()
+        return cls._client
+    
+    @classmethod
+    async def close_client(cls) -> None:
+        """Close the shared pooled client (called on application shutdown)"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+            logger.info("Shared http client closed")
+    
+    @classmethod
+    async def get_request(cls, url: str, headers: Optional[Dict[str, str]] = None,
+                          params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make GET request"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, params=params)
-                response.raise_for_status()
-                return response.json()
+            response = await cls.get_client().get(url, headers=headers, params=params)
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             logger.error(f"Error making GET request to {url}: {e}")
             raise
     
-    @staticmethod
-    async def post_request(url: str, data: Optional[Dict[str, Any]] = None,
-                          headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    @classmethod
+    async def post_request(cls, url: str, data: Optional[Dict[str, Any]] = None,
+                           headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Make POST request"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=data, headers=headers)
-                response.raise_for_status()
-                return response.json()
+            response = await cls.get_client().post(url, json=data, headers=headers)
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             logger.error(f"Error making POST request to {url}: {e}")
             raise
@@ -0,0 +1,219 @@
+"""
+Indicator Utility
+
+NumPy vectorized technical indicators. Every function works along the last
+axis, so a 1-D price history and a 2-D symbol x time matrix are handled the
+same way. Values inside the warm-up window are NaN; a row starting with
+NaN (a symbol listed after the first bar) warms up from its first value.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class IndicatorUtil:
+    """Technical indicator functions (SMA, EMA, stdev, ATR, RSI, MACD, Bollinger, VWAP)"""
+
+    @staticmethod
+    def to_matrix(
+        rows: Iterable[Sequence],
+        value_columns: Sequence[str],
+        fill_forward: bool = True
+    ) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Pivot (stock_code, time, value...) rows into symbol x time matrices
+
+        Returns (stock codes, sorted time axis, {column: 2-D float array}).
+        Missing cells are forward filled per symbol (or left NaN).
+        """
+        rows = list(rows)
+        if not rows:
+            return [], np.array([]), {name: np.empty((0, 0)) for name in value_columns}
+
+        columns = list(zip(*rows))
+        codes, code_index = np.unique(np.array(columns[0]), return_inverse=True)
+        times, time_index = np.unique(np.array(columns[1]), return_inverse=True)
+
+        matrices = {}
+        for name, values in zip(value_columns, columns[2:]):
+            matrix = np.full((len(codes), len(times)), np.nan)
+            matrix[code_index, time_index] = np.array(values, dtype=np.float64)
+            matrices[name] = IndicatorUtil.fill_forward(matrix) if fill_forward else matrix
+        return [str(code) for code in codes], times, matrices
+
+    @staticmethod
+    def fill_forward(values: np.ndarray) -> np.ndarray:
+        """Replace NaN with the last valid value along the time axis"""
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        index = np.where(valid, np.arange(values.shape[-1]), 0)
+        np.maximum.accumulate(index, axis=-1, out=index)
+        return np.take_along_axis(values, index, axis=-1)
+
+    @staticmethod
+    def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+        """
+        O(n) rolling sum via cumulative sums (NaN in the warm-up window and
+        for windows holding a NaN; other windows of the row are unaffected)
+        """
+        out = np.full(values.shape, np.nan)
+        if window <= 0 or values.shape[-1] < window:
+            return out
+        missing = np.isnan(values)
+        has_missing = missing.any()
+        total = np.cumsum(np.where(missing, 0.0, values) if has_missing else values, axis=-1)
+        out[..., window - 1] = total[..., window - 1]
+        out[..., window:] = total[..., window:] - total[..., :-window]
+        if has_missing:
+            gaps = np.cumsum(missing, axis=-1)
+            gaps[..., window:] -= gaps[..., :-window]
+            out[..., window - 1:][gaps[..., window - 1:] > 0] = np.nan
+        return out
+
+    @staticmethod
+    def sma(values: np.ndarray, window: int) -> np.ndarray:
+        """Simple moving average"""
+        values = np.asarray(values, dtype=np.float64)
+        return IndicatorUtil._rolling_sum(values, window) / window
+
+    @staticmethod
+    def ema(values: np.ndarray, window: int, alpha: Optional[float] = None) -> np.ndarray:
+        """
+        Exponential moving average seeded with the SMA of the first full window
+        of valid values of each row (alpha defaults to 2 / (window + 1); Wilder
+        smoothing uses 1 / window). Later NaN values hold the average.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(values.shape, np.nan)
+        length = values.shape[-1]
+        if window <= 0 or length < window:
+            return out
+        alpha = 2.0 / (window + 1) if alpha is None else alpha
+
+        # The recursion runs over time with each step vectorized over symbols;
+        # a time-major copy keeps every step on contiguous memory
+        series = np.ascontiguousarray(np.moveaxis(values, -1, 0))
+        result = np.full(series.shape, np.nan)
+        decay = 1.0 - alpha
+        if not np.isnan(series).any():
+            previous = series[:window].mean(axis=0)
+            result[window - 1] = previous
+            for t in range(window, length):
+                previous = series[t] * alpha + previous * decay
+                result[t] = previous
+        else:
+            # Rows starting late (listed after the first bar) are seeded at their own first window
+            seed = np.moveaxis(IndicatorUtil._rolling_sum(values, window) / window, -1, 0)
+            seeded = ~np.isnan(seed)
+            start = np.where(seeded.any(axis=0), seeded.argmax(axis=0), length)
+            starting = {int(t): start == t for t in np.unique(start[start < length])}
+            gaps = (np.isnan(series) & (np.arange(length).reshape((-1,) + (1,) * start.ndim) > start)).any()
+            previous = np.full(series.shape[1:], np.nan)
+            for t in range(min(starting, default=length), length):
+                if gaps:
+                    previous = np.where(np.isnan(series[t]), previous, series[t] * alpha + previous * decay)
+                else:
+                    previous = series[t] * alpha + previous * decay
+                if t in starting:
+                    previous = np.where(starting[t], seed[t], previous)
+                result[t] = previous
+        out[...] = np.moveaxis(result, 0, -1)
+        return out
+
+    @staticmethod
+    def wilder(values: np.ndarray, window: int) -> np.ndarray:
+        """Wilder smoothing (RMA) used by RSI and ATR"""
+        return IndicatorUtil.ema(values, window, alpha=1.0 / window)
+
+    @staticmethod
+    def rolling_std(values: np.ndarray, window: int, ddof: int = 0) -> np.ndarray:
+        """Rolling standard deviation in O(n) from sums of x and x^2"""
+        values = np.asarray(values, dtype=np.float64)
+        # Centering each row on its first valid value keeps the x^2 sums from losing precision
+        if values.size:
+            valid = ~np.isnan(values)
+            first = np.take_along_axis(values, valid.argmax(axis=-1)[..., None], axis=-1)
+            centered = values - np.where(np.isnan(first), 0.0, first)
+        else:
+            centered = values
+        total = IndicatorUtil._rolling_sum(centered, window)
+        total_sq = IndicatorUtil._rolling_sum(centered * centered, window)
+        variance = (total_sq - total * total / window) / (window - ddof)
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    @staticmethod
+    def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        """True range (the first bar, and a bar after a missing close, use high - low)"""
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        tr = high - low
+        previous_close = close[..., :-1]
+        np.fmax(tr[..., 1:], np.abs(high[..., 1:] - previous_close), out=tr[..., 1:])
+        np.fmax(tr[..., 1:], np.abs(low[..., 1:] - previous_close), out=tr[..., 1:])
+        return tr
+
+    @staticmethod
+    def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+        """Average true range (Wilder)"""
+        return IndicatorUtil.wilder(IndicatorUtil.true_range(high, low, close), window)
+
+    @staticmethod
+    def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+        """Relative strength index (Wilder), 0 ~ 100"""
+        close = np.asarray(close, dtype=np.float64)
+        out = np.full(close.shape, np.nan)
+        if close.shape[-1] <= window:
+            return out
+        change = np.diff(close, axis=-1)
+        average_gain = IndicatorUtil.wilder(np.maximum(change, 0.0), window)
+        average_loss = IndicatorUtil.wilder(np.maximum(-change, 0.0), window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+        # No losses in the window: RSI is 100
+        rsi = np.where((average_loss == 0) & ~np.isnan(average_gain), 100.0, rsi)
+        out[..., 1:] = rsi
+        return out
+
+    @staticmethod
+    def macd(
+        close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """MACD line, signal line and histogram"""
+        close = np.asarray(close, dtype=np.float64)
+        line = IndicatorUtil.ema(close, fast) - IndicatorUtil.ema(close, slow)
+        # The signal EMA of each row starts at the first full window of its MACD line
+        signal_line = IndicatorUtil.ema(line, signal)
+        return line, signal_line, line - signal_line
+
+    @staticmethod
+    def bollinger(
+        close: np.ndarray, window: int = 20, k: float = 2.0
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bollinger bands (middle, upper, lower)"""
+        middle = IndicatorUtil.sma(close, window)
+        width = k * IndicatorUtil.rolling_std(close, window)
+        return middle, middle + width, middle - width
+
+    @staticmethod
+    def vwap(
+        high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+        window: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Volume weighted average price of the typical price (H+L+C)/3,
+        cumulative over the whole axis or rolling over window bars
+        """
+        volume = np.asarray(volume, dtype=np.float64)
+        typical = (np.asarray(high, dtype=np.float64) + np.asarray(low, dtype=np.float64)
+                   + np.asarray(close, dtype=np.float64)) / 3.0
+        if window is None:
+            price_volume = np.nancumsum(typical * volume, axis=-1)
+            total_volume = np.nancumsum(volume, axis=-1)
+        else:
+            price_volume = IndicatorUtil._rolling_sum(typical * volume, window)
+            total_volume = IndicatorUtil._rolling_sum(volume, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total_volume > 0, price_volume / total_volume, np.nan)
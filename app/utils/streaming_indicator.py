@@ -0,0 +1,219 @@
+"""
+Streaming Indicator Utility
+
+Incremental indicators updated in O(1) (amortized) per new value, for
+intraday minute bars and ticks. Each indicator serializes to a plain dict
+(to_dict / StreamingIndicator.from_dict) so state survives restarts.
+The EMA / RSI definitions match IndicatorUtil.
+"""
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple, Type
+
+class StreamingIndicator:
+    """Base class of incremental indicators"""
+
+    _registry: Dict[str, Type["StreamingIndicator"]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        StreamingIndicator._registry[cls.__name__] = cls
+
+    @property
+    def ready(self) -> bool:
+        """Whether the warm-up window is complete"""
+        return self.value is not None
+
+    @property
+    def value(self) -> Optional[float]:
+        raise NotImplementedError
+
+    def state(self) -> Dict[str, Any]:
+        """Constructor arguments and internal state"""
+        return dict(self.__dict__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON compatible dict"""
+        state = self.state()
+        return {"type": type(self).__name__,
+                "state": {k: list(v) if isinstance(v, deque) else v for k, v in state.items()}}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "StreamingIndicator":
+        """Restore an indicator serialized by to_dict"""
+        cls = StreamingIndicator._registry[data["type"]]
+        indicator = cls.__new__(cls)
+        indicator.restore(data["state"])
+        return indicator
+
+    def restore(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+
+class StreamingEma(StreamingIndicator):
+    """EMA seeded with the SMA of the first window values"""
+
+    def __init__(self, window: int, alpha: Optional[float] = None):
+        self.window = window
+        self.alpha = 2.0 / (window + 1) if alpha is None else alpha
+        self.count = 0
+        self.total = 0.0
+        self.ema: Optional[float] = None
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.ema
+
+    def update(self, value: float) -> Optional[float]:
+        if self.ema is not None:
+            self.ema += self.alpha * (value - self.ema)
+        else:
+            self.count += 1
+            self.total += value
+            if self.count == self.window:
+                self.ema = self.total / self.window
+        return self.ema
+
+class StreamingRsi(StreamingIndicator):
+    """RSI with Wilder smoothing of gains and losses"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.previous: Optional[float] = None
+        self.gain = StreamingEma(window, 1.0 / window)
+        self.loss = StreamingEma(window, 1.0 / window)
+
+    @property
+    def value(self) -> Optional[float]:
+        gain, loss = self.gain.value, self.loss.value
+        if gain is None or loss is None:
+            return None
+        if loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def update(self, value: float) -> Optional[float]:
+        if self.previous is not None:
+            change = value - self.previous
+            self.gain.update(max(change, 0.0))
+            self.loss.update(max(-change, 0.0))
+        self.previous = value
+        return self.value
+
+    def state(self) -> Dict[str, Any]:
+        return {"window": self.window, "previous": self.previous,
+                "gain": self.gain.to_dict(), "loss": self.loss.to_dict()}
+
+    def restore(self, state: Dict[str, Any]):
+        self.window = state["window"]
+        self.previous = state["previous"]
+        self.gain = StreamingIndicator.from_dict(state["gain"])
+        self.loss = StreamingIndicator.from_dict(state["loss"])
+
+class RollingMinMax(StreamingIndicator):
+    """Rolling min / max over the last window values (monotonic deques)"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        # (sequence, value) pairs; values increasing / decreasing from the left
+        self.min_deque: Deque[Tuple[int, float]] = deque()
+        self.max_deque: Deque[Tuple[int, float]] = deque()
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.max - self.min if self.count else None
+
+    @property
+    def min(self) -> Optional[float]:
+        return self.min_deque[0][1] if self.min_deque else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self.max_deque[0][1] if self.max_deque else None
+
+    def update(self, value: float, low: Optional[float] = None) -> Tuple[float, float]:
+        """Add a value (or a bar high with its low); returns (min, max)"""
+        low = value if low is None else low
+        sequence = self.count
+        self.count += 1
+        while self.min_deque and self.min_deque[-1][1] >= low:
+            self.min_deque.pop()
+        self.min_deque.append((sequence, low))
+        while self.max_deque and self.max_deque[-1][1] <= value:
+            self.max_deque.pop()
+        self.max_deque.append((sequence, value))
+
+        expired = sequence - self.window
+        if self.min_deque[0][0] <= expired:
+            self.min_deque.popleft()
+        if self.max_deque[0][0] <= expired:
+            self.max_deque.popleft()
+        return self.min, self.max
+
+    def restore(self, state: Dict[str, Any]):
+        self.window = state["window"]
+        self.count = state["count"]
+        self.min_deque = deque(tuple(item) for item in state["min_deque"])
+        self.max_deque = deque(tuple(item) for item in state["max_deque"])
+
+class StreamingVwap(StreamingIndicator):
+    """Session VWAP (reset when the session key, e.g. trade date, changes)"""
+
+    def __init__(self):
+        self.session: Optional[str] = None
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.price_volume / self.volume if self.volume > 0 else None
+
+    def update(self, price: float, volume: float, session: Optional[str] = None) -> Optional[float]:
+        if session is not None and session != self.session:
+            self.session = session
+            self.price_volume = 0.0
+            self.volume = 0.0
+        self.price_volume += price * volume
+        self.volume += volume
+        return self.value
+
+class RollingVariance(StreamingIndicator):
+    """Variance over the last window values (Welford with removal)"""
+
+    def __init__(self, window: int, ddof: int = 1):
+        self.window = window
+        self.ddof = ddof
+        self.values: Deque[float] = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @property
+    def value(self) -> Optional[float]:
+        size = len(self.values)
+        if size < self.window or size <= self.ddof:
+            return None
+        return max(self.m2, 0.0) / (size - self.ddof)
+
+    @property
+    def std(self) -> Optional[float]:
+        variance = self.value
+        return None if variance is None else math.sqrt(variance)
+
+    def update(self, value: float) -> Optional[float]:
+        self.values.append(value)
+        if len(self.values) > self.window:
+            # Replace the oldest value in one step
+            old = self.values.popleft()
+            old_mean = self.mean
+            self.mean += (value - old) / self.window
+            self.m2 += (value - old) * (value - self.mean + old - old_mean)
+        else:
+            delta = value - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (value - self.mean)
+        return self.value
+
+    def restore(self, state: Dict[str, Any]):
+        super().restore(state)
+        self.values = deque(state["values"])
@@ -0,0 +1,161 @@
+"""
+Vector Backtest Utility
+
+Array-at-once backtests for simple rule strategies. Entry / exit signals
+are boolean symbol x time matrices; positions, portfolio returns, costs,
+drawdown and turnover are computed with NumPy along the time axis, with
+no Python loop over bars. Leading axes are parameter axes, so a
+(params, symbols, time) stack evaluates many parameter sets at once.
+"""
+
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class VectorBacktestUtil:
+    """Vectorized backtest functions (signals -> positions -> weights -> performance)"""
+
+    @staticmethod
+    def bar_returns(close: np.ndarray) -> np.ndarray:
+        """Close-to-close return of each bar (0 for the first bar and missing prices)"""
+        close = np.asarray(close, dtype=np.float64)
+        returns = np.zeros(close.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[..., 1:] = close[..., 1:] / close[..., :-1] - 1.0
+        returns[~np.isfinite(returns)] = 0.0
+        return returns
+
+    @staticmethod
+    def positions_from_signals(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+        """
+        Long / flat position from entry and exit signals (an exit on the entry bar wins).
+        A signal on bar t is traded at its close, so the position earns from bar t + 1.
+        """
+        entries = np.asarray(entries, dtype=bool)
+        exits = np.asarray(exits, dtype=bool)
+        index = np.arange(entries.shape[-1])
+        last_entry = np.maximum.accumulate(np.where(entries, index, -1), axis=-1)
+        last_exit = np.maximum.accumulate(np.where(exits, index, -1), axis=-1)
+        position = np.zeros(np.broadcast_shapes(entries.shape, exits.shape), dtype=bool)
+        position[..., 1:] = (last_entry > last_exit)[..., :-1]
+        return position
+
+    @staticmethod
+    def top_n(mask: np.ndarray, score: np.ndarray, n: int) -> np.ndarray:
+        """At most n symbols per bar among mask, highest score first, ties by symbol order (axis -2)"""
+        mask = np.asarray(mask, dtype=bool)
+        ranked = np.where(mask, score, -np.inf)
+        symbols = ranked.shape[-2]
+        if n >= symbols:
+            return mask
+        if n <= 0:
+            return np.zeros(mask.shape, dtype=bool)
+        # The n-th highest score of each bar by selection (O(symbols)) rather than a full sort
+        threshold = np.partition(ranked, symbols - n, axis=-2)[..., symbols - n:symbols - n + 1, :]
+        above = mask & (ranked > threshold)
+        tied = mask & (ranked == threshold)
+        room = n - above.sum(axis=-2, keepdims=True)
+        return above | (tied & (np.cumsum(tied, axis=-2) <= room))
+
+    @staticmethod
+    def weights(position: np.ndarray, weight: Optional[float] = None) -> np.ndarray:
+        """Portfolio weights: a fixed fraction per held symbol, or equal weights over held symbols"""
+        position = np.asarray(position, dtype=np.float64)
+        if weight is not None:
+            return position * weight
+        count = position.sum(axis=-2, keepdims=True)
+        return position / np.maximum(count, 1.0)
+
+    @staticmethod
+    def evaluate(
+        weights: np.ndarray,
+        returns: np.ndarray,
+        cost_rate: float = 0.0,
+        intraday: bool = False,
+        periods_per_year: int = 252
+    ) -> Dict[str, np.ndarray]:
+        """
+        Performance of weights (held over each bar) on per-symbol bar returns.
+        cost_rate is charged per unit of turnover; intraday positions are opened
+        and closed within their bar, so their turnover is twice the weight.
+        Series have the leading axes plus time, statistics the leading axes only.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        gross = np.einsum("...st,...st->...t", weights, np.asarray(returns, dtype=np.float64))
+        if intraday:
+            turnover = 2.0 * np.abs(weights).sum(axis=-2)
+        else:
+            change = np.diff(weights, axis=-1, prepend=0.0)
+            turnover = np.abs(change).sum(axis=-2)
+        net = gross - turnover * cost_rate
+        equity = np.cumprod(1.0 + net, axis=-1)
+        drawdown = 1.0 - equity / np.maximum(np.maximum.accumulate(equity, axis=-1), 1.0)
+        std = net.std(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(std > 0, net.mean(axis=-1) / std * np.sqrt(periods_per_year), 0.0)
+        return {
+            "returns": net,
+            "equity": equity,
+            "drawdown": drawdown,
+            "turnover": turnover,
+            "total_return": equity[..., -1] - 1.0,
+            "max_drawdown": drawdown.max(axis=-1),
+            "sharpe": sharpe,
+            "mean_turnover": turnover.mean(axis=-1)
+        }
+
+    @staticmethod
+    def breakout(
+        open_price: np.ndarray, high_price: np.ndarray, low_price: np.ndarray, close_price: np.ndarray,
+        k: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Volatility breakout on day bars (sample/KoreaStockAutoTrade.py): buy when the price
+        crosses today open + previous day range x k, sell at the close. k may be an array
+        of parameters (a leading axis). Returns (entered, trade return, score), where the
+        score ranks the entries of a day by how close the target is to the open (the
+        nearer target is crossed first).
+        """
+        open_price = np.asarray(open_price, dtype=np.float64)
+        k = np.asarray(k, dtype=np.float64).reshape(np.shape(k) + (1,) * open_price.ndim)
+        previous_range = np.full(open_price.shape, np.nan)
+        previous_range[..., 1:] = (np.asarray(high_price) - np.asarray(low_price))[..., :-1]
+        gap = previous_range * k
+        target = open_price + gap
+        with np.errstate(invalid="ignore"):
+            entered = np.asarray(high_price) > target
+            # Opened above the target: bought at the first quote, i.e. the open
+            entry = np.maximum(open_price, target)
+            trade_return = np.where(entered, np.asarray(close_price) / entry - 1.0, 0.0)
+            score = -gap / open_price
+        trade_return[~np.isfinite(trade_return)] = 0.0
+        return entered, trade_return, np.where(np.isfinite(score), score, -np.inf)
+
+    @staticmethod
+    def breakout_sweep(
+        open_price: np.ndarray, high_price: np.ndarray, low_price: np.ndarray, close_price: np.ndarray,
+        ks: Sequence[float], buy_counts: Sequence[int], cost_rate: float = 0.0, chunk: int = 16
+    ) -> Dict[str, np.ndarray]:
+        """
+        Breakout statistics for every (k, buy count) pair: buy at most buy count stocks
+        a day at 1 / buy count of the equity each. Returns {statistic: array (len(ks),
+        len(buy_counts))}; ks are evaluated chunk at a time to bound memory.
+        """
+        ks = np.asarray(ks, dtype=np.float64)
+        names = ["total_return", "max_drawdown", "sharpe", "mean_turnover"]
+        stats = {name: np.empty((len(ks), len(buy_counts))) for name in names}
+        for start in range(0, len(ks), chunk):
+            k = ks[start:start + chunk]
+            entered, trade_return, score = VectorBacktestUtil.breakout(
+                open_price, high_price, low_price, close_price, k
+            )
+            ranked = np.where(entered, score, -np.inf)
+            rank = np.argsort(np.argsort(-ranked, axis=-2, kind="stable"), axis=-2, kind="stable")
+            for column, buy_count in enumerate(buy_counts):
+                weights = (entered & (rank < buy_count)) * (1.0 / buy_count)
+                result = VectorBacktestUtil.evaluate(weights, trade_return, cost_rate, intraday=True)
+                for name in names:
+                    stats[name][start:start + len(k), column] = result[name]
+        return stats
@@ -0,0 +1,65 @@
+"""
+Archive Reader Benchmark
+
+Writes a synthetic year of minute bars (default 300 symbols x 245 trade
+dates x 381 minutes, ~28M bars) to the Parquet archive, repacks it into
+per-symbol Arrow IPC files, then times the memory-mapped reads.
+
+Usage: python -m benchmarks.bench_archive_reader [symbols] [days] [root]
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pyarrow as pa
+from app.services.sa.sa_archive_service import SaArchiveService
+
+MINUTES = 381  # 09:00 ~ 15:20
+
+def write_archive(service: SaArchiveService, symbols: int, days: int):
+    rng = np.random.default_rng(0)
+    codes = np.repeat(np.array([f"{code:06d}" for code in range(symbols)]), MINUTES)
+    day = datetime(2024, 1, 2)
+    for _ in range(days):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        first = np.datetime64(day.replace(hour=9), "ms")
+        times = np.tile(first + np.arange(MINUTES) * np.timedelta64(60, "s"), symbols)
+        close = 10000 * np.exp(rng.normal(0, 0.001, symbols * MINUTES).cumsum() / 100)
+        service.write_minute_day(day.strftime("%Y%m%d"), pa.table({
+            "stock_code": codes, "date_time": times, "open_price": close, "high_price": close * 1.001,
+            "low_price": close * 0.999, "close_price": close,
+            "volume": rng.integers(0, 10000, symbols * MINUTES)
+        }))
+        day += timedelta(days=1)
+
+if __name__ == "__main__":
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 245
+    root = sys.argv[3] if len(sys.argv) > 3 else tempfile.mkdtemp(prefix="archive_bench_")
+    service = SaArchiveService(root=root)
+    codes = [f"{code:06d}" for code in range(symbols)]
+    try:
+        start = time.perf_counter()
+        write_archive(service, symbols, days)
+        print(f"{symbols} symbols x {days} days ({symbols * days * MINUTES} bars)")
+        print(f"  parquet write      {time.perf_counter() - start:8.2f} s")
+
+        start = time.perf_counter()
+        service.build_minute_ipc(2024)
+        print(f"  ipc repack         {time.perf_counter() - start:8.2f} s")
+
+        start = time.perf_counter()
+        bars = service.load_minute_bars(codes, 2024)
+        total = sum(float(series["close_price"].sum()) for series in bars.values())
+        print(f"  mmap load + sum    {time.perf_counter() - start:8.2f} s ({len(bars)} symbols, {total:.3g})")
+
+        start = time.perf_counter()
+        _, times, matrices = service.load_minute_matrix(codes, 2024, ["close_price"])
+        print(f"  matrix load        {time.perf_counter() - start:8.2f} s {matrices['close_price'].shape}")
+    finally:
+        if len(sys.argv) <= 3:
+            shutil.rmtree(root)
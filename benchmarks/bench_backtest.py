@@ -0,0 +1,76 @@
+"""
+Backtest Benchmark
+
+Replays a year of synthetic KRX minute bars (default 300 symbols x 250
+trade dates x 390 minutes, about 29M bars) through RunBacktest with an
+in-memory volatility breakout check (prior day range x k over the open),
+so the time measured is the replay loop itself.
+
+Usage: python -m benchmarks.bench_backtest [symbols] [days]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+from app.common.market_calendar import MarketCalendar
+from app.daemon.run_backtest import RunBacktest
+
+class BreakoutCheck:
+    """Buy when the price crosses today's open + previous day range x k"""
+
+    def __init__(self, bars, k: float = 0.5):
+        self.targets = {}
+        for stock_code, symbol in bars.items():
+            days = symbol["date_time"].astype("datetime64[D]")
+            starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+            ends = np.r_[starts[1:], len(days)]
+            close = symbol["close_price"]
+            ranges = np.maximum.reduceat(close, starts) - np.minimum.reduceat(close, starts)
+            opens = close[starts]
+            targets = opens[1:] + ranges[:-1] * k
+            self.targets[stock_code] = dict(zip(
+                (str(day).replace("-", "") for day in days[starts[1:]]), targets.tolist()
+            ))
+        self.calls = 0
+
+    async def check_buy_condition(self, stock_code, tr_date, tr_time, current_price=None):
+        self.calls += 1
+        target = self.targets[stock_code].get(tr_date)
+        return {"buy_recommended": target is not None and current_price >= target, "target_price": target}
+
+class HoldCheck:
+    async def check_sell_condition(self, stock_code, tr_date, tr_time):
+        return {"sell_recommended": False}
+
+def trade_minutes(days: int) -> np.ndarray:
+    calendar = MarketCalendar.get("KRX")
+    minutes, day = [], date(2024, 1, 2)
+    while len(minutes) < days * 390:
+        if calendar.is_business_day(day):
+            first = np.datetime64(datetime.combine(day, datetime.min.time()) + timedelta(hours=9), "ms")
+            minutes.append(first + np.arange(390) * np.timedelta64(1, "m"))
+        day += timedelta(days=1)
+    return np.concatenate(minutes)[:days * 390]
+
+if __name__ == "__main__":
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    times = trade_minutes(days)
+    rng = np.random.default_rng(0)
+    bars = {
+        f"{code:06d}": {"date_time": times,
+                        "close_price": 10000 * np.exp(np.cumsum(rng.normal(0, 0.001, len(times))))}
+        for code in range(symbols)
+    }
+    buy_check = BreakoutCheck(bars)
+    runner = RunBacktest(buy_check, HoldCheck(), bars, initial_cash=100_000_000)
+
+    start = time.perf_counter()
+    summary = asyncio.run(runner.run())
+    elapsed = time.perf_counter() - start
+    print(f"{symbols * len(times)} bars ({symbols} symbols x {days} days) replayed in {elapsed:.1f} s")
+    print(f"  buy checks {buy_check.calls}, fills {len(runner.ledger.fills)}")
+    print(f"  return {summary['return']:.2%}, max drawdown {summary['max_drawdown']:.2%}, "
+          f"win rate {summary['win_rate'] or 0:.2%}")
@@ -0,0 +1,47 @@
+"""
+Indicator Benchmark
+
+Times each IndicatorUtil indicator over a symbol x day matrix
+(default 2,500 KRX symbols x 5 years of trading days).
+
+Usage: python -m benchmarks.bench_indicator_util [symbols] [days]
+"""
+
+import sys
+import time
+import numpy as np
+from app.utils.indicator_util import IndicatorUtil
+
+def make_prices(symbols: int, days: int):
+    """Random walk OHLCV matrices"""
+    rng = np.random.default_rng(0)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, days)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, (symbols, days)))
+    low = close * (1 - rng.uniform(0, 0.02, (symbols, days)))
+    volume = rng.integers(1000, 1000000, (symbols, days)).astype(np.float64)
+    return high, low, close, volume
+
+if __name__ == "__main__":
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 2500
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 1250
+    high, low, close, volume = make_prices(symbols, days)
+
+    indicators = {
+        "sma(20)": lambda: IndicatorUtil.sma(close, 20),
+        "ema(20)": lambda: IndicatorUtil.ema(close, 20),
+        "rolling_std(20)": lambda: IndicatorUtil.rolling_std(close, 20),
+        "atr(14)": lambda: IndicatorUtil.atr(high, low, close, 14),
+        "rsi(14)": lambda: IndicatorUtil.rsi(close, 14),
+        "macd(12,26,9)": lambda: IndicatorUtil.macd(close),
+        "bollinger(20)": lambda: IndicatorUtil.bollinger(close, 20),
+        "vwap(20)": lambda: IndicatorUtil.vwap(high, low, close, volume, 20),
+    }
+    total = 0.0
+    print(f"{symbols} symbols x {days} days")
+    for name, run in indicators.items():
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"  {name:<16} {elapsed * 1000:8.1f} ms")
+    print(f"  {'total':<16} {total * 1000:8.1f} ms")
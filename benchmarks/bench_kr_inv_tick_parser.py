@@ -0,0 +1,63 @@
+"""
+Tick Parser Benchmark
+
+Measures H0STCNT0 ticks decoded per second on one core, comparing
+KrInvTickParser (ring buffer) against per-tick str.split into dicts with the
+same fields converted to numbers.
+
+Usage: python -m benchmarks.bench_kr_inv_tick_parser [ticks]
+"""
+
+import random
+import sys
+import time
+from app.services.krinvest.kr_inv_tick_parser import KrInvTickParser, H0STCNT0_FIELDS
+
+def make_frames(count: int, records_per_frame: int = 1):
+    """Build synthetic frames with realistic field contents"""
+    frames = []
+    for _ in range(count // records_per_frame):
+        records = []
+        for _ in range(records_per_frame):
+            values = [str(random.randint(1, 100000)) for _ in H0STCNT0_FIELDS]
+            values[0] = random.choice(["005930", "000660", "035720", "069500"])
+            values[1] = "093015"
+            values[5] = "1.23"
+            values[18] = "105.21"
+            values[21] = random.choice(["1", "5"])
+            records.append("^".join(values))
+        frames.append(f"0|H0STCNT0|{records_per_frame:03d}|{'^'.join(records)}")
+    return frames
+
+def bench_parser(frames, records_per_frame: int) -> float:
+    parser = KrInvTickParser(capacity=1 << 20)
+    start = time.perf_counter()
+    for frame in frames:
+        _, _, count, payload = frame.split("|", 3)
+        parser.parse_ticks(payload, int(count))
+    return len(frames) * records_per_frame / (time.perf_counter() - start)
+
+NUMERIC_FIELDS = ["STCK_CNTG_HOUR", "STCK_PRPR", "PRDY_VRSS", "STCK_OPRC", "STCK_HGPR",
+                  "STCK_LWPR", "ASKP1", "BIDP1", "CNTG_VOL", "ACML_VOL", "CCLD_DVSN"]
+
+def bench_dict_split(frames, records_per_frame: int) -> float:
+    size = len(H0STCNT0_FIELDS)
+    start = time.perf_counter()
+    for frame in frames:
+        _, _, count, payload = frame.split("|", 3)
+        values = payload.split("^")
+        for i in range(int(count)):
+            record = dict(zip(H0STCNT0_FIELDS, values[i * size:(i + 1) * size]))
+            for name in NUMERIC_FIELDS:
+                record[name] = int(record[name])
+            record["PRDY_CTRT"] = float(record["PRDY_CTRT"])
+            record["CTTR"] = float(record["CTTR"])
+    return len(frames) * records_per_frame / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for records_per_frame in (1, 5):
+        frames = make_frames(ticks, records_per_frame)
+        print(f"records/frame={records_per_frame}")
+        print(f"  KrInvTickParser : {bench_parser(frames, records_per_frame):>12,.0f} ticks/s")
+        print(f"  dict + int()    : {bench_dict_split(frames, records_per_frame):>12,.0f} ticks/s")
@@ -0,0 +1,95 @@
+"""
+Minute Data Index Benchmark
+
+Times the SaDbService minute data lookups on a SQLite copy of the
+minute_data table (default 10M rows: 1,000 symbols x 10,000 minutes),
+first with the old surrogate-key-only schema, then after ensure_indexes.
+
+Usage: python -m benchmarks.bench_minute_data_indexes [rows] [symbols] [db_file]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import create_engine, text
+from app.config.database import ensure_indexes
+
+QUERIES = {
+    "stock x day period": (
+        "SELECT * FROM minute_data WHERE stock_code = :code "
+        "AND date_time >= :start AND date_time <= :end ORDER BY date_time DESC",
+        lambda code, start: {"code": code, "start": start, "end": start + timedelta(hours=6)}
+    ),
+    "stock x minute": (
+        "SELECT * FROM minute_data WHERE stock_code = :code AND date_time = :start LIMIT 1",
+        lambda code, start: {"code": code, "start": start}
+    ),
+    "all stocks x hour": (
+        "SELECT stock_code, date_time, close_price FROM minute_data "
+        "WHERE date_time >= :start AND date_time < :end",
+        lambda code, start: {"start": start, "end": start + timedelta(hours=1)}
+    ),
+}
+
+def create_table(engine, rows: int, symbols: int, first: datetime):
+    """Old schema (surrogate key only) filled with random bars"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE minute_data (id INTEGER PRIMARY KEY, stock_code VARCHAR(20) NOT NULL, "
+            "date_time DATETIME NOT NULL, open_price FLOAT, high_price FLOAT, low_price FLOAT, "
+            "close_price FLOAT, volume INTEGER)"
+        ))
+    rng = np.random.default_rng(0)
+    minutes = rows // symbols
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for minute in range(minutes):
+            date_time = str(first + timedelta(minutes=minute))
+            close = rng.uniform(1000, 100000, symbols)
+            cursor.executemany(
+                "INSERT INTO minute_data (stock_code, date_time, open_price, high_price, low_price, "
+                "close_price, volume) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(f"{code:06d}", date_time, price, price, price, price, 100)
+                 for code, price in enumerate(close.tolist())]
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+def time_queries(engine, symbols: int, first: datetime, repeat: int = 20):
+    rng = np.random.default_rng(1)
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            start = time.perf_counter()
+            for _ in range(repeat):
+                code = f"{int(rng.integers(symbols)):06d}"
+                conn.execute(text(sql), params(code, first + timedelta(minutes=int(rng.integers(600))))).all()
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f"  {name:<20} {elapsed * 1000:10.2f} ms")
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    db_file = sys.argv[3] if len(sys.argv) > 3 else "bench_minute_data.db"
+    if os.path.exists(db_file):
+        os.remove(db_file)
+    engine = create_engine(f"sqlite:///{db_file}")
+    first = datetime(2024, 1, 2, 9, 0)
+
+    start = time.perf_counter()
+    create_table(engine, rows, symbols, first)
+    print(f"{rows} rows ({symbols} symbols) loaded in {time.perf_counter() - start:.1f} s")
+    print("without indexes")
+    time_queries(engine, symbols, first, repeat=3)
+
+    start = time.perf_counter()
+    ensure_indexes(engine)
+    print(f"ensure_indexes took {time.perf_counter() - start:.1f} s")
+    print("with indexes")
+    time_queries(engine, symbols, first)
+
+    engine.dispose()
+    os.remove(db_file)
@@ -0,0 +1,45 @@
+"""
+Parameter Sweep Benchmark
+
+Runs a breakout grid (k x buy_percent x target_buy_count, default 1,000
+sets) over 5 years of day bars (300 symbols x 1,250 days) with
+RunParamSweep at increasing worker counts and prints the speedup.
+
+Usage: python -m benchmarks.bench_param_sweep [max_workers] [symbols] [days]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from app.daemon.run_param_sweep import RunParamSweep, breakout_strategy
+from benchmarks.bench_vector_backtest import make_day_bars
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else 1250
+    open_price, high, low, close = make_day_bars(symbols, days)
+    data = {"open_price": open_price, "high_price": high, "low_price": low, "close_price": close}
+    param_sets = RunParamSweep.grid({
+        "k": np.round(np.linspace(0.1, 1.0, 25), 4).tolist(),
+        "buy_percent": [0.1, 0.2, 0.25, 0.33, 0.5],
+        "target_buy_count": [1, 2, 3, 4, 5, 6, 8, 10],
+    })
+    print(f"{len(param_sets)} parameter sets, {sum(a.nbytes for a in data.values()) / 1e6:.0f} MB shared")
+
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        with tempfile.TemporaryDirectory() as directory:
+            runner = RunParamSweep(breakout_strategy, data, os.path.join(directory, "sweep.jsonl"),
+                                   max_workers=workers)
+            start = time.perf_counter()
+            results = runner.run(param_sets)
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"  {workers:3d} workers {elapsed:8.2f} s  speedup {baseline / elapsed:5.2f}x")
+        workers *= 2
+    best = RunParamSweep.best(results)
+    print(f"  best sharpe {best['sharpe']:.2f} at {best['params']}")
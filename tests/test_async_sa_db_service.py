@@ -0,0 +1,110 @@
+"""
+Test Async SA DB Service
+
+Tests for the AsyncSession implementation of the SaDbService API (aiosqlite).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import AuthInfo, Base, StockList
+from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
+from app.services.krinvest.kr_inv_token_manager import KrInvTokenManager
+from app.services.sa.async_sa_db_service import AsyncSaDbService, SessionScopedSaDbService, create_sa_db_service
+from app.services.sa.sa_db_service import SaDbService
+from app.utils import WebClientUtil
+
+async def _run_with_session(work):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            return await work(session)
+    finally:
+        await engine.dispose()
+
+class TestAsyncSaDbService:
+    """Test AsyncSaDbService functions"""
+
+    def test_create_sa_db_service_dispatch(self, test_db):
+        """Test the factory picks the implementation matching the session"""
+        assert type(create_sa_db_service(test_db)) is SaDbService
+
+        async def work(session):
+            return create_sa_db_service(session)
+
+        assert isinstance(asyncio.run(_run_with_session(work)), AsyncSaDbService)
+
+    def test_save_and_find_minute_data(self):
+        """Test bulk upsert and finders on an AsyncSession"""
+        async def work(session: AsyncSession):
+            service = AsyncSaDbService(session)
+            rows = [
+                {"stock_code": "005930", "date_time": datetime(2024, 1, 2, 9, minute),
+                 "open_price": 100.0, "high_price": 101.0, "low_price": 99.0,
+                 "close_price": 100.0 + minute, "volume": 10}
+                for minute in range(3)
+            ]
+            saved = await service.save_all_minute_data_list(rows, batch_size=2)
+            rows[0]["close_price"] = 200.0
+            updated = await service.save_all_minute_data_list(rows[:1])
+            bars = await service.find_minute_data_by_stock_code_and_tr_date_and_tr_time_period_desc(
+                "005930", "2024-01-02", "09:00:00", "09:59:59"
+            )
+            return saved, updated, bars
+
+        saved, updated, bars = asyncio.run(_run_with_session(work))
+        assert (saved, updated) == (3, 1)
+        assert [bar.close_price for bar in bars] == [102.0, 101.0, 200.0]
+
+    def test_stock_list_finders(self):
+        """Test stock list upsert and lookups"""
+        async def work(session: AsyncSession):
+            service = AsyncSaDbService(session)
+            await service.save_all_stock_list([
+                StockList(stock_code="005930", stock_name="Samsung", market="KOSPI"),
+                {"stock_code": "000660", "stock_name": "SK hynix", "market": "KOSPI"}
+            ])
+            return (await service.find_all_stock_list(),
+                    await service.find_stock_by_stock_code("000660"),
+                    await service.find_stock_by_stock_name("Unknown"))
+
+        stocks, found, missing = asyncio.run(_run_with_session(work))
+        assert sorted(stock.stock_code for stock in stocks) == ["000660", "005930"]
+        assert found.stock_name == "SK hynix"
+        assert missing is None
+
+    def test_session_per_call_saves_detached_auth_info(self, test_db, monkeypatch):
+        """Test a token issued on an auth info loaded by an earlier session is saved (sync SaDbService)"""
+        test_db.add(AuthInfo(app_key="app-key", app_secret="secret", account_number="1234567801", mode="V"))
+        test_db.commit()
+        session_factory = sessionmaker(bind=test_db.get_bind())
+
+        @asynccontextmanager
+        async def open_test_session():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def post_request(url, data=None, headers=None):
+            return {"access_token": "issued", "access_token_token_expired": "2999-12-31 23:59:59"}
+
+        monkeypatch.setattr(WebClientUtil, "post_request", staticmethod(post_request))
+        oauth_service = KrInvOauthService()
+        oauth_service.sa_db_service = SessionScopedSaDbService(open_test_session)
+
+        async def run():
+            auth = (await oauth_service.sa_db_service.find_all_auth_info_with_account())[0]
+            return await oauth_service.api_oauth2_token(auth)
+
+        try:
+            assert asyncio.run(run()) == "issued"
+        finally:
+            KrInvTokenManager.reset()
+        test_db.expire_all()
+        assert test_db.query(AuthInfo).one().access_token == "issued"
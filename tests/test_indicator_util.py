@@ -0,0 +1,136 @@
+"""
+Test Indicator Utility
+
+Tests for the vectorized indicators against straightforward loop implementations.
+"""
+
+import asyncio
+import numpy as np
+from app.models import DayStatEntity
+from app.services.sa.sa_stat_day_service import SaStatDayService
+from app.utils.indicator_util import IndicatorUtil
+
+def _prices(symbols: int = 3, days: int = 60):
+    rng = np.random.default_rng(1)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, days)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, (symbols, days)))
+    low = close * (1 - rng.uniform(0, 0.02, (symbols, days)))
+    volume = rng.integers(1, 1000, (symbols, days)).astype(np.float64)
+    return high, low, close, volume
+
+class TestIndicatorUtil:
+    """Test IndicatorUtil functions"""
+
+    def test_sma_and_rolling_std_match_windows(self):
+        """Test rolling mean/stdev against per-window numpy results"""
+        _, _, close, _ = _prices()
+        sma = IndicatorUtil.sma(close, 20)
+        std = IndicatorUtil.rolling_std(close, 20)
+        assert np.isnan(sma[:, :19]).all()
+        for t in range(19, close.shape[1]):
+            window = close[:, t - 19:t + 1]
+            np.testing.assert_allclose(sma[:, t], window.mean(axis=1))
+            np.testing.assert_allclose(std[:, t], window.std(axis=1), rtol=1e-6)
+
+    def test_ema_matches_recursion(self):
+        """Test EMA of a 2-D matrix equals the per-row recursion"""
+        _, _, close, _ = _prices()
+        ema = IndicatorUtil.ema(close, 10)
+        alpha = 2 / 11
+        for row, expected_row in zip(close, ema):
+            value = row[:10].mean()
+            assert np.isclose(expected_row[9], value)
+            for t in range(10, len(row)):
+                value = alpha * row[t] + (1 - alpha) * value
+                assert np.isclose(expected_row[t], value)
+
+    def test_one_dimensional_input(self):
+        """Test a single price history gives the same result as a matrix row"""
+        _, _, close, _ = _prices()
+        np.testing.assert_allclose(IndicatorUtil.rsi(close[1]), IndicatorUtil.rsi(close)[1])
+
+    def test_rsi_bounds_and_monotonic_series(self):
+        """Test RSI stays in 0 ~ 100 and is 100 without losses"""
+        _, _, close, _ = _prices()
+        rsi = IndicatorUtil.rsi(close)
+        valid = rsi[~np.isnan(rsi)]
+        assert ((valid >= 0) & (valid <= 100)).all()
+        assert IndicatorUtil.rsi(np.arange(1.0, 31.0))[-1] == 100.0
+
+    def test_atr_and_macd_shapes(self):
+        """Test ATR is positive and MACD histogram is line minus signal"""
+        high, low, close, _ = _prices()
+        atr = IndicatorUtil.atr(high, low, close)
+        assert (atr[:, 13:] > 0).all()
+        line, signal, hist = IndicatorUtil.macd(close)
+        assert np.isnan(signal[:, :33]).all()
+        np.testing.assert_allclose(hist[:, 33:], line[:, 33:] - signal[:, 33:])
+
+    def test_vwap(self):
+        """Test cumulative and rolling VWAP"""
+        high, low, close, volume = _prices()
+        typical = (high + low + close) / 3
+        vwap = IndicatorUtil.vwap(high, low, close, volume)
+        np.testing.assert_allclose(vwap[:, -1], (typical * volume).sum(axis=1) / volume.sum(axis=1))
+        rolling = IndicatorUtil.vwap(high, low, close, volume, 5)
+        np.testing.assert_allclose(
+            rolling[:, -1], (typical[:, -5:] * volume[:, -5:]).sum(axis=1) / volume[:, -5:].sum(axis=1)
+        )
+
+    def test_to_matrix_pivots_and_fills(self):
+        """Test long rows pivot into symbol x time matrices"""
+        rows = [("B", "20240102", 10.0), ("A", "20240102", 1.0), ("A", "20240103", 2.0)]
+        codes, times, matrices = IndicatorUtil.to_matrix(rows, ["close_price"])
+        assert codes == ["A", "B"]
+        assert list(times) == ["20240102", "20240103"]
+        np.testing.assert_array_equal(matrices["close_price"], [[1.0, 2.0], [10.0, 10.0]])
+
+    def test_symbol_listed_late(self):
+        """Test leading NaN of a late listed symbol only delay its indicators"""
+        rows = [("A", day, 100.0 + day) for day in range(30)] + [("B", day, 50.0 + day) for day in range(10, 30)]
+        _, _, matrices = IndicatorUtil.to_matrix(rows, ["close_price"])
+        close = matrices["close_price"]
+        late = close[1, 10:]
+        assert np.isnan(close[1, :10]).all()
+
+        np.testing.assert_allclose(IndicatorUtil.sma(close, 5)[1, 14:], IndicatorUtil.sma(late, 5)[4:])
+        np.testing.assert_allclose(IndicatorUtil.ema(close, 5)[1, 14:], IndicatorUtil.ema(late, 5)[4:])
+        np.testing.assert_allclose(IndicatorUtil.rolling_std(close, 5)[1, 14:],
+                                   IndicatorUtil.rolling_std(late, 5)[4:], atol=1e-9)
+        np.testing.assert_allclose(IndicatorUtil.rsi(close, 5)[1, 15:], IndicatorUtil.rsi(late, 5)[5:])
+        np.testing.assert_allclose(IndicatorUtil.atr(close, close, close, 5)[1, 14:],
+                                   IndicatorUtil.atr(late, late, late, 5)[4:])
+        line, signal_line, _ = IndicatorUtil.macd(close, 3, 6, 3)
+        late_line, late_signal, _ = IndicatorUtil.macd(late, 3, 6, 3)
+        np.testing.assert_allclose(line[1, 15:], late_line[5:])
+        np.testing.assert_allclose(signal_line[1, 17:], late_signal[7:])
+        assert np.isnan(IndicatorUtil.ema(close, 5)[1, :14]).all()
+        np.testing.assert_allclose(IndicatorUtil.ema(close, 5)[0], IndicatorUtil.ema(close[0], 5))
+
+    def test_gap_only_affects_its_windows(self):
+        """Test a missing value leaves the windows that do not hold it valid"""
+        _, _, close, _ = _prices(1, 30)
+        close[0, 12] = np.nan
+        sma = IndicatorUtil.sma(close, 5)[0]
+        assert np.isnan(sma[12:17]).all()
+        np.testing.assert_allclose(sma[17:], [close[0, t - 4:t + 1].mean() for t in range(17, 30)])
+        assert not np.isnan(IndicatorUtil.ema(close, 5)[0, 4:]).any()
+
+class TestSaStatDayService:
+    """Test SaStatDayService indicator functions"""
+
+    def test_moving_average_and_volatility(self, test_db):
+        """Test moving average / volatility from stored day info"""
+        closes = [100.0, 102.0, 101.0, 105.0, 104.0]
+        for day, close in enumerate(closes):
+            test_db.add(DayStatEntity(stock_code="005930", tr_date=f"2024010{day + 1}",
+                                      open_price=close, high_price=close, low_price=close,
+                                      close_price=close, volume=100))
+        test_db.commit()
+
+        service = SaStatDayService(test_db)
+        assert np.isclose(asyncio.run(service.calculate_moving_average("005930", 3)), np.mean(closes[-3:]))
+        returns = np.array(closes[1:]) / np.array(closes[:-1]) - 1
+        assert np.isclose(asyncio.run(service.calculate_volatility("005930", 3)),
+                          returns[-3:].std(ddof=1))
+        assert asyncio.run(service.calculate_moving_average("000660", 3)) == 0.0
@@ -0,0 +1,60 @@
+"""
+Test Korea Investment Authentication Info Manager
+
+Tests for app key scheduling.
+"""
+
+import asyncio
+from app.models import AuthInfo
+from app.common.kr_auth_info import KrAuthInfo
+from app.common.kr_rate_limiter import KrRateLimiter
+
+VALID_UNTIL = "2999-12-31 23:59:59"
+
+def _auth(app_key: str, expired_date: str = VALID_UNTIL) -> AuthInfo:
+    return AuthInfo(app_key=app_key, app_secret="secret", access_token="token",
+                    access_token_expired_date=expired_date, account_number="1234567801", mode="R")
+
+class TestKrAuthInfo:
+    """Test KrAuthInfo scheduling"""
+
+    def setup_method(self):
+        KrRateLimiter.reset()
+
+    def teardown_method(self):
+        KrAuthInfo.set_auth_info_list([])
+        KrRateLimiter.reset()
+
+    def test_no_duplicated_first_element(self):
+        """Test the key list is not padded with the first key"""
+        KrAuthInfo.set_auth_info_list([_auth("A"), _auth("B")])
+        assert len(KrAuthInfo.list_auth_info) == 2
+        assert len(KrAuthInfo.list_real_auth_info) == 2
+
+    def test_skips_expired_and_refreshing_keys(self):
+        """Test expired or refreshing keys are not selected"""
+        expired = _auth("A", "2000-01-01 00:00:00")
+        refreshing = _auth("B")
+        usable = _auth("C")
+        KrAuthInfo.set_auth_info_list([expired, refreshing, usable])
+        KrAuthInfo.set_refreshing(refreshing, True)
+
+        assert KrAuthInfo.next() is usable
+        KrAuthInfo.set_refreshing(refreshing, False)
+
+    def test_least_loaded_key_is_selected(self):
+        """Test concurrent leases spread across keys"""
+        KrAuthInfo.set_auth_info_list([_auth("A"), _auth("B"), _auth("C")])
+
+        async def run():
+            selected = []
+            async def task():
+                async with KrAuthInfo.acquire() as auth:
+                    selected.append(auth.app_key)
+                    assert KrAuthInfo.get_in_flight(auth) >= 1
+                    await asyncio.sleep(0.01)
+            await asyncio.gather(*(task() for _ in range(3)))
+            return selected
+
+        assert sorted(asyncio.run(run())) == ["A", "B", "C"]
+        assert all(count == 0 for count in KrAuthInfo.in_flight_counts().values())
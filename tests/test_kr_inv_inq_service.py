@@ -0,0 +1,99 @@
+"""
+Test Korea Investment Inquiry Service
+
+Tests for the batch price inquiry: duplicate codes sent once, bounded
+fan-out, columnar output and per-code errors, also through /inquire-prices.
+"""
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.krinvest.kr_inv_inq_service import KrInvInqService
+from app.services.service_registry import get_kr_inv_inq_service
+
+class FakeQuotes:
+    """api_inquire_price stand-in recording calls and concurrency"""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def api_inquire_price(self, stock_code, debug=False, use_cache=True):
+        self.calls.append(stock_code)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if stock_code == "999999":
+            return {"error": "API request failed", "details": {"rt_cd": "1"}}
+        if stock_code == "888888":
+            return {"rt_cd": "0", "output": {"stck_prpr": ""}}
+        price = int(stock_code[-2:]) * 1000
+        return {"rt_cd": "0", "output": {
+            "stck_prpr": str(price), "stck_oprc": str(price - 100), "acml_vol": "12345",
+            "prdy_vrss": "-100", "prdy_ctrt": "-0.50"
+        }}
+
+@pytest.fixture
+def quotes(monkeypatch):
+    fake = FakeQuotes()
+    service = KrInvInqService(kr_inv_oauth_service=object())
+    monkeypatch.setattr(service, "api_inquire_price", fake.api_inquire_price)
+    return service, fake
+
+class TestKrInvInqServiceInquirePrices:
+    """Test KrInvInqService.inquire_prices"""
+
+    def test_columnar_output_and_errors(self, quotes):
+        """Test prices come back as parallel columns and failed codes land in errors"""
+        service, fake = quotes
+
+        result = asyncio.run(service.inquire_prices(["005930", "999999", "000660", "888888"]))
+
+        assert result["stock_code"] == ["005930", "000660"]
+        assert result["price"] == [30000, 60000]
+        assert result["open_price"] == [29900, 59900]
+        assert result["volume"] == [12345, 12345]
+        assert result["change"] == [-100, -100]
+        assert result["change_rate"] == [-0.5, -0.5]
+        assert result["errors"]["999999"] == "API request failed"
+        assert result["errors"]["888888"].startswith("Invalid output")
+
+    def test_duplicates_sent_once(self, quotes):
+        """Test a code listed twice is inquired and returned once, in first-seen order"""
+        service, fake = quotes
+
+        result = asyncio.run(service.inquire_prices(["000660", "005930", "000660"]))
+
+        assert sorted(fake.calls) == ["000660", "005930"]
+        assert result["stock_code"] == ["000660", "005930"]
+
+    def test_fan_out_bounded(self, quotes):
+        """Test at most concurrency requests are in flight"""
+        service, fake = quotes
+
+        result = asyncio.run(service.inquire_prices([f"0000{index:02d}" for index in range(10)], concurrency=3))
+
+        assert len(result["stock_code"]) == 10
+        assert fake.max_active == 3
+
+    def test_endpoint(self, quotes):
+        """Test /inquire-prices splits the codes and returns the columnar result"""
+        service, fake = quotes
+        app.dependency_overrides[get_kr_inv_inq_service] = lambda: service
+        try:
+            response = TestClient(app).get(
+                "/api/krinvest/inquire-prices", params={"stock_codes": "005930, 999999,,005930"}
+            )
+        finally:
+            del app.dependency_overrides[get_kr_inv_inq_service]
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["stock_code"] == ["005930"]
+        assert data["price"] == [30000]
+        assert list(data["errors"]) == ["999999"]
+        assert fake.calls == ["005930", "999999"]
@@ -0,0 +1,136 @@
+"""
+Test Korea Investment Order Service
+
+Tests for order hashkeys: skipped when disabled, cached per order body,
+shared by concurrent requests, issued alongside order preparation and
+left out when the hashkey request fails.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from app.common.kr_rate_limiter import KrRateLimiter
+from app.config.settings import settings
+from app.services.krinvest.kr_inv_ord_service import KrInvOrdService
+from app.utils import WebClientUtil
+
+class FakeOauthService:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def api_oauth2_token(self, auth_info_entity):
+        await asyncio.sleep(self.delay)
+        return "token"
+
+class FakeBroker:
+    """WebClientUtil.post_request stand-in answering hashkey and order requests"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.hashkey_fails = False
+        self.hashkey_calls = 0
+        self.orders = []
+
+    async def post_request(self, url, data=None, headers=None):
+        await asyncio.sleep(self.delay)
+        if url.endswith("/uapi/hashkey"):
+            self.hashkey_calls += 1
+            if self.hashkey_fails:
+                raise RuntimeError("hashkey endpoint down")
+            return {"BODY": data, "HASH": f"hash-{data['PDNO']}-{data['ORD_QTY']}"}
+        self.orders.append(headers.get("hashkey"))
+        return {"rt_cd": "0", "output": {"ODNO": "0000000001"}}
+
+AUTH = SimpleNamespace(app_key="app-key", app_secret="app-secret", account_number="1111111101", mode="V")
+
+@pytest.fixture
+def broker(monkeypatch):
+    async def acquire(auth_info_entity, tr_id):
+        return None
+
+    fake = FakeBroker()
+    monkeypatch.setattr(WebClientUtil, "post_request", staticmethod(fake.post_request))
+    monkeypatch.setattr(KrRateLimiter, "acquire", staticmethod(acquire))
+    KrInvOrdService.reset_hashkeys()
+    yield fake
+    KrInvOrdService.reset_hashkeys()
+
+class TestKrInvOrdServiceHashkey:
+    """Test KrInvOrdService hashkey handling"""
+
+    def test_hashkey_skipped_when_disabled(self, broker, monkeypatch):
+        """Test orders carry no hashkey and cost no extra call by default"""
+        monkeypatch.setattr(settings, "KI_ORDER_HASHKEY", False)
+        service = KrInvOrdService(kr_inv_oauth_service=FakeOauthService())
+
+        asyncio.run(service.order_cash_buy_by_market_price(AUTH, "005930", "10"))
+
+        assert broker.hashkey_calls == 0
+        assert broker.orders == [None]
+
+    def test_hashkey_cached_and_shared(self, broker, monkeypatch):
+        """Test identical bodies reuse one hashkey, including concurrent requests"""
+        monkeypatch.setattr(settings, "KI_ORDER_HASHKEY", True)
+        service = KrInvOrdService(kr_inv_oauth_service=FakeOauthService())
+
+        async def run():
+            await asyncio.gather(*[service.order_cash_buy_by_market_price(AUTH, "005930", "10") for _ in range(3)])
+            await service.order_cash_buy_by_market_price(AUTH, "005930", "10")
+            await service.order_cash_buy_by_market_price(AUTH, "000660", "10")
+
+        asyncio.run(run())
+
+        assert broker.hashkey_calls == 2
+        assert broker.orders == ["hash-005930-10"] * 4 + ["hash-000660-10"]
+
+    def test_hashkey_failure_sends_without_it(self, broker, monkeypatch):
+        """Test an order is still sent, without the header, when the hashkey request fails"""
+        monkeypatch.setattr(settings, "KI_ORDER_HASHKEY", True)
+        broker.hashkey_fails = True
+        service = KrInvOrdService(kr_inv_oauth_service=FakeOauthService())
+
+        response = asyncio.run(service.order_cash_buy_by_market_price(AUTH, "005930", "10"))
+
+        assert response["rt_cd"] == "0"
+        assert broker.hashkey_calls == 1
+        assert broker.orders == [None]
+        assert KrInvOrdService._hashkeys.stats()["size"] == 0
+
+    def test_hashkey_cache_bounded(self, broker, monkeypatch):
+        """Test the least recently used hashkeys are dropped past the cache size"""
+        monkeypatch.setattr(settings, "KI_ORDER_HASHKEY", True)
+        monkeypatch.setattr(KrInvOrdService._hashkeys, "max_size", 2)
+        service = KrInvOrdService(kr_inv_oauth_service=FakeOauthService())
+
+        async def run():
+            for qty in ("1", "2", "1", "3", "1", "2"):
+                await service.precompute_order_hashkey(AUTH, "005930", qty)
+
+        asyncio.run(run())
+
+        assert broker.hashkey_calls == 4
+        assert KrInvOrdService._hashkeys.stats()["size"] == 2
+
+    def test_hashkey_overlaps_order_preparation(self, broker, monkeypatch):
+        """Test the hashkey round trip runs alongside the token fetch, and a precomputed one costs nothing"""
+        monkeypatch.setattr(settings, "KI_ORDER_HASHKEY", True)
+        service = KrInvOrdService(kr_inv_oauth_service=FakeOauthService(delay=broker.delay))
+
+        async def timed(coroutine):
+            start = time.perf_counter()
+            await coroutine
+            return time.perf_counter() - start
+
+        async def run():
+            cold = await timed(service.order_cash_buy_by_market_price(AUTH, "005930", "10"))
+            await service.precompute_order_hashkey(AUTH, "000660", "5")
+            warm = await timed(service.order_cash_buy_by_market_price(AUTH, "000660", "5"))
+            return cold, warm
+
+        cold, warm = asyncio.run(run())
+
+        # token + order, not token + hashkey + order
+        assert cold < 2.8 * broker.delay
+        assert warm < 2.8 * broker.delay
+        assert broker.orders == ["hash-005930-10", "hash-000660-5"]
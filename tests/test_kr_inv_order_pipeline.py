@@ -0,0 +1,253 @@
+"""
+Test Korea Investment Order Pipeline
+
+Tests for per-account order queues, idempotency keys, the in-flight table
+and asynchronous order history writes.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from app.config.settings import settings
+from app.exceptions import BizRuntimeException
+from app.models import OrderHistory
+from app.services.krinvest.kr_inv_order_pipeline import KrInvOrderPipeline, PipelineOrder
+from app.services.sa.sa_api_service import SaApiService
+from app.services.sa.sa_db_service import SaDbService
+
+class FakeOrdService:
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.cancels = []
+        self.reject_cancel = False
+        self.hashkeys_cancelled = 0
+
+    async def _api_order_cash(self, auth_info_entity, order_id, stock_code, stock_qty, stock_price, ord_dvsn):
+        self.calls.append((auth_info_entity.account_number, order_id, stock_code))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if stock_code == "999999":
+            return {"rt_cd": "1", "msg1": "invalid stock code"}
+        return {"rt_cd": "0", "output": {"ODNO": f"{len(self.calls):010d}"}}
+
+    async def precompute_order_hashkey(self, auth_info_entity, stock_code, stock_qty, stock_price, ord_dvsn):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.hashkeys_cancelled += 1
+            raise
+
+    async def order_cancel(self, auth_info_entity, order_num):
+        self.cancels.append((auth_info_entity.account_number, order_num))
+        if self.reject_cancel:
+            return {"rt_cd": "1", "msg1": "already executed"}
+        return {"rt_cd": "0", "output": {"ODNO": order_num}}
+
+    async def api_inquire_ccnl(self, auth_info_entity, order_date=None):
+        # Odd order numbers filled, even ones cancelled with nothing filled
+        return {"output1": [
+            {"odno": f"{number:010d}", "ord_qty": "1", "tot_ccld_qty": str(number % 2),
+             "rmn_qty": "0", "cncl_yn": "N" if number % 2 else "Y"}
+            for number in range(1, len(self.calls) + 1)
+        ]}
+
+class SlowDbService:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.rows = []
+
+    async def save_all_order_history_list(self, rows):
+        await asyncio.sleep(self.delay)
+        self.rows.extend(rows)
+        return len(rows)
+
+ACCOUNT_A = SimpleNamespace(account_number="1111111101")
+ACCOUNT_B = SimpleNamespace(account_number="2222222201")
+
+class TestKrInvOrderPipeline:
+    """Test KrInvOrderPipeline functions"""
+
+    def test_idempotency_key_sends_once(self, test_db):
+        """Test concurrent and retried submits with one key reach the broker once"""
+        async def run():
+            ord_service = FakeOrdService()
+            pipeline = KrInvOrderPipeline(ord_service, test_db)
+            first, second = await asyncio.gather(
+                pipeline.submit(ACCOUNT_A, "BUY", "005930", "10", idempotency_key="key-1"),
+                pipeline.submit(ACCOUNT_A, "BUY", "005930", "10", idempotency_key="key-1"),
+            )
+            retry = await pipeline.submit(ACCOUNT_A, "BUY", "005930", "10", idempotency_key="key-1")
+            with pytest.raises(BizRuntimeException):
+                await pipeline.submit(ACCOUNT_A, "SELL", "005930", "10", idempotency_key="key-1")
+            await pipeline.stop()
+            return ord_service, first, second, retry
+
+        ord_service, first, second, retry = asyncio.run(run())
+
+        assert len(ord_service.calls) == 1
+        assert first is second is retry
+        assert ord_service.calls[0] == (ACCOUNT_A.account_number, "0802U", "005930")
+
+    def test_accounts_run_in_parallel_in_order(self, test_db):
+        """Test orders of an account are sent one at a time in order while accounts overlap"""
+        async def run():
+            ord_service = FakeOrdService()
+            pipeline = KrInvOrderPipeline(ord_service, test_db)
+            await asyncio.gather(*[
+                pipeline.submit(account, "SELL", f"00000{index}", "1")
+                for index in range(3) for account in (ACCOUNT_A, ACCOUNT_B)
+            ])
+            await pipeline.stop()
+            return ord_service
+
+        ord_service = asyncio.run(run())
+
+        assert ord_service.max_active == 2
+        for account in (ACCOUNT_A, ACCOUNT_B):
+            sent = [code for number, _, code in ord_service.calls if number == account.account_number]
+            assert sent == ["000000", "000001", "000002"]
+
+    def test_in_flight_table_and_persistence(self, test_db):
+        """Test accepted orders are indexed by order number and their last state is written"""
+        async def run():
+            pipeline = KrInvOrderPipeline(FakeOrdService(), test_db)
+            accepted = await pipeline.submit(ACCOUNT_A, "BUY", "005930", "3", "70000", "00", "key-a")
+            rejected = await pipeline.submit(ACCOUNT_A, "BUY", "999999", "1", idempotency_key="key-r")
+            order_no = accepted["output"]["ODNO"]
+            in_flight = pipeline.get_order(order_no)
+            assert rejected["rt_cd"] == "1"
+            assert [order.idempotency_key for order in pipeline.in_flight_orders()] == ["key-a"]
+            await pipeline.flush()
+            first_status = test_db.query(OrderHistory).filter(OrderHistory.order_id == "key-a").one().status
+            pipeline.complete(order_no)
+            await pipeline.stop()
+            return pipeline, in_flight, first_status
+
+        pipeline, in_flight, first_status = asyncio.run(run())
+
+        assert in_flight.status == PipelineOrder.EXECUTED and pipeline.in_flight_orders() == []
+        assert first_status == PipelineOrder.ACCEPTED
+        test_db.expire_all()
+        rows = {row.order_id: row for row in test_db.query(OrderHistory).all()}
+        assert (rows["key-a"].status, rows["key-a"].quantity, rows["key-a"].price) == ("EXECUTED", 3, 70000.0)
+        assert rows["key-a"].execution_time is not None
+        assert rows["key-r"].status == "REJECTED"
+
+    def test_submit_does_not_wait_for_database(self, monkeypatch):
+        """Test submit latency stays at the broker round trip while history writes lag"""
+        monkeypatch.setattr(settings, "DATABASE_ASYNC", True)
+
+        async def run():
+            pipeline = KrInvOrderPipeline(FakeOrdService(delay=0.01))
+            pipeline.sa_db_service = SlowDbService(delay=0.2)
+            start = time.perf_counter()
+            for index in range(5):
+                await pipeline.submit(ACCOUNT_A, "BUY", "005930", "1", idempotency_key=f"key-{index}")
+            elapsed = time.perf_counter() - start
+            written_before_stop = len(pipeline.sa_db_service.rows)
+            await pipeline.stop()
+            return pipeline, elapsed, written_before_stop
+
+        pipeline, elapsed, written_before_stop = asyncio.run(run())
+
+        assert elapsed < 0.15
+        assert written_before_stop < 5
+        latest = {row["order_id"]: row["status"] for row in pipeline.sa_db_service.rows}
+        assert latest == {f"key-{index}": "ACCEPTED" for index in range(5)}
+
+    def test_sync_session_writes_off_the_event_loop(self, test_db, monkeypatch):
+        """Test blocking writes through a sync Session run on a worker thread"""
+        bulk_upsert = SaDbService._bulk_upsert
+
+        def slow_bulk_upsert(self, *args, **kwargs):
+            time.sleep(0.2)
+            return bulk_upsert(self, *args, **kwargs)
+
+        monkeypatch.setattr(SaDbService, "_bulk_upsert", slow_bulk_upsert)
+
+        async def run():
+            pipeline = KrInvOrderPipeline(FakeOrdService(delay=0.01), test_db)
+            start = time.perf_counter()
+            for index in range(5):
+                await pipeline.submit(ACCOUNT_A, "BUY", "005930", "1", idempotency_key=f"key-{index}")
+            elapsed = time.perf_counter() - start
+            await pipeline.stop()
+            return elapsed
+
+        elapsed = asyncio.run(run())
+
+        assert elapsed < 0.15
+        statuses = {row.order_id: row.status for row in test_db.query(OrderHistory).all()}
+        assert statuses == {f"key-{index}": "ACCEPTED" for index in range(5)}
+
+    def test_stop_cancels_hashkey_warm_ups(self, test_db, monkeypatch):
+        """Test hashkey warm-up tasks are kept until done and cancelled by stop"""
+        monkeypatch.setattr(settings, "KI_ORDER_HASHKEY", True)
+
+        async def run():
+            ord_service = FakeOrdService(delay=0)
+            pipeline = KrInvOrderPipeline(ord_service, test_db)
+            await asyncio.gather(*[
+                pipeline.submit(ACCOUNT_A, "BUY", "005930", "1", idempotency_key=f"key-{index}") for index in range(3)
+            ])
+            pending = len(pipeline._hashkey_tasks)
+            await pipeline.stop()
+            return ord_service, pipeline, pending
+
+        ord_service, pipeline, pending = asyncio.run(run())
+
+        assert pending == 3
+        assert ord_service.hashkeys_cancelled == 3
+        assert pipeline._hashkey_tasks == set()
+
+    def test_executions_complete_orders_and_keys_expire(self, test_db):
+        """Test polled executions empty the in-flight table and expired keys are forgotten"""
+        async def run():
+            pipeline = KrInvOrderPipeline(FakeOrdService(delay=0), test_db, idempotency_ttl=0)
+            for index in range(50):
+                await pipeline.submit(ACCOUNT_A, "BUY", "005930", "1", idempotency_key=f"key-{index}")
+            in_flight_before = len(pipeline.in_flight_orders())
+            completed = await pipeline.poll_executions()
+            await pipeline.submit(ACCOUNT_A, "BUY", "005930", "1", idempotency_key="key-last")
+            await pipeline.stop()
+            return pipeline, in_flight_before, completed
+
+        pipeline, in_flight_before, completed = asyncio.run(run())
+
+        assert (in_flight_before, completed) == (50, 50)
+        assert [order.idempotency_key for order in pipeline.in_flight_orders()] == ["key-last"]
+        assert list(pipeline._orders) == ["key-last"]
+        statuses = {row.order_id: row.status for row in test_db.query(OrderHistory).all()}
+        assert (statuses["key-0"], statuses["key-1"]) == ("EXECUTED", "CANCELLED")
+
+    def test_cancel_uses_order_account_and_broker_answer(self, test_db):
+        """Test a cancel goes to the order's account and completes the order only when accepted"""
+        async def run():
+            ord_service = FakeOrdService(delay=0)
+            pipeline = KrInvOrderPipeline(ord_service, test_db)
+            api_service = SaApiService(
+                kr_inv_ord_service=ord_service, kr_inv_inq_service=object(), kr_inv_order_pipeline=pipeline
+            )
+            await pipeline.submit(ACCOUNT_B, "BUY", "005930", "1", idempotency_key="key-b")
+            order_no = pipeline.get_order_by_key("key-b").order_no
+            ord_service.reject_cancel = True
+            rejected = await api_service.order_rvsecncl(order_no)
+            still_in_flight = pipeline.get_order(order_no) is not None
+            ord_service.reject_cancel = False
+            accepted = await api_service.order_rvsecncl(order_no)
+            await pipeline.stop()
+            return ord_service, pipeline, order_no, rejected, still_in_flight, accepted
+
+        ord_service, pipeline, order_no, rejected, still_in_flight, accepted = asyncio.run(run())
+
+        assert ord_service.cancels == [(ACCOUNT_B.account_number, order_no)] * 2
+        assert rejected["rt_cd"] == "1" and still_in_flight
+        assert accepted["rt_cd"] == "0"
+        assert pipeline.get_order_by_key("key-b").status == PipelineOrder.CANCELLED
+        assert pipeline.in_flight_orders() == []
@@ -0,0 +1,65 @@
+"""
+Test Korea Investment Tick Parser
+
+Tests for real-time frame decoding into the tick ring buffer.
+"""
+
+import base64
+import pytest
+from app.services.krinvest.kr_inv_tick_parser import (
+    KrInvTickParser, TickRingBuffer, H0STCNT0_FIELDS, H0STCNI0_FIELDS
+)
+
+def _tick(stock_code: str, hour: str, price: int, volume: int) -> str:
+    values = ["0"] * len(H0STCNT0_FIELDS)
+    values[0] = stock_code
+    values[1] = hour
+    values[2] = str(price)
+    values[5] = "1.25"
+    values[12] = str(volume)
+    values[21] = "1"
+    return "^".join(values)
+
+class TestKrInvTickParser:
+    """Test KrInvTickParser functions"""
+
+    def test_parse_multi_record_frame(self):
+        """Test every record of a frame is decoded by field index"""
+        parser = KrInvTickParser(capacity=8)
+        frame = f"0|H0STCNT0|002|{_tick('005930', '090001', 70000, 10)}^{_tick('000660', '090002', 120000, 3)}"
+
+        tr_id, written = parser.parse_frame(frame)
+        ticks = parser.ticks.latest(written)
+
+        assert (tr_id, written) == ("H0STCNT0", 2)
+        assert ticks["stock_code"].tolist() == [b"005930", b"000660"]
+        assert ticks["price"].tolist() == [70000, 120000]
+        assert ticks["time"].tolist() == [90001, 90002]
+        assert ticks["volume"].tolist() == [10, 3]
+        assert ticks["change_rate"][0] == 1.25
+        assert ticks["side"][0] == 1
+
+    def test_ring_buffer_wraps(self):
+        """Test the ring buffer keeps the latest records in order"""
+        parser = KrInvTickParser(capacity=3)
+        for i in range(5):
+            parser.parse_ticks(_tick("005930", "090000", 100 + i, 1), 1)
+
+        assert len(parser.ticks) == 3
+        assert parser.ticks.latest()["price"].tolist() == [102, 103, 104]
+        assert parser.ticks.latest(2)["price"].tolist() == [103, 104]
+
+    def test_decrypt_notice(self):
+        """Test AES-256-CBC execution notice decryption"""
+        aes = pytest.importorskip("Crypto.Cipher.AES")
+        from Crypto.Util.Padding import pad
+
+        key, iv = "k" * 32, "i" * 16
+        plain = "^".join(["customer", "12345678", "0000117057"] + ["0"] * (len(H0STCNI0_FIELDS) - 3))
+        cipher = aes.new(key.encode(), aes.MODE_CBC, iv.encode())
+        payload = base64.b64encode(cipher.encrypt(pad(plain.encode(), aes.block_size))).decode()
+
+        parser = KrInvTickParser(capacity=1)
+        parser.set_cipher("H0STCNI0", key, iv)
+        notice = parser.parse_notice("H0STCNI0", payload)[0]
+        assert notice["ODER_NO"] == "0000117057"
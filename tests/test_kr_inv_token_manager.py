@@ -0,0 +1,174 @@
+"""
+Test Korea Investment Token Manager
+
+Tests for the token cache and the proactive background refresh.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+from app.models import AuthInfo
+from app.common.kr_auth_info import KrAuthInfo
+from app.services.krinvest.kr_inv_oauth_service import KrInvOauthService
+from app.services.krinvest.kr_inv_token_manager import KrInvTokenManager
+from app.services.sa.async_sa_db_service import SessionScopedSaDbService
+from app.utils import WebClientUtil
+
+NOW = datetime(2026, 1, 5, 8, 0, 0).timestamp()
+
+def _auth(app_key: str, expired_date: str) -> AuthInfo:
+    return AuthInfo(app_key=app_key, app_secret="secret", access_token=f"token-{app_key}",
+                    access_token_expired_date=expired_date, approval_key=f"approval-{app_key}",
+                    account_number="1234567801", mode="R")
+
+class FakeOauthService:
+    """Issues tokens valid for a day, recording calls"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.issued = []
+        self.refreshing_during_issue = []
+
+    async def issue_access_token(self, auth_info_entity: AuthInfo) -> str:
+        self.refreshing_during_issue.append(auth_info_entity.app_key in KrAuthInfo._refreshing)
+        if self.fail:
+            raise RuntimeError("token endpoint down")
+        self.issued.append(("token", auth_info_entity.app_key))
+        auth_info_entity.access_token = f"new-{auth_info_entity.app_key}"
+        auth_info_entity.access_token_expired_date = "2026-01-06 08:00:00"
+        KrInvTokenManager.cache_token(auth_info_entity)
+        return auth_info_entity.access_token
+
+    async def issue_approval_key(self, auth_info_entity: AuthInfo) -> str:
+        self.issued.append(("approval", auth_info_entity.app_key))
+        KrInvTokenManager.cache_approval_key(auth_info_entity, NOW)
+        return auth_info_entity.approval_key
+
+class FakeTokenEndpoint:
+    """WebClientUtil.post_request stand-in for /oauth2/tokenP"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def post_request(self, url, data=None, headers=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"access_token": f"issued-{self.calls}", "access_token_token_expired": "2026-01-06 08:00:00"}
+
+def _session_scoped_oauth_service(test_db) -> KrInvOauthService:
+    """Real OAuth service saving through a session per call on the test database"""
+    session_factory = sessionmaker(bind=test_db.get_bind())
+
+    @asynccontextmanager
+    async def open_test_session():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    oauth_service = KrInvOauthService()
+    oauth_service.sa_db_service = SessionScopedSaDbService(open_test_session)
+    return oauth_service
+
+class TestKrInvTokenManager:
+    """Test KrInvTokenManager functions"""
+
+    def setup_method(self):
+        KrInvTokenManager.reset()
+
+    def teardown_method(self):
+        KrInvTokenManager.reset()
+        KrAuthInfo.set_auth_info_list([])
+
+    def _manager(self, oauth_service, now=NOW):
+        return KrInvTokenManager(oauth_service, refresh_margin=3600, interval=300,
+                                 retry_delay=60, now=lambda: now)
+
+    def test_cached_token_lookup(self):
+        """Test cached tokens are returned until they expire"""
+        auth = _auth("A", "2026-01-05 09:00:00")
+        KrInvTokenManager.cache_token(auth)
+        assert KrInvTokenManager.get_access_token(auth, NOW) == "token-A"
+        assert KrInvTokenManager.get_access_token(auth, NOW + 3600) is None
+
+    def test_refreshes_only_due_tokens(self):
+        """Test tokens within the margin are refreshed while others are left alone"""
+        due, fresh = _auth("A", "2026-01-05 08:30:00"), _auth("B", "2026-01-05 20:00:00")
+        for auth in (due, fresh):
+            KrInvTokenManager.cache_token(auth)
+            KrInvTokenManager.cache_approval_key(auth, NOW)
+        oauth_service = FakeOauthService()
+        manager = self._manager(oauth_service)
+
+        assert asyncio.run(manager.refresh_due([due, fresh])) == 1
+        assert oauth_service.issued == [("token", "A")]
+        assert oauth_service.refreshing_during_issue == [True]
+        assert "A" not in KrAuthInfo._refreshing
+        assert KrInvTokenManager.get_access_token(due, NOW) == "new-A"
+
+    def test_failed_refresh_is_retried_later(self):
+        """Test a failed refresh keeps the old token and waits for the retry delay"""
+        auth = _auth("A", "2026-01-05 08:30:00")
+        KrInvTokenManager.cache_token(auth)
+        KrInvTokenManager.cache_approval_key(auth, NOW)
+        manager = self._manager(FakeOauthService(fail=True))
+
+        assert asyncio.run(manager.refresh_due([auth])) == 0
+        assert KrInvTokenManager.get_access_token(auth, NOW) == "token-A"
+        assert manager.token_refresh_at(auth) == NOW + 60
+        assert manager.seconds_until_next_refresh([auth]) == 60
+
+    def test_missing_approval_key_is_issued(self):
+        """Test keys without a cached approval key get one"""
+        auth = _auth("A", "2026-01-05 20:00:00")
+        KrInvTokenManager.cache_token(auth)
+        oauth_service = FakeOauthService()
+
+        assert asyncio.run(self._manager(oauth_service).refresh_due([auth])) == 1
+        assert oauth_service.issued == [("approval", "A")]
+
+    def test_oauth_service_uses_cached_token(self):
+        """Test the request path returns a cached token without calling the API"""
+        auth = _auth("A", "2999-12-31 23:59:59")
+        KrInvTokenManager.cache_token(auth)
+        assert asyncio.run(KrInvOauthService().api_oauth2_token(auth)) == "token-A"
+
+    def test_refresh_through_oauth_service(self, test_db, monkeypatch):
+        """Test a due token is refreshed and saved through the real OAuth service"""
+        test_db.add(_auth("A", "2026-01-05 08:30:00"))
+        test_db.commit()
+        endpoint = FakeTokenEndpoint()
+        monkeypatch.setattr(WebClientUtil, "post_request", staticmethod(endpoint.post_request))
+        oauth_service = _session_scoped_oauth_service(test_db)
+
+        async def run():
+            auth = (await oauth_service.sa_db_service.find_all_auth_info_with_account())[0]
+            KrInvTokenManager.cache_token(auth)
+            KrInvTokenManager.cache_approval_key(auth, NOW)
+            return auth, await self._manager(oauth_service).refresh_due([auth])
+
+        auth, refreshed = asyncio.run(run())
+
+        assert refreshed == 1 and endpoint.calls == 1
+        assert KrInvTokenManager.get_access_token(auth, NOW) == "issued-1"
+        test_db.expire_all()
+        assert test_db.query(AuthInfo).one().access_token == "issued-1"
+
+    def test_concurrent_inline_issues_share_one_request(self, test_db, monkeypatch):
+        """Test concurrent callers without a cached token trigger a single token request"""
+        test_db.add(_auth("A", ""))
+        test_db.commit()
+        endpoint = FakeTokenEndpoint()
+        monkeypatch.setattr(WebClientUtil, "post_request", staticmethod(endpoint.post_request))
+        oauth_service = _session_scoped_oauth_service(test_db)
+
+        async def run():
+            auth = (await oauth_service.sa_db_service.find_all_auth_info_with_account())[0]
+            return await asyncio.gather(*[oauth_service.api_oauth2_token(auth) for _ in range(5)])
+
+        tokens = asyncio.run(run())
+
+        assert endpoint.calls == 1
+        assert tokens == ["issued-1"] * 5
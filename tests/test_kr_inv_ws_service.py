@@ -0,0 +1,71 @@
+"""
+Test Korea Investment WebSocket Service
+
+Tests for the real-time websocket client against a local websocket stand-in.
+"""
+
+import asyncio
+import json
+import pytest
+from app.models import AuthInfo
+from app.services.krinvest.kr_inv_ws_service import KrInvWsService
+from app.services.krinvest.kr_inv_tick_parser import H0STCNT0_FIELDS
+
+websockets = pytest.importorskip("websockets")
+
+def _tick(stock_code: str, price: str) -> str:
+    values = ["0"] * len(H0STCNT0_FIELDS)
+    values[0] = stock_code
+    values[2] = price
+    return "^".join(values)
+
+def _auth(app_key: str) -> AuthInfo:
+    return AuthInfo(app_key=app_key, app_secret="secret", approval_key=f"approval-{app_key}",
+                    account_number="1234567801", mode="R")
+
+class TestKrInvWsService:
+    """Test KrInvWsService against a local websocket server"""
+
+    def test_subscribe_parse_and_reconnect(self):
+        """Test multi-record frames are published and subscriptions survive reconnects"""
+        async def run():
+            connections = []
+            subscribe_requests = []
+
+            async def handler(websocket, *args):
+                connections.append(websocket)
+                async for message in websocket:
+                    request = json.loads(message)
+                    subscribe_requests.append(request["body"]["input"]["tr_key"])
+                    await websocket.send(json.dumps({"header": {"tr_id": "PINGPONG"}}))
+                    frame = f"0|H0STCNT0|002|{_tick('005930', '70000')}^{_tick('005930', '70100')}"
+                    await websocket.send(frame)
+                    if len(connections) == 1:
+                        await websocket.close()  # force the client to reconnect
+
+            server = await websockets.serve(handler, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+
+            service = KrInvWsService(ws_url=f"ws://127.0.0.1:{port}", max_subscriptions=1)
+            queue = service.add_queue("H0STCNT0")
+            await service.start([_auth("A"), _auth("B")])
+            await service.subscribe("H0STCNT0", "005930")
+            await service.subscribe("H0STCNT0", "000660")
+            with pytest.raises(Exception):
+                await service.subscribe("H0STCNT0", "035720")
+
+            records = await asyncio.wait_for(queue.get(), timeout=5)
+            while len(connections) < 3:
+                await asyncio.sleep(0.05)
+            await asyncio.wait_for(queue.get(), timeout=5)
+
+            await service.stop()
+            server.close()
+            await server.wait_closed()
+            return records, subscribe_requests
+
+        records, subscribe_requests = asyncio.run(run())
+        assert records["price"].tolist() == [70000, 70100]
+        assert records[0]["stock_code"] == b"005930"
+        assert sorted(set(subscribe_requests)) == ["000660", "005930"]
+        assert subscribe_requests.count("005930") >= 2  # resubscribed after reconnect
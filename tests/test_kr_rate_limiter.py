@@ -0,0 +1,54 @@
+"""
+Test Korea Investment Rate Limiter
+
+Tests for token bucket rate limiting of Korea Investment API calls.
+"""
+
+import asyncio
+import time
+import pytest
+from app.models import AuthInfo
+from app.common.kr_rate_limiter import KrRateLimiter, TokenBucket
+
+class TestTokenBucket:
+    """Test TokenBucket functions"""
+
+    def test_acquire_waits_for_refill(self):
+        """Test acquire queues callers instead of failing"""
+        async def run():
+            bucket = TokenBucket(rate=20.0, capacity=1.0)
+            start = time.monotonic()
+            await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        assert elapsed >= 0.18  # 4 tokens refilled at 20/s
+
+    def test_invalid_rate(self):
+        """Test non-positive rate is rejected"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+class TestKrRateLimiter:
+    """Test KrRateLimiter functions"""
+
+    def test_get_category(self):
+        """Test TR ID categorization"""
+        assert KrRateLimiter.get_category("FHKST01010100") == KrRateLimiter.QUOTATION
+        assert KrRateLimiter.get_category("TTTC0802U") == KrRateLimiter.TRADING
+        assert KrRateLimiter.is_order("VTTC0801U") == True
+        assert KrRateLimiter.is_order("TTTC8434R") == False
+
+    def test_budgets_are_per_app_key(self):
+        """Test each app key has its own budget"""
+        KrRateLimiter.reset()
+        auth_a = AuthInfo(app_key="A", app_secret="s", mode="R")
+        auth_b = AuthInfo(app_key="B", app_secret="s", mode="R")
+
+        async def run():
+            await KrRateLimiter.acquire(auth_a, "FHKST01010100")
+
+        asyncio.run(run())
+        assert (KrRateLimiter.available(auth_a, KrRateLimiter.QUOTATION)
+                < KrRateLimiter.available(auth_b, KrRateLimiter.QUOTATION))
+        KrRateLimiter.reset()
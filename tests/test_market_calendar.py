@@ -0,0 +1,78 @@
+"""
+Test Market Calendar
+
+Tests for session phases, holidays, special sessions and transitions.
+"""
+
+import json
+from datetime import date, datetime, timezone
+from app.common.market_calendar import MarketCalendar
+from app.constants.trade_phase import TradePhase
+
+class TestMarketCalendar:
+    """Test MarketCalendar functions"""
+
+    def test_krx_phases(self):
+        """Test phase boundaries of a regular KRX day"""
+        calendar = MarketCalendar("KRX")
+        assert calendar.phase(datetime(2025, 6, 2, 8, 59)) == TradePhase.WAIT
+        assert calendar.phase(datetime(2025, 6, 2, 9, 0)) == TradePhase.PRE_OPEN_SELL
+        assert calendar.phase(datetime(2025, 6, 2, 10, 0)) == TradePhase.BUY
+        assert calendar.phase(datetime(2025, 6, 2, 15, 16)) == TradePhase.LIQUIDATE
+        assert calendar.phase(datetime(2025, 6, 2, 15, 21)) == TradePhase.EXIT
+        assert calendar.is_trading_hours(datetime(2025, 6, 2, 15, 29))
+        assert not calendar.is_trading_hours(datetime(2025, 6, 2, 15, 30))
+
+    def test_holidays_and_weekends(self):
+        """Test closed days from the holiday file"""
+        calendar = MarketCalendar("KRX")
+        assert not calendar.is_business_day(date(2025, 6, 3))   # election day
+        assert not calendar.is_business_day(date(2025, 6, 7))   # Saturday
+        assert calendar.phase(datetime(2025, 6, 3, 10, 0)) == TradePhase.EXIT
+
+    def test_special_sessions(self):
+        """Test late open and early close days"""
+        krx = MarketCalendar("KRX")
+        assert krx.phase(datetime(2025, 11, 13, 9, 30)) == TradePhase.WAIT  # CSAT day opens 10:00
+        assert krx.phase(datetime(2025, 11, 13, 16, 0)) == TradePhase.BUY
+        us = MarketCalendar("US")
+        assert us.phase(datetime(2025, 11, 28, 12, 46)) == TradePhase.LIQUIDATE  # closes 13:00
+        assert us.phase(datetime(2025, 11, 28, 14, 0)) == TradePhase.EXIT
+
+    def test_timezone_conversion(self):
+        """Test aware times are converted to the exchange timezone"""
+        us = MarketCalendar("US")
+        # 2025-06-02 14:00 UTC is 10:00 in New York (EDT)
+        assert us.phase(datetime(2025, 6, 2, 14, 0, tzinfo=timezone.utc)) == TradePhase.BUY
+
+    def test_next_transition_skips_closed_days(self):
+        """Test next transition after the close is the next session open"""
+        calendar = MarketCalendar("KRX")
+        at, phase = calendar.next_transition(datetime(2025, 6, 2, 10, 0))
+        assert (at.hour, at.minute, phase) == (15, 15, TradePhase.LIQUIDATE)
+        # After the close the next transition is the next open (2025-06-03 is a holiday)
+        at, phase = calendar.next_transition(datetime(2025, 6, 2, 16, 0))
+        assert (at.date(), at.hour, phase) == (date(2025, 6, 4), 9, TradePhase.PRE_OPEN_SELL)
+        assert calendar.seconds_until_next_phase(datetime(2025, 6, 2, 15, 14)) == 60
+
+    def test_holidays_file(self, tmp_path):
+        """Test loading a custom holiday file"""
+        path = tmp_path / "holidays.json"
+        path.write_text(json.dumps({"KRX": {"holidays": ["20250602"]}}))
+        calendar = MarketCalendar("KRX", str(path))
+        assert not calendar.is_business_day(date(2025, 6, 2))
+        assert calendar.is_business_day(date(2025, 6, 3))
+
+    def test_dates_past_holidays_file_are_reported(self, tmp_path, caplog):
+        """Test a date after the last listed year is logged once per year"""
+        path = tmp_path / "holidays.json"
+        path.write_text(json.dumps({"KRX": {"holidays": ["20250602"]}}))
+        calendar = MarketCalendar("KRX", str(path))
+        assert calendar.last_year == 2025
+        caplog.clear()
+        calendar.session(date(2025, 12, 30))
+        assert not caplog.records
+        calendar.session(date(2027, 1, 4))
+        calendar.is_business_day(date(2027, 1, 5))
+        assert [record.levelname for record in caplog.records] == ["ERROR"]
+        assert "2027" in caplog.records[0].getMessage()
@@ -0,0 +1,62 @@
+"""
+Test Quote Cache
+
+Tests for TTL/LRU quote caching and request coalescing.
+"""
+
+import asyncio
+import time
+from app.common.quote_cache import QuoteCache
+
+class TestQuoteCache:
+    """Test QuoteCache functions"""
+
+    def test_concurrent_callers_share_one_load(self):
+        """Test single-flight coalescing of concurrent loads"""
+        cache = QuoteCache(ttl_ms=1000)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"price": 100}
+
+        async def run():
+            return await asyncio.gather(*(cache.get_or_load("005930", loader) for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(result == {"price": 100} for result in results)
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["coalesced"] == 4
+
+        asyncio.run(cache.get_or_load("005930", loader))
+        assert cache.stats()["hits"] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after TTL"""
+        cache = QuoteCache(ttl_ms=10)
+        cache.put("005930", 1)
+        assert cache.get("005930") == 1
+        time.sleep(0.02)
+        assert cache.get("005930") is None
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted"""
+        cache = QuoteCache(ttl_ms=1000, max_size=2)
+        cache.put("A", 1)
+        cache.put("B", 2)
+        cache.get("A")
+        cache.put("C", 3)
+        assert cache.get("A") == 1
+        assert cache.get("B") is None
+
+    def test_uncacheable_result_is_not_stored(self):
+        """Test error responses are not cached"""
+        cache = QuoteCache(ttl_ms=1000)
+
+        async def loader():
+            return {"error": "API request failed"}
+
+        asyncio.run(cache.get_or_load("A", loader, cacheable=lambda r: "error" not in r))
+        assert cache.get("A") is None
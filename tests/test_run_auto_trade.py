@@ -0,0 +1,113 @@
+"""
+Test Run Auto Trade
+
+Tests for the phase state machine and concurrent passes of the auto trade loop.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from app.daemon.run_auto_trade import RunAutoTrade
+from app.models import OrderHistory
+from app.services.krinvest.kr_inv_order_pipeline import KrInvOrderPipeline
+
+class FakeInqService:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+
+    async def inquire_prices(self, stock_codes, concurrency=None):
+        self.calls.append(list(stock_codes))
+        await asyncio.sleep(0)
+        prices = [self.prices[c] for c in stock_codes]
+        return {"stock_code": list(stock_codes), "price": prices, "open_price": prices, "errors": {}}
+
+class FakeOrdService:
+    def __init__(self, holdings):
+        self.holdings = dict(holdings)
+        self.orders = []
+
+    async def api_inquire_balance(self, auth_info_entity):
+        return {"output1": [{"pdno": c, "hldg_qty": str(q)} for c, q in self.holdings.items()],
+                "output2": [{"dnca_tot_amt": "1000000"}]}
+
+    async def _api_order_cash(self, auth_info_entity, order_id, stock_code, stock_qty, stock_price, ord_dvsn):
+        if order_id == "0802U":
+            self.orders.append(("BUY", stock_code, int(stock_qty)))
+            self.holdings[stock_code] = self.holdings.get(stock_code, 0) + int(stock_qty)
+        else:
+            self.orders.append(("SELL", stock_code, int(stock_qty)))
+            self.holdings.pop(stock_code, None)
+        return {"rt_cd": "0", "output": {"ODNO": f"{len(self.orders):010d}"}}
+
+class FakeBuyService:
+    def __init__(self):
+        self.open_prices = {}
+
+    async def update_open_prices(self, tr_date, open_prices):
+        self.open_prices.update(open_prices)
+        return len(open_prices)
+
+    async def check_buy_condition(self, stock_code, tr_date, tr_time, current_price=None):
+        return {"buy_recommended": current_price > 100, "target_price": 100}
+
+class FakeSellService:
+    async def check_sell_condition(self, stock_code, tr_date, tr_time):
+        return {"sell_recommended": False}
+
+class TestRunAutoTrade:
+    """Test RunAutoTrade functions"""
+
+    def test_session_runs_through_phases(self, test_db):
+        """Test pre-open sell, capped concurrent buys, liquidation and exit"""
+        clock = iter([
+            datetime(2024, 1, 2, 8, 30),   # WAIT: sleep until the open
+            datetime(2024, 1, 2, 9, 1),    # PRE_OPEN_SELL: sell leftover
+            datetime(2024, 1, 2, 9, 2),    # PRE_OPEN_SELL: sold out, sleep until the buy window
+            datetime(2024, 1, 2, 10, 0),   # BUY
+            datetime(2024, 1, 2, 10, 0),
+            datetime(2024, 1, 2, 10, 1),   # BUY: target count reached
+            datetime(2024, 1, 2, 10, 1),
+            datetime(2024, 1, 2, 15, 16),  # LIQUIDATE
+            datetime(2024, 1, 2, 15, 21),  # EXIT
+        ])
+        prices = {"005930": 200, "000660": 150, "035720": 120, "069500": 90}
+        inq, ord_ = FakeInqService(prices), FakeOrdService({"005380": 5})
+        sleeps = []
+
+        async def sleep(seconds):
+            sleeps.append(seconds)
+
+        buy_service = FakeBuyService()
+
+        async def run():
+            pipeline = KrInvOrderPipeline(ord_, test_db)
+            runner = RunAutoTrade(inq, ord_, buy_service, FakeSellService(), list(prices), pipeline,
+                                  auth_info_entity=SimpleNamespace(account_number="1111111101"),
+                                  target_buy_count=2, buy_percent=0.5,
+                                  interval=0, now=lambda: next(clock), sleep=sleep)
+            result = await runner.run()
+            await pipeline.stop()
+            return result
+
+        result = asyncio.run(run())
+
+        assert result["phase"] == "EXIT"
+        assert ord_.orders[0] == ("SELL", "005380", 5)
+        buys = [order for order in ord_.orders if order[0] == "BUY"]
+        assert len(buys) == 2
+        assert all(order[1] in ("005930", "000660", "035720") for order in buys)
+        # One batched quote call per pass, not one per symbol
+        assert len(inq.calls) == 2 and len(inq.calls[0]) == 4
+        # Quoted opens feed the breakout targets
+        assert buy_service.open_prices == prices
+        assert ord_.holdings == {}
+        assert result["sold_out"] is True
+        # Idle phases sleep straight to the next transition
+        assert sleeps[0] == 30 * 60
+        assert sleeps[2] == 3 * 60
+        # Orders went through the pipeline under keys of the trade date, stock and side
+        keys = {row.order_id for row in test_db.query(OrderHistory).all()}
+        assert "20240102-005380-SELL-PRE_OPEN_SELL" in keys
+        assert {f"20240102-{order[1]}-BUY" for order in buys} <= keys
+        assert len(keys) == len(ord_.orders)
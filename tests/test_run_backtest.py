@@ -0,0 +1,101 @@
+"""
+Test Run Backtest
+
+Tests for the event-driven backtest: replay order, session phases,
+simulated fills and the portfolio ledger.
+"""
+
+import asyncio
+from datetime import datetime
+import numpy as np
+import pytest
+from app.daemon.run_backtest import BacktestLedger, RunBacktest
+from app.daemon.run_main_stock_analysis import RunMainStockAnalysis
+from app.services.sa.sa_db_service import SaDbService
+
+class FakeBuyService:
+    def __init__(self):
+        self.calls = []
+
+    async def check_buy_condition(self, stock_code, tr_date, tr_time, current_price=None):
+        self.calls.append((stock_code, tr_date, tr_time))
+        return {"buy_recommended": current_price > 100, "target_price": 100}
+
+class FakeSellService:
+    async def check_sell_condition(self, stock_code, tr_date, tr_time):
+        return {"sell_recommended": False}
+
+def _bars(times, closes):
+    return {"date_time": np.array(times, dtype="datetime64[ms]"),
+            "close_price": np.array(closes, dtype=np.float64)}
+
+class TestRunBacktest:
+    """Test RunBacktest functions"""
+
+    def test_replays_session_phases(self):
+        """Test capped buys in the buy window, liquidation before the close and the equity curve"""
+        day1 = ["2024-01-02T09:01", "2024-01-02T10:00", "2024-01-02T15:16"]
+        day2 = ["2024-01-03T09:01", "2024-01-03T10:00"]
+        bars = {
+            "005930": _bars(day1 + day2, [190, 200, 220, 230, 240]),
+            "000660": _bars(day1, [140, 150, 140]),
+            "069500": _bars(day1, [80, 90, 95]),
+            "035720": _bars(day1, [100, 120, 130]),
+        }
+        buy_service = FakeBuyService()
+        ledger = BacktestLedger(1000, commission_rate=0, sell_tax_rate=0, slippage_bps=0)
+        runner = RunBacktest(buy_service, FakeSellService(), bars, target_buy_count=2,
+                             buy_percent=0.5, ledger=ledger)
+
+        summary = asyncio.run(runner.run())
+
+        # Bars of one minute are replayed in symbol order; the third candidate is never checked
+        assert [(fill["side"], fill["stock_code"], fill["qty"]) for fill in ledger.fills] == [
+            ("BUY", "005930", 2), ("BUY", "000660", 3), ("SELL", "005930", 2), ("SELL", "000660", 3),
+            ("BUY", "005930", 2)
+        ]
+        assert [call[0] for call in buy_service.calls] == ["005930", "000660", "005930"]
+        assert ledger.positions == {"005930": (2, 240.0)}
+        assert ledger.equity_curve == [("20240102", 1010.0), ("20240103", 1010.0)]
+        assert summary["trades"] == 2 and summary["win_rate"] == 0.5
+        assert summary["final_equity"] == pytest.approx(1010.0)
+        assert runner.clock() == datetime(2024, 1, 3, 10, 0, tzinfo=runner.market_calendar.tz)
+
+    def test_ledger_costs_and_drawdown(self):
+        """Test slippage, commission and sell tax on fills and the max drawdown"""
+        ledger = BacktestLedger(10000, commission_rate=0.001, sell_tax_rate=0.002, slippage_bps=10)
+        at = datetime(2024, 1, 2, 10, 0)
+        assert ledger.buy("005930", 100, 100.0, at) is False
+        assert ledger.buy("005930", 10, 100.0, at) is True
+        assert ledger.cash == pytest.approx(10000 - 1001 - 1.001)
+        assert ledger.sell("005930", 100.0, at) is True
+        assert ledger.fills[-1]["pnl"] == pytest.approx(999 - 2.997 - 1002.001)
+        ledger.equity_curve = [("20240102", 9000.0), ("20240103", 11000.0), ("20240104", 9900.0)]
+        assert ledger.summary()["max_drawdown"] == pytest.approx(0.1)
+
+    def test_bars_from_rows(self):
+        """Test row tuples become per-symbol arrays"""
+        rows = [
+            ("000660", datetime(2024, 1, 2, 9, 0), 1, 2, 0.5, 1.5, 10),
+            ("005930", datetime(2024, 1, 2, 9, 0), 3, 4, 2.5, 3.5, 20),
+            ("005930", datetime(2024, 1, 2, 9, 1), 5, 6, 4.5, 5.5, None),
+        ]
+        bars = RunBacktest.bars_from_rows(rows)
+        assert list(bars) == ["000660", "005930"]
+        assert bars["005930"]["close_price"].tolist() == [3.5, 5.5]
+        assert bars["005930"]["date_time"][1] == np.datetime64("2024-01-02T09:01")
+        assert RunBacktest.bars_from_rows([]) == {}
+
+    def test_check_test_uses_stored_bar_for_past_dates(self, test_db):
+        """Test the buy / sell check tests price a past date from minute data, not the live API"""
+        sa_db_service = SaDbService(test_db)
+        asyncio.run(sa_db_service.save_all_minute_data_list([
+            {"stock_code": "005930", "date_time": datetime(2024, 1, 2, 9, minute), "open_price": 100,
+             "high_price": 100, "low_price": 100, "close_price": 100 + minute, "volume": 1}
+            for minute in range(5)
+        ]))
+        runner = RunMainStockAnalysis(None, None, sa_db_service, None, None, None, None, None)
+
+        price_info = asyncio.run(runner._get_price_info("005930", "20240102", "090230"))
+
+        assert price_info == {"output": {"stck_prpr": "102"}, "source": "MINUTE_DATA"}
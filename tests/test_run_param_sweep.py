@@ -0,0 +1,93 @@
+"""
+Test Run Param Sweep
+
+Tests for the process pool parameter sweep: search spaces, shared memory
+arrays and checkpoint / resume.
+"""
+
+import json
+import numpy as np
+import pytest
+from app.daemon.run_param_sweep import RunParamSweep, SharedArrays, breakout_strategy
+
+def _day_bars(symbols: int = 6, days: int = 60):
+    rng = np.random.default_rng(3)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, days)), axis=1))
+    open_price = close * np.exp(rng.normal(0, 0.01, (symbols, days)))
+    return {"open_price": open_price,
+            "high_price": np.maximum(open_price, close) * (1 + rng.uniform(0, 0.03, (symbols, days))),
+            "low_price": np.minimum(open_price, close) * (1 - rng.uniform(0, 0.03, (symbols, days))),
+            "close_price": close}
+
+SPACE = {"k": [0.3, 0.5, 0.7], "buy_percent": [0.2, 0.33], "target_buy_count": [1, 3]}
+
+class TestRunParamSweep:
+    """Test RunParamSweep functions"""
+
+    def test_search_spaces(self):
+        """Test grid combinations and reproducible random samples"""
+        grid = RunParamSweep.grid(SPACE)
+        assert len(grid) == 12
+        assert grid[0] == {"k": 0.3, "buy_percent": 0.2, "target_buy_count": 1}
+        space = {"k": (0.1, 1.0), "target_buy_count": (1, 5), "buy_percent": [0.2, 0.33]}
+        samples = RunParamSweep.random_search(space, 20, seed=7)
+        assert samples == RunParamSweep.random_search(space, 20, seed=7)
+        assert all(0.1 <= s["k"] <= 1.0 and s["target_buy_count"] in range(1, 6)
+                   and s["buy_percent"] in (0.2, 0.33) for s in samples)
+        assert all(isinstance(s["target_buy_count"], int) for s in samples)
+
+    def test_shared_arrays_round_trip(self):
+        """Test arrays are copied into shared memory blocks that are removed on close"""
+        from multiprocessing import shared_memory
+        data = _day_bars()
+        with SharedArrays(data) as shared:
+            block_name, shape, dtype = shared.descriptors["close_price"]
+            block = shared_memory.SharedMemory(name=block_name)
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+            assert np.array_equal(view, data["close_price"])
+            del view
+            block.close()
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=block_name)
+
+    def test_run_matches_direct_evaluation_and_resumes(self, tmp_path):
+        """Test pooled results equal in-process ones and a rerun only evaluates the missing sets"""
+        data = _day_bars()
+        checkpoint = str(tmp_path / "sweep.jsonl")
+        param_sets = RunParamSweep.grid(SPACE)
+        runner = RunParamSweep(breakout_strategy, data, checkpoint, max_workers=2, batch_size=3)
+
+        first = runner.run(param_sets[:5])
+        assert len(first) == 5
+        with open(checkpoint, "a", encoding="utf-8") as file:
+            file.write('{"params": {"k": 0.9')  # interrupted while writing
+
+        results = runner.run(param_sets)
+
+        assert [result["params"] for result in results] == param_sets
+        assert results[:5] == first
+        for result in results:
+            assert result["sharpe"] == pytest.approx(breakout_strategy(data, result["params"])["sharpe"])
+        with open(checkpoint, "r", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        assert json.loads(lines[0]) == {"fingerprint": runner.fingerprint()}
+        assert len(lines) == 13
+        assert json.loads(lines[-1])["params"] in param_sets[5:]
+        assert RunParamSweep.best(results)["sharpe"] == max(result["sharpe"] for result in results)
+
+    def test_checkpoint_of_other_data_is_refused(self, tmp_path):
+        """Test a checkpoint written for other data or another strategy is not reused"""
+        data = _day_bars()
+        checkpoint = str(tmp_path / "sweep.jsonl")
+        param_sets = RunParamSweep.grid(SPACE)[:2]
+        RunParamSweep(breakout_strategy, data, checkpoint, max_workers=1).run(param_sets)
+
+        other_data = dict(data, close_price=data["close_price"] * 1.01)
+        with pytest.raises(ValueError):
+            RunParamSweep(breakout_strategy, other_data, checkpoint, max_workers=1).run(param_sets)
+
+        def other_strategy(data, params):
+            return {"sharpe": 0.0}
+
+        with pytest.raises(ValueError):
+            RunParamSweep(other_strategy, data, checkpoint, max_workers=1).run(param_sets)
@@ -0,0 +1,69 @@
+"""
+Test SA Archive Service
+
+Tests for the Parquet export and the memory-mapped Arrow IPC reader.
+"""
+
+import asyncio
+from datetime import date, datetime
+import numpy as np
+from app.services.sa.sa_db_service import SaDbService
+from app.services.sa.sa_archive_service import SaArchiveService
+
+def _bars():
+    return [
+        {"stock_code": code, "date_time": datetime(2024, 1, day, 9, minute),
+         "open_price": base + minute, "high_price": base + minute + 1, "low_price": base + minute - 1,
+         "close_price": base + minute + 0.5, "volume": 10 * minute}
+        for code, base in (("005930", 100.0), ("000660", 50.0))
+        for day in (2, 3)
+        for minute in range(3)
+        if not (code == "000660" and day == 3 and minute == 2)
+    ]
+
+class TestSaArchiveService:
+    """Test SaArchiveService functions"""
+
+    def test_export_and_memory_mapped_load(self, test_db, tmp_path):
+        """Test minute bars round trip DB -> Parquet -> Arrow IPC -> NumPy views"""
+        asyncio.run(SaDbService(test_db).save_all_minute_data_list(_bars()))
+        service = SaArchiveService(test_db, root=str(tmp_path))
+
+        assert asyncio.run(service.export_minute_data(date(2024, 1, 1), date(2024, 1, 5))) == 11
+        assert sorted(p.name for p in (tmp_path / "minute").iterdir()) == ["tr_date=20240102", "tr_date=20240103"]
+        assert service.build_minute_ipc(2024, symbol_batch=1) == 2
+
+        bars = service.load_minute_bars(["005930", "000660", "999999"], 2024)
+        assert sorted(bars) == ["000660", "005930"]
+        samsung = bars["005930"]
+        assert samsung["date_time"].dtype == np.dtype("datetime64[ms]")
+        assert samsung["date_time"][0] == np.datetime64("2024-01-02T09:00:00")
+        assert samsung["close_price"].tolist() == [100.5, 101.5, 102.5] * 2
+        # Views on the mapped file, not copies
+        assert not samsung["close_price"].flags.owndata
+        assert not samsung["close_price"].flags.writeable
+
+        codes, times, matrices = service.load_minute_matrix(["005930", "000660"], 2024, ["close_price"])
+        assert codes == ["005930", "000660"]
+        assert len(times) == 6
+        # Missing 000660 bar at 2024-01-03 09:02 is forward filled
+        assert matrices["close_price"][1, -1] == 51.5
+
+    def test_export_day_info(self, test_db, tmp_path):
+        """Test day info round trip to symbol x date matrices"""
+        asyncio.run(SaDbService(test_db).save_all_day_info_list([
+            {"stock_code": "005930", "tr_date": "20240102", "open_price": 1.0, "high_price": 2.0,
+             "low_price": 0.5, "close_price": 1.5, "volume": 100},
+            {"stock_code": "005930", "tr_date": "20240103", "open_price": 1.5, "high_price": 2.5,
+             "low_price": 1.0, "close_price": 2.0, "volume": None},
+            {"stock_code": "000660", "tr_date": "20240103", "open_price": 3.0, "high_price": 4.0,
+             "low_price": 2.0, "close_price": 3.5, "volume": 50},
+        ]))
+        service = SaArchiveService(test_db, root=str(tmp_path))
+
+        assert asyncio.run(service.export_day_info(2024)) == 3
+        codes, tr_dates, matrices = service.load_day_matrix(None, 2024, 2024, ["close_price"], fill_forward=False)
+        assert codes == ["000660", "005930"]
+        assert tr_dates.tolist() == ["20240102", "20240103"]
+        assert np.isnan(matrices["close_price"][0, 0])
+        assert matrices["close_price"][1].tolist() == [1.5, 2.0]
@@ -0,0 +1,114 @@
+"""
+Test SA Breakout Service
+
+Tests for universe-wide volatility breakout targets.
+"""
+
+import asyncio
+import pytest
+from app.models import DayStatEntity, StockList
+from app.services.sa.sa_breakout_service import SaBreakoutService
+from app.services.sa.sa_check_to_buy_service import SaCheckToBuyService
+
+def _add_day(db, stock_code, tr_date, open_price, high_price, low_price):
+    db.add(DayStatEntity(stock_code=stock_code, tr_date=tr_date, open_price=open_price,
+                         high_price=high_price, low_price=low_price, close_price=open_price, volume=1))
+
+class TestSaBreakoutService:
+    """Test SaBreakoutService functions"""
+
+    def test_prepare_targets_for_universe(self, test_db):
+        """Test target = today open + previous range x k"""
+        _add_day(test_db, "005930", "20240102", 100, 110, 90)
+        _add_day(test_db, "005930", "20240103", 105, 120, 100)
+        _add_day(test_db, "000660", "20240102", 50, 60, 40)
+        test_db.commit()
+
+        service = SaBreakoutService(test_db)
+        assert asyncio.run(service.prepare("20240103", ["005930", "000660"], k=0.5)) == 2
+
+        # 005930 has today's open stored: 105 + (110 - 90) x 0.5
+        assert service.get_target_price("005930") == 115
+        # 000660 waits for its open price
+        assert service.get_target_price("000660") is None
+        assert service.update_open_prices({"000660": 52}) == 1
+        assert service.get_target_price("000660") == 62
+        assert service.find_breakouts({"005930": 116, "000660": 61}) == ["005930"]
+
+    def test_prepare_whole_universe(self, test_db):
+        """Test prepare without stock codes reads the stock list"""
+        for stock_code in ("005930", "000660"):
+            test_db.add(StockList(stock_code=stock_code, stock_name=stock_code, market="KOSPI"))
+            _add_day(test_db, stock_code, "20240102", 100, 110, 90)
+        test_db.commit()
+
+        service = SaBreakoutService(test_db)
+        assert asyncio.run(service.prepare("20240103", k=0.5)) == 2
+        assert service.update_open_prices({"005930": 100, "000660": 100}) == 2
+        assert service.get_target_price("000660") == 110
+
+    def test_check_buy_condition_uses_targets(self, test_db):
+        """Test buy check prepares targets once and compares the price"""
+        test_db.add(StockList(stock_code="005930", stock_name="Samsung", market="KOSPI"))
+        _add_day(test_db, "005930", "20240102", 100, 110, 90)
+        _add_day(test_db, "005930", "20240103", 105, 120, 100)
+        test_db.commit()
+
+        service = SaCheckToBuyService(test_db, SaBreakoutService(test_db))
+        result = asyncio.run(service.check_buy_condition("005930", "20240103", "090100", 116))
+        assert result["buy_recommended"] is True
+        assert result["target_price"] == 115
+        assert "VOLATILITY_BREAKOUT" in result["signals"]
+        result = asyncio.run(service.check_buy_condition("005930", "20240103", "090200", 114))
+        assert result["buy_recommended"] is False
+
+    def test_concurrent_checks_prepare_once(self, test_db):
+        """Test concurrent first checks of a trade date share one prepare and use quoted opens"""
+        test_db.add(StockList(stock_code="005930", stock_name="Samsung", market="KOSPI"))
+        _add_day(test_db, "005930", "20240102", 100, 110, 90)
+        test_db.commit()
+
+        service = SaCheckToBuyService(test_db, SaBreakoutService(test_db))
+        prepare = service.sa_breakout_service.prepare
+        calls = []
+
+        async def counted_prepare(tr_date, *args, **kwargs):
+            calls.append(tr_date)
+            await asyncio.sleep(0.01)
+            return await prepare(tr_date, *args, **kwargs)
+
+        service.sa_breakout_service.prepare = counted_prepare
+
+        async def run():
+            before_open = await asyncio.gather(*[
+                service.check_buy_condition("005930", "20240103", "090100", 130) for _ in range(5)
+            ])
+            # No day info of the trade date yet: the target needs the quoted open
+            await service.update_open_prices("20240103", {"005930": 105})
+            return before_open, await service.check_buy_condition("005930", "20240103", "090200", 116)
+
+        before_open, after_open = asyncio.run(run())
+
+        assert calls == ["20240103"]
+        assert all(result["target_price"] is None for result in before_open)
+        assert after_open["target_price"] == 115 and after_open["buy_recommended"] is True
+
+    def test_backtest_targets_stay_apart_from_live(self, test_db):
+        """Test a backtest instance prepares its own dates and refuses the live instance"""
+        from app.daemon.run_backtest import RunBacktest
+        _add_day(test_db, "005930", "20240102", 100, 110, 90)
+        _add_day(test_db, "005930", "20240103", 105, 120, 100)
+        test_db.commit()
+
+        live = SaBreakoutService.get()
+        live.update_open_prices({"005930": 1})
+        live_targets = dict(live._targets)
+        backtest = SaBreakoutService(test_db)
+        asyncio.run(backtest.prepare("20240103", ["005930"], k=0.5))
+
+        assert backtest.get_target_price("005930") == 115
+        assert live._targets == live_targets and live.tr_date is None
+        assert SaCheckToBuyService(test_db).sa_breakout_service is live
+        with pytest.raises(ValueError):
+            RunBacktest(SaCheckToBuyService(test_db), None, {})
+        RunBacktest(SaCheckToBuyService(test_db, backtest), None, {})
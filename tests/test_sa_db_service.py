@@ -0,0 +1,52 @@
+"""
+Test SA DB Service
+
+Tests for the bulk upsert save paths (SQLite ON CONFLICT).
+"""
+
+import asyncio
+from datetime import datetime
+from app.models import MinuteData, StockList
+from app.services.sa.sa_db_service import SaDbService
+
+class TestSaDbServiceBulkSave:
+    """Test SaDbService bulk save functions"""
+
+    def test_save_all_minute_data_list_upserts_in_batches(self, test_db):
+        """Test minute bars are inserted in chunks and updated on conflict"""
+        service = SaDbService(test_db)
+        rows = [
+            {"stock_code": "005930", "date_time": datetime(2024, 1, 2, 9, minute),
+             "open_price": 100.0, "high_price": 101.0, "low_price": 99.0,
+             "close_price": 100.5, "volume": 10}
+            for minute in range(5)
+        ]
+        assert asyncio.run(service.save_all_minute_data_list(rows, batch_size=2)) == 5
+
+        updated = MinuteData(stock_code="005930", date_time=datetime(2024, 1, 2, 9, 0),
+                             open_price=100.0, high_price=102.0, low_price=99.0,
+                             close_price=102.0, volume=20)
+        assert asyncio.run(service.save_all_minute_data_list([updated])) == 1
+
+        saved = test_db.query(MinuteData).order_by(MinuteData.date_time).all()
+        assert len(saved) == 5
+        assert saved[0].close_price == 102.0
+        assert saved[0].volume == 20
+
+    def test_save_all_stock_list_upserts_by_stock_code(self, test_db):
+        """Test stock list rows are updated by stock code"""
+        service = SaDbService(test_db)
+        asyncio.run(service.save_all_stock_list([
+            StockList(stock_code="005930", stock_name="Samsung", market="KOSPI")
+        ]))
+        asyncio.run(service.save_all_stock_list([
+            {"stock_code": "005930", "stock_name": "Samsung Electronics", "market": "KOSPI"},
+            {"stock_code": "000660", "stock_name": "SK hynix", "market": "KOSPI"}
+        ]))
+
+        saved = {s.stock_code: s.stock_name for s in test_db.query(StockList).all()}
+        assert saved == {"005930": "Samsung Electronics", "000660": "SK hynix"}
+
+    def test_save_empty_list(self, test_db):
+        """Test saving nothing returns 0"""
+        assert asyncio.run(SaDbService(test_db).save_all_minute_data_list([])) == 0
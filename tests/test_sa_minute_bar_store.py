@@ -0,0 +1,115 @@
+"""
+Test SA Minute Bar Store
+
+Tests for the columnar minute bars: late bars kept sorted, duplicated
+minutes replaced, time slicing, flush retry and loading from minute_data.
+"""
+
+import asyncio
+from datetime import datetime
+import numpy as np
+import pytest
+from app.services.sa.sa_minute_bar_store import MinuteBarSeries, SaMinuteBarStore, to_datetime64
+
+def _minute(minute: int) -> np.datetime64:
+    return to_datetime64(f"20260105 09{minute:02d}00")
+
+class FailingDbService:
+    """save_all_minute_data_list stand-in failing the first calls"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.saved = []
+
+    async def save_all_minute_data_list(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.saved.extend(rows)
+        return len(rows)
+
+class TestMinuteBarSeries:
+    """Test MinuteBarSeries functions"""
+
+    def test_late_bar_inserted_in_order(self):
+        """Test a bar older than the last one is shifted into place, past the initial capacity"""
+        series = MinuteBarSeries(capacity=2)
+        for minute in (0, 1, 3, 4):
+            series.append(_minute(minute), minute, minute, minute, minute, minute)
+        series.append(_minute(2), 2, 2, 2, 2, 2)
+
+        bars = series.slice()
+        assert len(series) == 5
+        assert list(bars["date_time"]) == [_minute(minute) for minute in range(5)]
+        assert list(bars["close_price"]) == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert list(bars["volume"]) == [0, 1, 2, 3, 4]
+
+    def test_duplicate_minute_replaced(self):
+        """Test a bar for a stored minute replaces it, by append and by extend"""
+        series = MinuteBarSeries()
+        series.append(_minute(0), 1, 1, 1, 1, 10)
+        series.append(_minute(1), 2, 2, 2, 2, 20)
+        series.append(_minute(0), 3, 3, 3, 3, 30)
+        series.extend(
+            np.array([_minute(1), _minute(2)]), np.array([4.0, 5.0]), np.array([4.0, 5.0]),
+            np.array([4.0, 5.0]), np.array([4.0, 5.0]), np.array([40, 50])
+        )
+
+        bars = series.slice()
+        assert list(bars["date_time"]) == [_minute(0), _minute(1), _minute(2)]
+        assert list(bars["close_price"]) == [3.0, 4.0, 5.0]
+        assert list(bars["volume"]) == [30, 40, 50]
+
+    def test_slice_inclusive(self):
+        """Test slicing keeps bars with start <= time <= end"""
+        series = MinuteBarSeries()
+        for minute in range(10):
+            series.append(_minute(minute), minute, minute, minute, minute, minute)
+
+        assert list(series.slice(_minute(3), _minute(5))["close_price"]) == [3.0, 4.0, 5.0]
+        assert list(series.slice(end=_minute(1))["close_price"]) == [0.0, 1.0]
+        assert list(series.slice(start=_minute(8))["close_price"]) == [8.0, 9.0]
+        assert len(series.slice(_minute(20))["date_time"]) == 0
+
+class TestSaMinuteBarStore:
+    """Test SaMinuteBarStore functions"""
+
+    def test_flush_retries_failed_bars(self):
+        """Test bars of a failed flush are kept, ahead of newer ones, for the next flush"""
+        store = SaMinuteBarStore(None, flush_size=100)
+        store.sa_db_service = FailingDbService(failures=1)
+        store.append("005930", "20260105 090000", 1, 1, 1, 1, 10)
+        store.append("005930", "20260105 090100", 2, 2, 2, 2, 20, persist=False)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(store.flush())
+        assert store.pending_count == 1
+        store.append("000660", "20260105 090000", 3, 3, 3, 3, 30)
+        written = asyncio.run(store.flush())
+
+        assert written == 2 and store.pending_count == 0
+        assert [(row["stock_code"], row["volume"]) for row in store.sa_db_service.saved] == \
+            [("005930", 10), ("000660", 30)]
+        assert store.sa_db_service.saved[0]["date_time"] == datetime(2026, 1, 5, 9, 0)
+
+    def test_load_round_trip(self, test_db):
+        """Test flushed bars load back into a new store split per stock"""
+        async def run():
+            store = SaMinuteBarStore(test_db)
+            for minute in (2, 0, 1):
+                store.append("005930", f"20260105 09{minute:02d}00", minute, minute + 1, minute, minute, minute)
+            store.append("000660", "20260105 090000", 7, 7, 7, 7, 70)
+            store.append("000660", "20260105 100000", 8, 8, 8, 8, 80)
+            await store.flush()
+
+            loaded = SaMinuteBarStore(test_db)
+            count = await loaded.load(["005930", "000660"], "20260105 090000", "20260105 093000")
+            return loaded, count
+
+        loaded, count = asyncio.run(run())
+
+        assert count == 4
+        assert sorted(loaded.stock_codes) == ["000660", "005930"]
+        bars = loaded.find_minute_bars_by_tr_date_and_tr_time_period("005930", "20260105", "090000", "090100")
+        assert list(bars["high_price"]) == [1.0, 2.0]
+        assert list(loaded.get_bars("000660")["volume"]) == [70]
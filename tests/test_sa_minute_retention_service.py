@@ -0,0 +1,88 @@
+"""
+Test SA Minute Retention Service
+
+Tests for the minute data rollup and retention job (SQLite, no partitions).
+"""
+
+import asyncio
+from datetime import date, datetime
+from app.models import DayStatEntity, MinuteData
+from app.services.sa.sa_db_service import SaDbService
+from app.services.sa.sa_minute_retention_service import (
+    SaMinuteRetentionService, add_months, partition_name
+)
+
+def _bar(stock_code: str, date_time: datetime, open_price: float, high_price: float,
+         low_price: float, close_price: float, volume: int):
+    return {"stock_code": stock_code, "date_time": date_time, "open_price": open_price,
+            "high_price": high_price, "low_price": low_price, "close_price": close_price,
+            "volume": volume}
+
+class TestSaMinuteRetentionService:
+    """Test SaMinuteRetentionService functions"""
+
+    def test_month_helpers(self):
+        """Test month arithmetic and partition names"""
+        assert add_months(date(2024, 11, 15), 2) == date(2025, 1, 1)
+        assert add_months(date(2024, 1, 31), -1) == date(2023, 12, 1)
+        assert partition_name(date(2024, 3, 1)) == "p202403"
+        definitions = SaMinuteRetentionService._partition_definitions(date(2024, 12, 1), date(2025, 1, 1))
+        assert definitions == (
+            "PARTITION p202412 VALUES LESS THAN ('2025-01-01 00:00:00'), "
+            "PARTITION p202501 VALUES LESS THAN ('2025-02-01 00:00:00'), "
+            "PARTITION pmax VALUES LESS THAN (MAXVALUE)"
+        )
+
+    def test_run_retention_rolls_up_and_deletes(self, test_db):
+        """Test expired bars become day stats and are removed while recent bars stay"""
+        asyncio.run(SaDbService(test_db).save_all_minute_data_list([
+            _bar("005930", datetime(2024, 1, 2, 9, 0), 100, 105, 99, 104, 10),
+            _bar("005930", datetime(2024, 1, 2, 9, 1), 104, 110, 103, 108, 20),
+            _bar("005930", datetime(2024, 1, 2, 15, 29), 108, 109, 95, 97, 30),
+            _bar("000660", datetime(2024, 1, 3, 9, 0), 50, 51, 49, 50, 5),
+            _bar("005930", datetime(2024, 4, 1, 9, 0), 120, 121, 119, 120, 1),
+        ]))
+        service = SaMinuteRetentionService(test_db)
+
+        result = asyncio.run(service.run_retention(today=date(2024, 4, 1), retention_days=30))
+
+        assert result == {"cutoff": "20240302", "rolled_up": 2, "dropped_partitions": [],
+                          "deleted": 4, "added_partitions": 0}
+        day_stats = {(s.stock_code, s.tr_date): s for s in test_db.query(DayStatEntity).all()}
+        samsung = day_stats[("005930", "20240102")]
+        assert (samsung.open_price, samsung.high_price, samsung.low_price,
+                samsung.close_price, samsung.volume) == (100, 110, 95, 97, 60)
+        assert day_stats[("000660", "20240103")].volume == 5
+        remaining = test_db.query(MinuteData).all()
+        assert [bar.date_time for bar in remaining] == [datetime(2024, 4, 1, 9, 0)]
+
+    def test_run_retention_with_nothing_expired(self, test_db):
+        """Test the job is a no-op when every bar is recent"""
+        service = SaMinuteRetentionService(test_db)
+        result = asyncio.run(service.run_retention(today=date(2024, 4, 1), retention_days=30))
+        assert (result["rolled_up"], result["deleted"]) == (0, 0)
+        assert asyncio.run(service.list_partitions()) == []
+        assert asyncio.run(service.partition_table()) is False
+
+    def test_rollup_keeps_stored_day_stats(self, test_db):
+        """Test the rollup only fills missing days unless overwrite is asked for"""
+        sa_db_service = SaDbService(test_db)
+        asyncio.run(sa_db_service.save_all_minute_data_list([
+            _bar("005930", datetime(2024, 1, 2, 9, 0), 100, 105, 99, 104, 10),
+            _bar("000660", datetime(2024, 1, 2, 9, 0), 50, 51, 49, 50, 5),
+        ]))
+        asyncio.run(sa_db_service.save_all_day_info_list([
+            {"stock_code": "005930", "tr_date": "20240102", "open_price": 101, "high_price": 112,
+             "low_price": 94, "close_price": 98, "volume": 1000}
+        ]))
+        service = SaMinuteRetentionService(test_db)
+
+        asyncio.run(service.rollup_days(date(2024, 1, 2), date(2024, 1, 3)))
+        test_db.expire_all()
+        day_stats = {s.stock_code: s for s in test_db.query(DayStatEntity).all()}
+        assert (day_stats["005930"].close_price, day_stats["005930"].volume) == (98, 1000)
+        assert day_stats["000660"].volume == 5
+
+        asyncio.run(service.rollup_days(date(2024, 1, 2), date(2024, 1, 3), overwrite=True))
+        test_db.expire_all()
+        assert test_db.query(DayStatEntity).filter(DayStatEntity.stock_code == "005930").one().volume == 10
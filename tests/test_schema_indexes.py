@@ -0,0 +1,61 @@
+"""
+Test Schema Indexes
+
+Tests for the time-series table indexes and the ensure_indexes migration helper.
+"""
+
+from sqlalchemy import create_engine, inspect, text
+from app.config.database import ensure_indexes
+from app.models import Base
+
+def _index_names(engine, table_name: str):
+    inspector = inspect(engine)
+    names = {index["name"] for index in inspector.get_indexes(table_name)}
+    return names | {constraint["name"] for constraint in inspector.get_unique_constraints(table_name)}
+
+class TestEnsureIndexes:
+    """Test ensure_indexes function"""
+
+    def test_adds_missing_indexes_to_existing_tables(self):
+        """Test indexes are added to tables created before they were declared"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE minute_data (id INTEGER PRIMARY KEY, stock_code VARCHAR(20) NOT NULL, "
+                "date_time DATETIME NOT NULL, open_price FLOAT, high_price FLOAT, low_price FLOAT, "
+                "close_price FLOAT, volume INTEGER)"
+            ))
+            conn.execute(text(
+                "CREATE TABLE day_stat (id INTEGER PRIMARY KEY, stock_code VARCHAR(20) NOT NULL, "
+                "tr_date VARCHAR(10) NOT NULL, open_price FLOAT, high_price FLOAT, low_price FLOAT, "
+                "close_price FLOAT, volume INTEGER, created_at DATETIME)"
+            ))
+
+        created = ensure_indexes(engine)
+
+        assert set(created) == {
+            "uk_minute_data_stock_code_date_time", "idx_minute_data_date_time", "uk_day_stat_stock_code_tr_date"
+        }
+        assert "uk_minute_data_stock_code_date_time" in _index_names(engine, "minute_data")
+        assert ensure_indexes(engine) == []
+
+    def test_new_tables_need_nothing(self):
+        """Test create_all already creates every declared index"""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        assert ensure_indexes(engine) == []
+        assert "idx_minute_stat_stock_code_tr_date_tr_time" in _index_names(engine, "minute_stat")
+
+    def test_range_query_uses_index(self):
+        """Test the minute data period query is an index range search, not a scan"""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            plan = " ".join(str(row[-1]) for row in conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM minute_data WHERE stock_code = '005930' "
+                "AND date_time >= '2024-01-02 09:00:00' AND date_time <= '2024-01-02 15:30:00' "
+                "ORDER BY date_time DESC"
+            )))
+        # SQLite backs the unique constraint with an automatic index
+        assert "SEARCH minute_data USING INDEX" in plan
+        assert "SCAN minute_data" not in plan
@@ -0,0 +1,79 @@
+"""
+Test Service Registry
+
+Tests for the shared service instances and the session per call data service.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+from app.config.database import get_db
+from app.models import StockList
+from app.services.service_registry import ServiceRegistry, get_sa_api_service
+from app.services.sa.async_sa_db_service import SessionScopedSaDbService, create_sa_db_service
+from tests.conftest import TestingSessionLocal
+
+class TestServiceRegistry:
+    """Test ServiceRegistry functions"""
+
+    def setup_method(self):
+        ServiceRegistry.reset()
+
+    def teardown_method(self):
+        ServiceRegistry.reset()
+
+    def test_services_are_shared(self):
+        """Test services are created once and share one OAuth service"""
+        api_service = get_sa_api_service()
+        assert get_sa_api_service() is api_service
+        assert api_service.kr_inv_ord_service is ServiceRegistry.kr_inv_ord_service
+        assert api_service.kr_inv_inq_service is ServiceRegistry.kr_inv_inq_service
+        assert (ServiceRegistry.kr_inv_ord_service.kr_inv_oauth_service
+                is ServiceRegistry.kr_inv_inq_service.kr_inv_oauth_service
+                is ServiceRegistry.kr_inv_oauth_service)
+        assert isinstance(api_service.sa_db_service, SessionScopedSaDbService)
+
+class TestSessionScopedSaDbService:
+    """Test SessionScopedSaDbService functions"""
+
+    def test_session_per_call(self, test_db):
+        """Test every call opens and closes its own session"""
+        opened = []
+
+        @asynccontextmanager
+        async def session_factory():
+            db = TestingSessionLocal()
+            opened.append(db)
+            try:
+                yield db
+            finally:
+                db.close()
+
+        service = SessionScopedSaDbService(session_factory)
+        asyncio.run(service.save_all_stock_list([
+            {"stock_code": "005930", "stock_name": "Samsung", "market": "KOSPI"}
+        ]))
+        stock = asyncio.run(service.find_stock_by_stock_code("005930"))
+
+        assert stock.stock_name == "Samsung"
+        assert len(opened) == 2
+        assert test_db.query(StockList).count() == 1
+
+    def test_unknown_method(self):
+        """Test only SaDbService methods are exposed"""
+        service = create_sa_db_service()
+        with pytest.raises(AttributeError):
+            service.find_nothing
+        with pytest.raises(AttributeError):
+            service._bulk_upsert
+
+class TestGetDb:
+    """Test the database session dependency"""
+
+    def test_get_db_closes_session_after_use(self):
+        """Test get_db yields an open session and closes it when finished"""
+        dependency = get_db()
+        db = next(dependency)
+        assert db.is_active
+        with pytest.raises(StopIteration):
+            next(dependency)
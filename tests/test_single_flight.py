@@ -0,0 +1,79 @@
+"""
+Test Single Flight
+
+Tests for sharing one in-progress call between concurrent callers.
+"""
+
+import asyncio
+import pytest
+from app.common.single_flight import SingleFlight
+
+class TestSingleFlight:
+    """Test SingleFlight functions"""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test one call per key, its result handed once to on_result, and the key freed after"""
+        single_flight = SingleFlight()
+        calls, results = [], []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 42
+
+        async def run():
+            values = await asyncio.gather(*(single_flight.do("key", loader, results.append) for _ in range(3)))
+            in_flight = single_flight.in_flight("key")
+            values.append(await single_flight.do("key", loader))
+            return values, in_flight
+
+        values, in_flight = asyncio.run(run())
+
+        assert values == [42] * 4
+        assert len(calls) == 2
+        assert results == [42]
+        assert in_flight is False
+
+    def test_failure_shared_and_retrieved(self):
+        """Test every caller gets the failure and an unawaited one is not reported as never retrieved"""
+        single_flight = SingleFlight()
+        unhandled = []
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("down")
+
+        async def run():
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+            results = await asyncio.gather(*(single_flight.do("key", loader) for _ in range(2)),
+                                           return_exceptions=True)
+            # The only caller gives up; the call still finishes and fails
+            caller = asyncio.ensure_future(single_flight.do("other", loader))
+            await asyncio.sleep(0)
+            caller.cancel()
+            await asyncio.sleep(0.05)
+            return results
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert unhandled == []
+
+    def test_caller_cancel_does_not_cancel_call(self):
+        """Test a caller giving up leaves the call running for the others"""
+        single_flight = SingleFlight()
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        async def run():
+            first = asyncio.ensure_future(single_flight.do("key", loader))
+            second = asyncio.ensure_future(single_flight.do("key", loader))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(run()) == "done"
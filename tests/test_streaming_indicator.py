@@ -0,0 +1,113 @@
+"""
+Test Streaming Indicators
+
+Tests for incremental indicators against the vectorized IndicatorUtil results.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+import numpy as np
+from app.models import MinuteData
+from app.services.sa.sa_stat_minute_service import SaStatMinuteService
+from app.utils.indicator_util import IndicatorUtil
+from app.utils.streaming_indicator import (
+    StreamingIndicator, StreamingEma, StreamingRsi, RollingMinMax, StreamingVwap, RollingVariance
+)
+
+def _closes(count: int = 80):
+    rng = np.random.default_rng(2)
+    return 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+
+def _round_trip(indicator: StreamingIndicator) -> StreamingIndicator:
+    return StreamingIndicator.from_dict(json.loads(json.dumps(indicator.to_dict())))
+
+class TestStreamingIndicator:
+    """Test streaming indicator classes"""
+
+    def test_ema_and_rsi_match_vectorized(self):
+        """Test EMA / RSI equal IndicatorUtil, including across a save/restore"""
+        closes = _closes()
+        ema, rsi = StreamingEma(10), StreamingRsi(14)
+        ema_values, rsi_values = [], []
+        for i, close in enumerate(closes):
+            if i == 40:
+                ema, rsi = _round_trip(ema), _round_trip(rsi)
+            ema_values.append(ema.update(close))
+            rsi_values.append(rsi.update(close))
+
+        np.testing.assert_allclose(np.array(ema_values[9:], dtype=float), IndicatorUtil.ema(closes, 10)[9:])
+        np.testing.assert_allclose(np.array(rsi_values[15:], dtype=float), IndicatorUtil.rsi(closes, 14)[15:])
+
+    def test_rolling_min_max_and_variance(self):
+        """Test monotonic deque min/max and windowed Welford variance"""
+        closes = _closes()
+        window = 7
+        min_max, variance = RollingMinMax(window), RollingVariance(window)
+        for i, close in enumerate(closes):
+            if i == 30:
+                min_max, variance = _round_trip(min_max), _round_trip(variance)
+            low, high = min_max.update(close)
+            variance.update(close)
+            recent = closes[max(0, i - window + 1):i + 1]
+            assert low == recent.min() and high == recent.max()
+            if i >= window - 1:
+                assert np.isclose(variance.value, recent.var(ddof=1))
+
+    def test_vwap_resets_per_session(self):
+        """Test session VWAP"""
+        vwap = StreamingVwap()
+        vwap.update(100, 1, "20240102")
+        assert vwap.update(200, 3, "20240102") == 175
+        assert vwap.update(50, 2, "20240103") == 50
+
+class TestSaStatMinuteService:
+    """Test SaStatMinuteService streaming state"""
+
+    def test_trend_and_state_persistence(self, tmp_path):
+        """Test bars update state once, trend and restore from file"""
+        SaStatMinuteService.reset_state()
+        for minute, close in enumerate(range(100, 140)):
+            SaStatMinuteService.update_minute_bar("005930", "20240102", f"09{minute:02d}00",
+                                                  close + 1, close - 1, close, 10)
+        # Replayed bar is ignored
+        snapshot = SaStatMinuteService.update_minute_bar("005930", "20240102", "090000", 1, 1, 1, 10)
+        assert snapshot["close_price"] == 139
+        assert snapshot["range_high"] == 140 and snapshot["range_low"] == 109
+
+        service = SaStatMinuteService(db_session=None)
+        assert asyncio.run(service.calculate_minute_trend("005930", 30)) == "UP"
+
+        path = str(tmp_path / "state.json")
+        assert SaStatMinuteService.save_state(path) == 1
+        SaStatMinuteService.reset_state()
+        assert SaStatMinuteService.load_state(path) == 1
+        restored = SaStatMinuteService.get_state("005930").snapshot()
+        assert restored == snapshot
+        SaStatMinuteService.reset_state()
+
+    def test_statistics_follow_stored_bars(self, test_db):
+        """Test each call applies the bars stored since the previous one"""
+        SaStatMinuteService.reset_state()
+
+        def store(minutes):
+            for minute in minutes:
+                test_db.add(MinuteData(stock_code="005930", date_time=datetime(2024, 1, 2, 9, minute),
+                                       open_price=100.0, high_price=101.0 + minute, low_price=99.0,
+                                       close_price=100.0 + minute, volume=10))
+            test_db.commit()
+
+        service = SaStatMinuteService(test_db)
+        store(range(3))
+        first = asyncio.run(service.get_minute_statistics("005930", "2024-01-02", "09:59:59"))
+        store(range(3, 5))
+        second = asyncio.run(service.get_minute_statistics("005930", "2024-01-02", "09:59:59"))
+        store(range(5, 7))
+        # Compact formats read the same bars; the end time is inclusive
+        third = asyncio.run(service.get_minute_statistics("005930", "20240102", "090500"))
+        SaStatMinuteService.reset_state()
+
+        assert (first["close_price"], first["last_time"]) == (102.0, "20240102 090200")
+        assert (second["close_price"], second["last_time"]) == (104.0, "20240102 090400")
+        assert second["range_high"] == 105.0
+        assert (third["close_price"], third["last_time"]) == (105.0, "20240102 090500")
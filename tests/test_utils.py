@@ -4,9 +4,10 @@ Test Utilities
 Tests for utility functions.
 """
 
+import asyncio
 import pytest
 from datetime import datetime
-from app.utils import DateUtil, JsonUtil, CommUtil
+from app.utils import DateUtil, JsonUtil, CommUtil, WebClientUtil
 
 class TestDateUtil:
     """Test DateUtil functions"""
@@ -89,3 +90,19 @@ class TestCommUtil:
         # Generate another ID and ensure they're different
         another_id = CommUtil.generate_request_id()
         assert request_id != another_id
+
+class TestWebClientUtil:
+    """Test WebClientUtil functions"""
+    
+    def test_shared_client_is_reused(self):
+        """Test the pooled client is created once and reused"""
+        client = WebClientUtil.init_client(max_connections=5, max_keepalive_connections=2)
+        try:
+            assert WebClientUtil.get_client() is client
+            assert WebClientUtil.init_client() is client
+        finally:
+            asyncio.run(WebClientUtil.close_client())
+        
+        assert client.is_closed
+        assert WebClientUtil.get_client() is not client
+        asyncio.run(WebClientUtil.close_client())
@@ -0,0 +1,81 @@
+"""
+Test Vector Backtest Utility
+
+Tests for the vectorized backtest against straightforward loop implementations.
+"""
+
+import numpy as np
+import pytest
+from app.utils.indicator_util import IndicatorUtil
+from app.utils.vector_backtest_util import VectorBacktestUtil
+
+def _day_bars(symbols: int = 5, days: int = 40):
+    rng = np.random.default_rng(2)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, days)), axis=1))
+    open_price = close * np.exp(rng.normal(0, 0.01, (symbols, days)))
+    high = np.maximum(open_price, close) * (1 + rng.uniform(0, 0.03, (symbols, days)))
+    low = np.minimum(open_price, close) * (1 - rng.uniform(0, 0.03, (symbols, days)))
+    return open_price, high, low, close
+
+class TestVectorBacktestUtil:
+    """Test VectorBacktestUtil functions"""
+
+    def test_positions_from_signals(self):
+        """Test positions are held from the bar after an entry until the bar after an exit"""
+        entries = np.array([[0, 1, 0, 0, 1, 0, 0, 1], [1, 0, 0, 0, 0, 0, 0, 0]], dtype=bool)
+        exits = np.array([[0, 0, 0, 1, 0, 0, 1, 1], [0, 0, 1, 0, 0, 0, 0, 0]], dtype=bool)
+        position = VectorBacktestUtil.positions_from_signals(entries, exits)
+        assert position.astype(int).tolist() == [[0, 0, 1, 1, 0, 1, 1, 0], [0, 1, 1, 0, 0, 0, 0, 0]]
+
+    def test_evaluate_matches_loop(self):
+        """Test returns, turnover costs and drawdown against a bar by bar loop"""
+        _, _, _, close = _day_bars()
+        returns = VectorBacktestUtil.bar_returns(close)
+        sma = np.nan_to_num(IndicatorUtil.sma(close, 5))
+        position = VectorBacktestUtil.positions_from_signals(close > sma * 1.01, close < sma)
+        weights = VectorBacktestUtil.weights(position)
+
+        result = VectorBacktestUtil.evaluate(weights, returns, cost_rate=0.001)
+
+        equity, peak, previous = 1.0, 1.0, np.zeros(close.shape[0])
+        drawdowns = []
+        for t in range(close.shape[1]):
+            turnover = np.abs(weights[:, t] - previous).sum()
+            equity *= 1.0 + (weights[:, t] * returns[:, t]).sum() - turnover * 0.001
+            peak = max(peak, equity)
+            drawdowns.append(1.0 - equity / peak)
+            previous = weights[:, t]
+        assert result["total_return"] == pytest.approx(equity - 1.0)
+        assert result["max_drawdown"] == pytest.approx(max(drawdowns))
+
+    def test_breakout_matches_loop(self):
+        """Test breakout entries and trade returns against the per-day rule of the sample"""
+        open_price, high, low, close = _day_bars()
+        entered, trade_return, _ = VectorBacktestUtil.breakout(open_price, high, low, close, 0.5)
+        for s in range(close.shape[0]):
+            assert not entered[s, 0]
+            for t in range(1, close.shape[1]):
+                target = open_price[s, t] + (high[s, t - 1] - low[s, t - 1]) * 0.5
+                assert entered[s, t] == (high[s, t] > target)
+                if entered[s, t]:
+                    assert trade_return[s, t] == pytest.approx(close[s, t] / max(open_price[s, t], target) - 1)
+
+    def test_breakout_sweep_matches_single_runs(self):
+        """Test every (k, buy count) cell of a sweep equals its own backtest"""
+        open_price, high, low, close = _day_bars(symbols=8)
+        ks, buy_counts = [0.2, 0.5, 0.8], [1, 3]
+
+        stats = VectorBacktestUtil.breakout_sweep(open_price, high, low, close, ks, buy_counts,
+                                                  cost_rate=0.002, chunk=2)
+
+        assert stats["total_return"].shape == (3, 2)
+        for row, k in enumerate(ks):
+            entered, trade_return, score = VectorBacktestUtil.breakout(open_price, high, low, close, k)
+            for column, buy_count in enumerate(buy_counts):
+                selected = VectorBacktestUtil.top_n(entered, score, buy_count)
+                assert selected.sum(axis=0).max() <= buy_count
+                result = VectorBacktestUtil.evaluate(
+                    VectorBacktestUtil.weights(selected, 1.0 / buy_count), trade_return, 0.002, intraday=True
+                )
+                assert stats["total_return"][row, column] == pytest.approx(result["total_return"])
+                assert stats["sharpe"][row, column] == pytest.approx(result["sharpe"])